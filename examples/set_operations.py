@@ -36,7 +36,7 @@ print('B has kernel %s and support %s.' % (B.kernel, B.support))
 print('Elements in B are %s' % [element for element in B])
 
 # ...you will not see 'e'. You can still access it using keys.
-print('B has keys %s.' % B.keys())
+print('B has keys %s.' % list(B.keys()))
 print('mu_B(e) = %f' % B['e'].mu)
 
 # There is an easier way to check mu values than this, though.
@@ -96,6 +96,6 @@ if not B < A:
     print('B is no longer a subset of A.')
 
 # We can prune zero-valued objects from the set.
-print('Before pruning, B has keys %s.' % B.keys())
+print('Before pruning, B has keys %s.' % list(B.keys()))
 B.prune()
-print('After pruning, B has keys %s.' % B.keys())
+print('After pruning, B has keys %s.' % list(B.keys()))
@@ -9,11 +9,19 @@ FuzzPy: Fuzzy sets for Python
 
 __version__ = (0, 4, 2)
 
-__all__ = ['iset', 'fset', 'fnumber', 'graph', 'fgraph', 'visualization']
+__all__ = ['iset', 'norm', 'lazy', 'fset', 'dense', 'frelation',
+           'similarity', 'parallel', 'fnumber', 'graph', 'fgraph',
+           'visualization']
 __name__ = 'fuzz'
 
 from .iset import *
+from .norm import *
+from .lazy import *
 from .fset import *
+from .dense import *
+from .frelation import *
+from .similarity import *
+from .parallel import *
 from .fnumber import *
 from .graph import *
 from .fgraph import *
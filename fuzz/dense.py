@@ -0,0 +1,312 @@
+"""\
+Dense fuzzy set module. Contains the universe and dense-universe fuzzy set
+class definitions.
+
+@author: Aaron Mavrinac
+@organization: University of Windsor
+@contact: mavrin1@uwindsor.ca
+@license: LGPL-3
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .fset import ArrayMembership, FuzzySet
+from .iset import ObjectStorage
+
+
+class Universe(object):
+    """\
+    Universe of discourse class, a fixed, ordered set of elements assigning
+    each element a slot. A universe of consecutive integers (see L{range})
+    computes slots arithmetically; any other universe keeps an index of its
+    elements. A universe is the layout of the dense fuzzy sets over it (see
+    L{ArrayMembership}).
+    """
+    def __init__(self, elements):
+        """\
+        Construct a universe of enumerated elements.
+
+        @param elements: The distinct elements, in slot order.
+        @type elements: C{iterable}
+        """
+        self._elements = list(elements)
+        self._start = None
+        self._index = dict(zip(self._elements, range(len(self._elements))))
+        if len(self._index) != len(self._elements):
+            raise ValueError('universe elements must be unique')
+
+    @classmethod
+    def range(cls, start, stop=None):
+        """\
+        Construct a universe of consecutive integers, from 0 to C{start} - 1
+        or from C{start} to C{stop} - 1.
+
+        @param start: The first integer, or the size of the universe.
+        @type start: C{int}
+        @param stop: The integer after the last (optional).
+        @type stop: C{int}
+        @rtype: L{Universe}
+        """
+        if stop is None:
+            start, stop = 0, start
+        result = cls.__new__(cls)
+        result._elements = range(start, max(start, stop))
+        result._start = start
+        result._index = None
+        return result
+
+    def __len__(self):
+        return len(self._elements)
+
+    def __iter__(self):
+        return iter(self._elements)
+
+    def __contains__(self, element):
+        try:
+            self.index(element)
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self):
+        """\
+        Return the canonical representation of the universe.
+
+        @rtype: C{str}
+        """
+        if self._index is None:
+            return '%s.range(%d, %d)' % (self.__class__.__name__,
+                                         self._start,
+                                         self._start + len(self._elements))
+        return '%s(%r)' % (self.__class__.__name__, self._elements)
+
+    def __eq__(self, other):
+        """\
+        Compare two universes for equality of their elements in slot order.
+
+        @rtype: C{bool}
+        """
+        if self is other:
+            return True
+        if not isinstance(other, Universe) or len(self) != len(other):
+            return False
+        if self._index is None and other._index is None:
+            return self._start == other._start
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def index(self, element):
+        """\
+        Return the slot of an element, raising a KeyError if it is not in
+        the universe. NumPy scalars are looked up as the equivalent Python
+        values.
+
+        @param element: The element.
+        @type element: C{object}
+        @rtype: C{int}
+        """
+        if numpy is not None and isinstance(element, numpy.generic):
+            element = element.item()
+        if self._index is not None:
+            return self._index[element]
+        if isinstance(element, int) and not isinstance(element, bool):
+            slot = element - self._start
+            if 0 <= slot < len(self._elements):
+                return slot
+        raise KeyError(element)
+
+    def __getitem__(self, slot):
+        """\
+        Return the element in a slot.
+
+        @param slot: The slot.
+        @type slot: C{int}
+        @rtype: C{object}
+        """
+        return self._elements[slot]
+
+    def find(self, element):
+        """\
+        Return the slot of an element, or -1 if it is not in the universe.
+
+        @param element: The element.
+        @type element: C{object}
+        @rtype: C{int}
+        """
+        try:
+            return self.index(element)
+        except KeyError:
+            return -1
+
+    def covering(self, layout, mu):
+        """\
+        Return this universe as the layout covering another operand of a
+        binary operation, raising a ValueError if the operand is over another
+        universe or has an element outside this one with non-zero membership.
+
+        @param layout: The layout of the operand.
+        @type layout: C{object}
+        @param mu: The membership degrees over the layout.
+        @type mu: C{numpy.ndarray}
+        @rtype: L{Universe}
+        """
+        if isinstance(layout, Universe):
+            if layout != self:
+                raise ValueError('fuzzy sets have different universes')
+            return self
+        for element, degree in zip(layout, mu.tolist()):
+            if degree > 0 and element not in self:
+                raise ValueError('element %r is not in the universe' \
+                                 % (element,))
+        return self
+
+
+class DenseFuzzySet(ArrayMembership):
+    """\
+    Dense-universe fuzzy set class. The fuzzy set is bound to a L{Universe}
+    and stores the membership degree of every element of the universe in a
+    contiguous NumPy float64 array, indexed by slot, so lookups index the
+    array directly and operations between sets on the same universe are
+    elementwise array expressions without key alignment (see
+    L{ArrayMembership}). Requires NumPy.
+
+    Elements of the universe with zero membership are not members; the
+    complement is taken over the whole universe.
+    """
+    def __init__(self, universe, mus=None):
+        """\
+        Construct a dense fuzzy set from the membership degrees of the slots
+        of a universe.
+
+        @param universe: The universe.
+        @type universe: L{Universe}
+        @param mus: The membership degree of each slot (optional, defaults to
+            zero).
+        @type mus: C{iterable}
+        """
+        if numpy is None:
+            raise ImportError('DenseFuzzySet requires NumPy')
+        self._layout = universe
+        if mus is None:
+            self._mu = numpy.zeros(len(universe))
+            return
+        self._mu = numpy.array(mus, dtype=numpy.float64).reshape(-1)
+        if len(self._mu) != len(universe):
+            raise ValueError('mu values must match the universe size')
+        if len(self._mu) and (self._mu.min() < 0 or self._mu.max() > 1):
+            raise ValueError('mu value must be in [0, 1]')
+
+    @classmethod
+    def from_items(cls, pairs, universe):
+        """\
+        Construct a dense fuzzy set from an iterable of (key, mu) pairs. Keys
+        not given have zero membership, and later duplicate keys replace
+        earlier ones.
+
+        @param pairs: The (key, mu) pairs.
+        @type pairs: C{iterable}
+        @param universe: The universe.
+        @type universe: L{Universe}
+        @rtype: L{DenseFuzzySet}
+        """
+        mus = [0.0] * len(universe)
+        index = universe.index
+        try:
+            for key, mu in pairs:
+                mus[index(key)] = mu
+        except KeyError as error:
+            raise ValueError('element %r is not in the universe' \
+                             % error.args[0])
+        return cls(universe, mus)
+
+    @classmethod
+    def from_fuzzy_set(cls, fset, universe):
+        """\
+        Construct a dense fuzzy set from a fuzzy set. Its elements with
+        non-zero membership must be in the universe.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet} or L{ArrayMembership}
+        @param universe: The universe.
+        @type universe: L{Universe}
+        @rtype: L{DenseFuzzySet}
+        """
+        return cls.from_items([(key, mu) for key, mu in fset.items() \
+                               if mu > 0], universe)
+
+    def to_fuzzy_set(self, storage=ObjectStorage):
+        """\
+        Convert this dense fuzzy set to a fuzzy set of its members.
+
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        @rtype: L{FuzzySet}
+        """
+        slots = numpy.flatnonzero(self._mu)
+        return FuzzySet.from_arrays(self._elements(slots),
+                                    self._mu[slots].tolist(), storage=storage)
+
+    @property
+    def universe(self):
+        """\
+        The universe of the fuzzy set.
+
+        @rtype: L{Universe}
+        """
+        return self._layout
+
+    @property
+    def array(self):
+        """\
+        The membership degree array, by slot of the universe. Changes to it
+        change the fuzzy set; membership degrees must stay in [0, 1].
+
+        @rtype: C{numpy.ndarray}
+        """
+        return self._mu
+
+    def __repr__(self):
+        """\
+        Return the canonical representation of a dense fuzzy set.
+
+        @return: Canonical representation.
+        @rtype: C{str}
+        """
+        return '%s(%r, %r)' % (self.__class__.__name__, self._layout,
+                               self._mu.tolist())
+
+    def keys(self):
+        """\
+        Return the list of elements with non-zero membership, in slot order.
+
+        @rtype: C{list}
+        """
+        return self._elements(numpy.flatnonzero(self._mu))
+
+    def items(self):
+        """\
+        Return an iterator over the (key, mu) pairs of the elements with
+        non-zero membership, in slot order.
+
+        @rtype: C{iterator}
+        """
+        slots = numpy.flatnonzero(self._mu)
+        return zip(self._elements(slots), self._mu[slots].tolist())
+
+    def _elements(self, slots):
+        """\
+        Return the elements of the universe in an array of slots.
+
+        @param slots: The slots.
+        @type slots: C{numpy.ndarray}
+        @rtype: C{list}
+        """
+        universe = self._layout
+        return [universe[i] for i in slots.tolist()]
@@ -0,0 +1,429 @@
+"""\
+Relation module. Contains the binary fuzzy relation class definition.
+
+@author: Aaron Mavrinac
+@organization: University of Windsor
+@contact: mavrin1@uwindsor.ca
+@license: LGPL-3
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .fset import FuzzySet
+from .norm import get_tnorm
+
+
+def _index(keys):
+    """\
+    Return a dict mapping keys to their positions in a list.
+
+    @param keys: The keys.
+    @type keys: C{list}
+    @rtype: C{dict}
+    """
+    return dict((key, i) for i, key in enumerate(keys))
+
+
+class FuzzyRelation(object):
+    """\
+    Binary fuzzy relation class, a fuzzy set of (x, y) pairs over the product
+    of a domain and a codomain.
+
+    A relation is stored either sparsely, as a dict mapping each x to a dict
+    of the non-zero membership degrees of its pairs, or densely, as a NumPy
+    matrix with one row per domain element and one column per codomain
+    element. Dense composition is computed in blocks of bounded size with the
+    array kernel of the t-norm; sparse composition visits only the pairs
+    joined by a common element, with the batch kernel of the t-norm.
+    """
+    def __init__(self, fset=None, dense=False, domain=None, codomain=None):
+        """\
+        Construct a fuzzy relation from a fuzzy set of (x, y) pairs.
+
+        @param fset: The fuzzy set of pairs (optional).
+        @type fset: L{FuzzySet}
+        @param dense: Whether to store the relation densely (optional).
+        @type dense: C{bool}
+        @param domain: The domain elements, in order (optional, defaults to
+            the first elements of the pairs, extending any given list).
+        @type domain: C{list}
+        @param codomain: The codomain elements, in order (optional, defaults
+            to the second elements of the pairs, extending any given list).
+        @type codomain: C{list}
+        """
+        if dense and numpy is None:
+            raise ImportError('dense FuzzyRelation requires NumPy')
+        self._domain = list(domain or [])
+        self._codomain = list(codomain or [])
+        self._dindex = _index(self._domain)
+        self._cindex = _index(self._codomain)
+        self._rows = {}
+        self._matrix = None
+        if fset is not None:
+            for (x, y), mu in fset.items():
+                self._extend(x, y)
+                if mu > 0:
+                    self._rows.setdefault(x, {})[y] = mu
+        if dense:
+            self._densify()
+
+    def _extend(self, x, y):
+        """\
+        Add the elements of a pair to the domain and codomain if missing.
+        """
+        if x not in self._dindex:
+            self._dindex[x] = len(self._domain)
+            self._domain.append(x)
+        if y not in self._cindex:
+            self._cindex[y] = len(self._codomain)
+            self._codomain.append(y)
+
+    def _densify(self):
+        """\
+        Replace the sparse storage with a dense matrix.
+        """
+        self._matrix = numpy.zeros((len(self._domain), len(self._codomain)))
+        for x, row in self._rows.items():
+            self._matrix[self._dindex[x],
+                         [self._cindex[y] for y in row]] = list(row.values())
+        self._rows = None
+
+    @classmethod
+    def _build(cls, domain, codomain, rows=None, matrix=None):
+        """\
+        Construct a relation directly from its storage.
+
+        @rtype: L{FuzzyRelation}
+        """
+        result = cls(domain=domain, codomain=codomain)
+        if matrix is None:
+            result._rows = rows
+        else:
+            result._rows = None
+            result._matrix = matrix
+        return result
+
+    @classmethod
+    def from_matrix(cls, matrix, domain, codomain):
+        """\
+        Construct a dense fuzzy relation from a matrix of membership degrees.
+
+        @param matrix: The matrix, with one row per domain element.
+        @type matrix: C{numpy.ndarray}
+        @param domain: The domain elements, in order.
+        @type domain: C{list}
+        @param codomain: The codomain elements, in order.
+        @type codomain: C{list}
+        @return: The fuzzy relation.
+        @rtype: L{FuzzyRelation}
+        """
+        if numpy is None:
+            raise ImportError('dense FuzzyRelation requires NumPy')
+        matrix = numpy.array(matrix, dtype=numpy.float64)
+        if matrix.shape != (len(domain), len(codomain)):
+            raise ValueError('matrix shape does not match domain and codomain')
+        if matrix.size and (matrix.min() < 0 or matrix.max() > 1):
+            raise ValueError('mu value must be in [0, 1]')
+        return cls._build(domain, codomain, matrix=matrix)
+
+    @classmethod
+    def cylindrical_extension(cls, fset, universe, axis=0, dense=False):
+        """\
+        Return the cylindrical extension of a fuzzy set to a relation, in
+        which each pair has the membership degree of its element in the fuzzy
+        set.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @param universe: The elements of the other axis.
+        @type universe: C{list}
+        @param axis: The axis of the fuzzy set, 0 for the domain or 1 for the
+            codomain (optional).
+        @type axis: C{int}
+        @param dense: Whether to store the relation densely (optional).
+        @type dense: C{bool}
+        @return: The cylindrical extension.
+        @rtype: L{FuzzyRelation}
+        """
+        keys = list(fset.keys())
+        mus = [fset.mu(key) for key in keys]
+        universe = list(universe)
+        if dense:
+            if numpy is None:
+                raise ImportError('dense FuzzyRelation requires NumPy')
+            matrix = numpy.repeat(numpy.array(mus, dtype=numpy.float64)
+                                  [:, None], len(universe), axis=1)
+            if axis:
+                return cls._build(universe, keys, matrix=matrix.T.copy())
+            return cls._build(keys, universe, matrix=matrix)
+        if axis:
+            column = dict((key, mu) for key, mu in zip(keys, mus) if mu > 0)
+            rows = dict((x, column.copy()) for x in universe) if column else {}
+            return cls._build(universe, keys, rows=rows)
+        rows = dict((key, dict.fromkeys(universe, mu)) \
+                    for key, mu in zip(keys, mus) if mu > 0 and universe)
+        return cls._build(keys, universe, rows=rows)
+
+    @property
+    def dense(self):
+        """\
+        Whether the relation is stored densely.
+
+        @rtype: C{bool}
+        """
+        return self._matrix is not None
+
+    @property
+    def domain(self):
+        """\
+        The domain elements, in order.
+
+        @rtype: C{list}
+        """
+        return self._domain[:]
+
+    @property
+    def codomain(self):
+        """\
+        The codomain elements, in order.
+
+        @rtype: C{list}
+        """
+        return self._codomain[:]
+
+    def to_dense(self):
+        """\
+        Return a densely stored copy of the relation.
+
+        @rtype: L{FuzzyRelation}
+        """
+        if self.dense:
+            return self._build(self._domain[:], self._codomain[:],
+                               matrix=self._matrix.copy())
+        if numpy is None:
+            raise ImportError('dense FuzzyRelation requires NumPy')
+        result = self._build(self._domain[:], self._codomain[:],
+                             rows=self._rows)
+        result._densify()
+        return result
+
+    def to_sparse(self):
+        """\
+        Return a sparsely stored copy of the relation.
+
+        @rtype: L{FuzzyRelation}
+        """
+        return self._build(self._domain[:], self._codomain[:],
+                           rows=self._sparse_rows())
+
+    def _sparse_rows(self):
+        """\
+        Return a fresh dict of the non-zero membership degrees of each x.
+
+        @rtype: C{dict}
+        """
+        if not self.dense:
+            return dict((x, row.copy()) for x, row in self._rows.items())
+        rows = {}
+        codomain = self._codomain
+        for i, j in zip(*numpy.nonzero(self._matrix)):
+            rows.setdefault(self._domain[i], {})[codomain[j]] = \
+                float(self._matrix[i, j])
+        return rows
+
+    def to_fuzzy_set(self):
+        """\
+        Return the fuzzy set of (x, y) pairs with non-zero membership.
+
+        @rtype: L{FuzzySet}
+        """
+        keys, mus = [], []
+        for x, row in self._sparse_rows().items():
+            for y, mu in row.items():
+                keys.append((x, y))
+                mus.append(mu)
+        return FuzzySet.from_arrays(keys, mus)
+
+    def mu(self, x, y):
+        """\
+        Return the membership degree of a pair. Returns zero for any pair not
+        in the relation.
+
+        @param x: The domain element.
+        @type x: C{object}
+        @param y: The codomain element.
+        @type y: C{object}
+        @return: The membership degree of the pair.
+        @rtype: C{float}
+        """
+        if self.dense:
+            try:
+                return float(self._matrix[self._dindex[x], self._cindex[y]])
+            except KeyError:
+                return 0.0
+        return self._rows.get(x, {}).get(y, 0.0)
+
+    def __len__(self):
+        """\
+        Return the number of pairs with non-zero membership.
+
+        @rtype: C{int}
+        """
+        if self.dense:
+            return int(numpy.count_nonzero(self._matrix))
+        return sum([len(row) for row in self._rows.values()])
+
+    def __eq__(self, other):
+        """\
+        Compare two fuzzy relations for equality of their pairs.
+
+        @param other: The other fuzzy relation.
+        @type other: L{FuzzyRelation}
+        @return: True if equal, false otherwise.
+        @rtype: C{bool}
+        """
+        self._binary_sanity_check(other)
+        return self.to_fuzzy_set() == other.to_fuzzy_set()
+
+    def __ne__(self, other):
+        """\
+        Compare two fuzzy relations for inequality.
+
+        @param other: The other fuzzy relation.
+        @type other: L{FuzzyRelation}
+        @return: True if not equal, false otherwise.
+        @rtype: C{bool}
+        """
+        return not self == other
+
+    __hash__ = None
+
+    @staticmethod
+    def _binary_sanity_check(other):
+        """\
+        Check that the other argument to a binary operation is also a fuzzy
+        relation, raising a TypeError otherwise.
+
+        @param other: The other argument.
+        @type other: L{FuzzyRelation}
+        """
+        if not isinstance(other, FuzzyRelation):
+            raise TypeError('operation only permitted between fuzzy relations')
+
+    def inverse(self):
+        """\
+        Return the inverse relation, relating y to x with the membership
+        degree of (x, y).
+
+        @rtype: L{FuzzyRelation}
+        """
+        if self.dense:
+            return self._build(self._codomain[:], self._domain[:],
+                               matrix=self._matrix.T.copy())
+        rows = {}
+        for x, row in self._rows.items():
+            for y, mu in row.items():
+                rows.setdefault(y, {})[x] = mu
+        return self._build(self._codomain[:], self._domain[:], rows=rows)
+
+    def projection(self, axis=0):
+        """\
+        Return the projection of the relation onto the domain (axis 0) or the
+        codomain (axis 1), the fuzzy set of the supremum of the membership
+        degrees of the pairs of each element.
+
+        @param axis: The axis to project onto (optional).
+        @type axis: C{int}
+        @return: The projection.
+        @rtype: L{FuzzySet}
+        """
+        if self.dense:
+            keys = self._codomain if axis else self._domain
+            if not self._matrix.size:
+                return FuzzySet.from_arrays(keys, [0.0] * len(keys))
+            mus = self._matrix.max(axis=0 if axis else 1)
+            return FuzzySet.from_arrays(keys, mus.tolist())
+        if not axis:
+            return FuzzySet.from_dict(dict((x, max(row.values())) \
+                                           for x, row in self._rows.items()))
+        degrees = {}
+        for row in self._rows.values():
+            for y, mu in row.items():
+                if mu > degrees.get(y, 0.0):
+                    degrees[y] = mu
+        return FuzzySet.from_dict(degrees)
+
+    def compose(self, other, norm=0, block=1 << 22, **params):
+        """\
+        Return the sup-T composition of this relation (on X x Y) with another
+        (on Y x Z), relating x and z with the supremum over y of the t-norm of
+        the membership degrees of (x, y) and (y, z). The standard t-norm gives
+        the sup-min composition and the algebraic t-norm the sup-product
+        composition.
+
+        The result is dense if both relations are, and sparse otherwise.
+
+        @param other: The other fuzzy relation.
+        @type other: L{FuzzyRelation}
+        @param norm: The t-norm type or name to use (optional, see
+            L{FuzzySet.intersection}).
+        @type norm: C{object}
+        @param block: The maximum number of elements of temporary arrays in
+            dense composition (optional).
+        @type block: C{int}
+        @return: The composition.
+        @rtype: L{FuzzyRelation}
+        """
+        tnorm = get_tnorm(norm)
+        self._binary_sanity_check(other)
+        if self.dense and other.dense:
+            return self._compose_dense(other, tnorm, block, params)
+        left = self._rows if not self.dense else self._sparse_rows()
+        right = other._rows if not other.dense else other._sparse_rows()
+        rows = {}
+        for x, row in left.items():
+            result = {}
+            for y, a in row.items():
+                targets = right.get(y)
+                if not targets:
+                    continue
+                mus = tnorm.batch([a] * len(targets), list(targets.values()),
+                                  **params)
+                for z, mu in zip(targets, mus):
+                    if mu > result.get(z, 0.0):
+                        result[z] = mu
+            if result:
+                rows[x] = result
+        return self._build(self._domain[:], other._codomain[:], rows=rows)
+
+    def _compose_dense(self, other, tnorm, block, params):
+        """\
+        Compose two dense relations over their common middle elements, in
+        blocks of rows and middle elements whose broadcast t-norm arrays
+        hold at most (about) C{block} elements.
+        """
+        common = [y for y in self._codomain if y in other._dindex]
+        left = self._matrix
+        right = other._matrix
+        if common != self._codomain:
+            left = left[:, [self._cindex[y] for y in common]]
+        if common != other._domain:
+            right = right[[other._dindex[y] for y in common], :]
+        n, k = left.shape
+        m = right.shape[1]
+        matrix = numpy.zeros((n, m))
+        if k and m:
+            chunk = max(1, min(k, block // m))
+            size = max(1, block // (chunk * m))
+            for i in range(0, n, size):
+                out = matrix[i:i + size]
+                for c in range(0, k, chunk):
+                    numpy.maximum(out, tnorm.array(
+                        left[i:i + size, c:c + chunk, None],
+                        right[None, c:c + chunk, :], **params).max(axis=1),
+                        out=out)
+        return self._build(self._domain[:], other._codomain[:],
+                           matrix=matrix)
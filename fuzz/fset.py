@@ -8,16 +8,45 @@ definitions.
 @license: LGPL-3
 """
 
-from copy import copy
-
-from .iset import IndexedMember, IndexedSet
+import csv
+import json
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from heapq import heapify, heappop, heappush
+from itertools import compress, islice
+from mmap import ACCESS_COPY, mmap as memory_map
+from struct import Struct
+from sys import byteorder
+try:
+    from collections.abc import ItemsView, Set, ValuesView
+except ImportError:
+    from collections import ItemsView, Set, ValuesView
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .iset import ArrayStorage, IndexedMember, IndexedSet, MappedStorage, \
+    ObjectStorage
+from .lazy import FuzzyExpression
+from .norm import get_complement, get_tconorm, get_tnorm
 
 
 class FuzzyElement(IndexedMember):
     """\
     Fuzzy element class.
+
+    Fuzzy elements are fully slotted: on 64-bit CPython 3.11 each element
+    occupies 64 bytes, excluding the index and membership degree objects
+    themselves (72 bytes plus an instance dictionary before slotting). Stored
+    in a L{FuzzySet}, an element costs about 190 bytes in total including its
+    set table and key index entries.
     """
-    __slots__ = ['_index', '_mu']
+    __slots__ = ['_mu']
+    _columns = (('_mu', 'd'),)
 
     def __init__(self, index, mu=1.0):
         """\
@@ -31,6 +60,46 @@ class FuzzyElement(IndexedMember):
         super(FuzzyElement, self).__init__(index)
         self.mu = mu
 
+    @classmethod
+    def _trusted(cls, index, mu):
+        """\
+        Construct a fuzzy element without validating the index or the
+        membership degree. Used by the bulk constructors of L{FuzzySet}.
+
+        @param index: The object for this member.
+        @type index: C{object}
+        @param mu: The membership degree of this member.
+        @type mu: C{float}
+        @return: The new fuzzy element.
+        @rtype: L{FuzzyElement}
+        """
+        element = cls.__new__(cls)
+        element._index = index
+        element._hash = hash(index)
+        element._owner = None
+        element._mu = mu
+        return element
+
+    def __copy__(self):
+        """\
+        Return a shallow copy of this fuzzy element.
+
+        @return: The copy.
+        @rtype: L{FuzzyElement}
+        """
+        result = super(FuzzyElement, self).__copy__()
+        result._mu = self._mu
+        return result
+
+    def __reduce__(self):
+        """\
+        Return pickling information.
+
+        @return: Callable and arguments to reconstruct the fuzzy element.
+        @rtype: C{tuple}
+        """
+        return (self.__class__, (self._index, self._mu))
+
     def __repr__(self):
         """\
         Return the canonical representation of a fuzzy element.
@@ -68,12 +137,160 @@ class FuzzyElement(IndexedMember):
         """
         if value < 0 or value > 1:
             raise ValueError('mu value must be in [0, 1]')
+        self._changing('_mu', value)
         self._mu = value
 
 
+@contextmanager
+def _opened(source):
+    """\
+    Open a file for reading if given its path, or pass through an open file or
+    other iterable of lines.
+
+    @param source: The path of the file, or an iterable of lines.
+    @type source: C{object}
+    """
+    if isinstance(source, str):
+        with open(source) as stream:
+            yield stream
+    else:
+        yield source
+
+
+_FILE_MAGIC = b'FUZZSET\x02'
+_FILE_HEADER = Struct('<8sQQ')
+
+
+def _storable(key):
+    """\
+    Return whether a key can be stored in the key table of a fuzzy set file:
+    a string, number, boolean or C{None}, or a tuple of such keys.
+
+    @param key: The key.
+    @type key: C{object}
+    @rtype: C{bool}
+    """
+    if isinstance(key, tuple):
+        return all(map(_storable, key))
+    return key is None or isinstance(key, (str, int, float))
+
+
+def _restored(key):
+    """\
+    Return a key read from the key table of a fuzzy set file, turning the
+    arrays that encode tuples back into tuples.
+
+    @param key: The decoded key.
+    @type key: C{object}
+    @rtype: C{object}
+    """
+    if isinstance(key, list):
+        return tuple(map(_restored, key))
+    return key
+
+
+_FIXED_ONE = 1 << 1074
+
+
+def _fixed(mu):
+    """\
+    Return a membership degree as an exact integer multiple of the smallest
+    positive float, so that sums of membership degrees can be maintained
+    without rounding error under any sequence of additions and removals.
+    """
+    numerator, denominator = float(mu).as_integer_ratio()
+    return numerator << (1075 - denominator.bit_length())
+
+
+class FuzzySetItemsView(ItemsView):
+    """\
+    Live view of the (key, mu) pairs of a fuzzy set.
+    """
+    def __contains__(self, item):
+        key, mu = item
+        try:
+            return self._mapping[key].mu == mu
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        for element in self._mapping.values():
+            yield (element.index, element.mu)
+
+
+class FuzzySetValuesView(ValuesView):
+    """\
+    Live view of the membership degrees of a fuzzy set.
+    """
+    def __contains__(self, mu):
+        for element in self._mapping.values():
+            if element.mu == mu:
+                return True
+        return False
+
+    def __iter__(self):
+        for element in self._mapping.values():
+            yield element.mu
+
+
+class AlphaCutView(Set):
+    """\
+    Immutable view of an alpha cut in a level set decomposition: the keys
+    from a position on of a list of keys sorted by membership degree. The
+    cuts of one decomposition share the list and an index of positions, so
+    each takes constant space. Views compare and hash like frozensets.
+    """
+    def __init__(self, keys, ranks, start):
+        """\
+        Constructor.
+
+        @param keys: The keys, sorted by membership degree.
+        @type keys: C{list}
+        @param ranks: The positions of the keys in the list.
+        @type ranks: C{dict}
+        @param start: The position of the first key of the cut.
+        @type start: C{int}
+        """
+        self._keys = keys
+        self._ranks = ranks
+        self._start = start
+
+    def __len__(self):
+        return len(self._keys) - self._start
+
+    def __iter__(self):
+        return islice(self._keys, self._start, None)
+
+    def __contains__(self, key):
+        return self._ranks.get(key, -1) >= self._start
+
+    def __repr__(self):
+        """\
+        Return the string representation of the view.
+
+        @rtype: C{str}
+        """
+        return '%s(%r)' % (self.__class__.__name__, list(self))
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return frozenset(iterable)
+
+    __hash__ = Set._hash
+
+
 class FuzzySet(IndexedSet):
     """\
     Discrete fuzzy set class.
+
+    The number of elements with non-zero membership, the sum of membership
+    degrees and a heap of membership degrees for the height are maintained
+    on every mutation, including assignment to the C{mu} of an element. The
+    sum and heap are built on first use after a bulk load.
+
+    An optional index of the elements sorted by membership degree (see
+    L{index_mu}) answers alpha cuts and membership range queries by
+    bisection.
     """
     NORM_STANDARD = 0
     NORM_ALGEBRAIC = 1
@@ -84,6 +301,7 @@ class FuzzySet(IndexedSet):
     COMP_YAGER = 1
 
     _itemcls = FuzzyElement
+    _indexed = False
 
     class FuzzySetIterator(object):
         """\
@@ -103,14 +321,440 @@ class FuzzySet(IndexedSet):
         
         next = __next__
 
-    def __init__(self, iterable=set()):
+    def __init__(self, iterable=set(), pool=None, storage=ObjectStorage):
         """\
         Construct a fuzzy set from an optional iterable.
 
         @param iterable: The iterable to construct from (optional).
         @type iterable: C{object}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        """
+        super(FuzzySet, self).__init__(iterable, pool=pool, storage=storage)
+
+    @classmethod
+    def from_arrays(cls, keys, mus, pool=None, storage=ObjectStorage):
+        """\
+        Construct a fuzzy set from parallel sequences of keys and membership
+        degrees. The membership degrees are validated in a single pass and
+        the elements are inserted without copying. Later duplicate keys
+        replace earlier ones.
+
+        @param keys: The keys of the elements.
+        @type keys: C{iterable}
+        @param mus: The membership degrees of the elements.
+        @type mus: C{iterable}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        @return: The new fuzzy set.
+        @rtype: L{FuzzySet}
+        """
+        keys = list(keys)
+        mus = list(mus)
+        if len(keys) != len(mus):
+            raise ValueError('keys and mu values must have the same length')
+        if mus and (min(mus) < 0 or max(mus) > 1):
+            raise ValueError('mu value must be in [0, 1]')
+        result = cls(pool=pool, storage=storage)
+        result._load_columns(keys, [mus])
+        return result
+
+    @classmethod
+    def from_items(cls, pairs, pool=None, storage=ObjectStorage):
+        """\
+        Construct a fuzzy set from an iterable of (key, mu) pairs.
+
+        @param pairs: The (key, mu) pairs.
+        @type pairs: C{iterable}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        @return: The new fuzzy set.
+        @rtype: L{FuzzySet}
+        """
+        keys, mus = [], []
+        for key, mu in pairs:
+            keys.append(key)
+            mus.append(mu)
+        return cls.from_arrays(keys, mus, pool=pool, storage=storage)
+
+    @classmethod
+    def from_dict(cls, mapping, pool=None, storage=ObjectStorage):
+        """\
+        Construct a fuzzy set from a mapping of keys to membership degrees.
+
+        @param mapping: The mapping of keys to membership degrees.
+        @type mapping: C{dict}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        @return: The new fuzzy set.
+        @rtype: L{FuzzySet}
+        """
+        return cls.from_arrays(mapping.keys(), mapping.values(), pool=pool,
+                               storage=storage)
+
+    @classmethod
+    def from_records(cls, records, norm=0, epsilon=None, normalize=False,
+                     chunk=65536, pool=None, storage=ObjectStorage, **params):
+        """\
+        Construct a fuzzy set from an iterable of (key, mu) records, read in
+        chunks so that only one chunk of records is held in memory besides
+        the result. Membership degrees for duplicate keys are combined with a
+        t-conorm (see L{union}).
+
+        @param records: The (key, mu) records.
+        @type records: C{iterable}
+        @param norm: The t-conorm for duplicate keys (optional).
+        @type norm: C{object}
+        @param epsilon: Drop the elements whose combined membership degree is
+            below this value (optional).
+        @type epsilon: C{float}
+        @param normalize: Whether to normalize the result (optional).
+        @type normalize: C{bool}
+        @param chunk: The number of records per chunk (optional).
+        @type chunk: C{int}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        @return: The new fuzzy set.
+        @rtype: L{FuzzySet}
+        """
+        tconorm = get_tconorm(norm)
+        if chunk < 1:
+            raise ValueError('chunk size must be positive')
+        # the standard union of degrees below epsilon is below epsilon, so
+        # such records can be dropped before they are combined
+        early = epsilon is not None and tconorm is get_tconorm(0)
+        result = cls(pool=pool, storage=storage)
+        records = iter(records)
+        for block in iter(lambda: list(islice(records, chunk)), []):
+            degrees = {}
+            for key, mu in block:
+                if mu < 0 or mu > 1:
+                    raise ValueError('mu value must be in [0, 1]')
+                if early and mu < epsilon:
+                    continue
+                if key in degrees:
+                    degrees[key] = tconorm(degrees[key], mu, **params)
+                else:
+                    degrees[key] = mu
+            del block
+            result._merge(list(degrees), list(degrees.values()), tconorm,
+                          params)
+        if epsilon is not None:
+            keymap = result._keymap
+            drop = [mu < epsilon for mu in keymap.column('_mu')]
+            for key in list(compress(keymap, drop)):
+                result.remove(key)
+        if normalize:
+            result.normalize()
+        return result
+
+    @classmethod
+    def from_csv(cls, source, key=0, mu=1, header=False, delimiter=',',
+                 **kwargs):
+        """\
+        Construct a fuzzy set from CSV rows, streamed as by L{from_records}.
+        Keys are read as strings.
+
+        @param source: The path of the file, or an open file or other
+            iterable of lines.
+        @type source: C{object}
+        @param key: The key column, by position or by name in the header.
+        @type key: C{object}
+        @param mu: The membership degree column, by position or by name in
+            the header.
+        @type mu: C{object}
+        @param header: Whether the first row is a header (optional).
+        @type header: C{bool}
+        @param delimiter: The field delimiter (optional).
+        @type delimiter: C{str}
+        @return: The new fuzzy set.
+        @rtype: L{FuzzySet}
+        """
+        with _opened(source) as lines:
+            rows = csv.reader(lines, delimiter=delimiter)
+            if header:
+                names = next(rows)
+                key, mu = [names.index(column) \
+                           if isinstance(column, str) else column \
+                           for column in (key, mu)]
+            records = ((row[key], float(row[mu])) for row in rows if row)
+            return cls.from_records(records, **kwargs)
+
+    @classmethod
+    def from_jsonl(cls, source, key='key', mu='mu', **kwargs):
+        """\
+        Construct a fuzzy set from JSON Lines, streamed as by
+        L{from_records}. Each line holds either an object with key and
+        membership degree fields or a [key, mu] array. Array keys are read as
+        tuples.
+
+        @param source: The path of the file, or an open file or other
+            iterable of lines.
+        @type source: C{object}
+        @param key: The name of the key field (optional).
+        @type key: C{str}
+        @param mu: The name of the membership degree field (optional).
+        @type mu: C{str}
+        @return: The new fuzzy set.
+        @rtype: L{FuzzySet}
+        """
+        def records(lines):
+            for line in lines:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    record = (record[key], record[mu])
+                index, value = record
+                if isinstance(index, list):
+                    index = tuple(index)
+                yield index, float(value)
+
+        with _opened(source) as lines:
+            return cls.from_records(records(lines), **kwargs)
+
+    def save(self, path):
+        """\
+        Save the fuzzy set to a file in a compact binary format: a header
+        with the number of elements and the size of the key table, the
+        membership degrees as a column of little-endian doubles, and the key
+        table, a UTF-8 JSON array of the keys in the same order. Keys must be
+        strings, numbers, booleans, C{None} or tuples of such keys.
+
+        @param path: The path of the file.
+        @type path: C{str}
+        """
+        keys = list(self._keymap)
+        if not all(map(_storable, keys)):
+            raise TypeError('keys must be strings, numbers, booleans, None '
+                            'or tuples of such keys')
+        table = json.dumps(keys, separators=(',', ':'),
+                           ensure_ascii=False).encode('utf-8')
+        with open(path, 'wb') as stream:
+            stream.write(_FILE_HEADER.pack(_FILE_MAGIC, len(keys), len(table)))
+            for chunk in self._keymap.chunks('_mu'):
+                mus = array('d', chunk)
+                if byteorder == 'big':
+                    mus.byteswap()
+                mus.tofile(stream)
+            stream.write(table)
+
+    @classmethod
+    def open(cls, path, mmap=True, pool=None, storage=ObjectStorage):
+        """\
+        Open a fuzzy set saved by L{save}. The key table is plain JSON, so
+        opening a file never runs code from it.
+
+        If mapped, the membership degrees are not read into memory; the set
+        uses L{MappedStorage} over a private (copy-on-write) memory map of
+        the file, so lookups and alpha cuts read the file directly and no
+        element objects are constructed. Changes are never written back.
+
+        A file that is truncated or whose header does not match its contents
+        raises a ValueError.
+
+        @param path: The path of the file.
+        @type path: C{str}
+        @param mmap: Whether to memory-map the file (optional).
+        @type mmap: C{bool}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class if not mapped (optional).
+        @type storage: C{type}
+        @return: The fuzzy set.
+        @rtype: L{FuzzySet}
+        """
+        with open(path, 'rb') as stream:
+            header = stream.read(_FILE_HEADER.size)
+            if not header.startswith(_FILE_MAGIC) \
+                    or len(header) < _FILE_HEADER.size:
+                raise ValueError('not a fuzzy set file')
+            magic, count, size = _FILE_HEADER.unpack(header)
+            if _FILE_HEADER.size + 8 * count + size \
+                    > os.fstat(stream.fileno()).st_size:
+                raise ValueError('not a fuzzy set file')
+            if mmap and byteorder == 'little' and hasattr(memoryview, 'cast'):
+                mapping = memory_map(stream.fileno(), 0, access=ACCESS_COPY)
+                start = _FILE_HEADER.size
+                end = start + 8 * count
+                mus = memoryview(mapping)[start:end].cast('d')
+                table = mapping[end:end + size]
+                storage = MappedStorage
+            else:
+                mus = array('d')
+                try:
+                    mus.fromfile(stream, count)
+                except EOFError:
+                    raise ValueError('not a fuzzy set file')
+                if byteorder == 'big':
+                    mus.byteswap()
+                table = stream.read(size)
+        try:
+            keys = json.loads(table.decode('utf-8'))
+        except ValueError:
+            raise ValueError('not a fuzzy set file')
+        if not isinstance(keys, list) or len(keys) != count:
+            raise ValueError('not a fuzzy set file')
+        if list in set(map(type, keys)):
+            keys = [_restored(key) for key in keys]
+        result = cls(pool=pool, storage=storage)
+        result._load_columns(keys, [mus])
+        return result
+
+    def _reloaded(self):
+        """\
+        Recount the elements with non-zero membership after a bulk load, and
+        defer building the sum and height heap until they are needed.
+        """
+        self._count = sum([len(mus) - mus.count(0) \
+                           for mus in self._keymap.chunks('_mu')])
+        self._sum = None
+        self._heap = None
+        self._stale = {}
+        self._ranked = None
+
+    def _added(self, item):
+        """\
+        Add the membership degree of a new element to the aggregates.
+        """
+        self._tally(item.index, item.mu, 1)
+
+    def _removed(self, item):
+        """\
+        Remove the membership degree of an element from the aggregates.
+        """
+        self._tally(item.index, item.mu, -1)
+
+    def _member_changed(self, item, name, old, new):
+        """\
+        Replace the old membership degree of an element in the aggregates.
+        """
+        if name == '_mu':
+            self._tally(item.index, old, -1)
+            self._tally(item.index, new, 1)
+
+    def _tally(self, key, mu, sign):
+        """\
+        Add a membership degree to, or remove it from, the aggregates. Heap
+        entries are removed lazily, and the heap is discarded once stale
+        entries make up most of it.
+
+        @param key: The index of the element.
+        @type key: C{object}
+        @param mu: The membership degree.
+        @type mu: C{float}
+        @param sign: 1 to add, -1 to remove.
+        @type sign: C{int}
+        """
+        if not mu > 0:
+            return
+        if self._ranked is not None:
+            mus, keys = self._ranked
+            if sign > 0:
+                position = bisect_right(mus, mu)
+                mus.insert(position, mu)
+                keys.insert(position, key)
+            else:
+                position = keys.index(key, bisect_left(mus, mu),
+                                      bisect_right(mus, mu))
+                del mus[position]
+                del keys[position]
+        self._count += sign
+        if self._sum is not None:
+            self._sum += sign * _fixed(mu)
+        if self._heap is not None:
+            if sign > 0:
+                heappush(self._heap, -mu)
+            elif len(self._heap) > 2 * self._count + 16:
+                self._heap = None
+            else:
+                self._stale[mu] = self._stale.get(mu, 0) + 1
+
+    def copy(self):
+        """\
+        Return a copy of the fuzzy set, including its aggregates.
+
+        @return: The copy.
+        @rtype: L{FuzzySet}
+        """
+        result = super(FuzzySet, self).copy()
+        result._count = self._count
+        result._sum = self._sum
+        if self._heap is not None:
+            result._heap = self._heap[:]
+            result._stale = self._stale.copy()
+        result._indexed = self._indexed
+        if self._ranked is not None:
+            result._ranked = (self._ranked[0][:], self._ranked[1][:])
+        return result
+
+    def lazy(self):
+        """\
+        Return a lazy expression consisting of this fuzzy set, on which fuzzy
+        set operations build an expression graph evaluated without
+        intermediate fuzzy sets (see L{FuzzyExpression}).
+
+        @rtype: L{FuzzyExpression}
+        """
+        return FuzzyExpression(self)
+
+    def index_mu(self, enable=True):
+        """\
+        Enable or disable the index of elements sorted by membership degree.
+        While enabled, the index is kept up to date on every mutation, at the
+        cost of O(n) list insertion per change, and L{alpha}, L{salpha},
+        L{kernel} and L{mu_range} take O(log n + k) time for k results.
+
+        @param enable: True to enable the index, false to drop it.
+        @type enable: C{bool}
+        """
+        self._indexed = enable
+        self._ranked = None
+
+    def _rank(self):
+        """\
+        Sort the elements with non-zero membership by membership degree.
+
+        @return: Aligned lists of membership degrees (ascending) and keys.
+        @rtype: C{tuple}
+        """
+        mus = self._keymap.column('_mu')
+        keys = list(self._keymap)
+        order = sorted([i for i, mu in enumerate(mus) if mu > 0],
+                       key=mus.__getitem__)
+        return ([mus[i] for i in order], [keys[i] for i in order])
+
+    def _ranking(self):
+        """\
+        Return the sorted index as a pair of aligned lists of membership
+        degrees (ascending) and keys, building it if it is not current, or
+        C{None} if the index is disabled.
+
+        @rtype: C{tuple}
+        """
+        if self._indexed and self._ranked is None:
+            self._ranked = self._rank()
+        return self._ranked
+
+    def _elements(self):
+        """\
+        Return an iterator over the elements with non-zero membership without
+        un-sharing them. Callers must not modify the elements returned.
+
+        @return: Iterator.
+        @rtype: C{iterator}
         """
-        super(FuzzySet, self).__init__(iterable)
+        return (element for element in self._members() if element.mu > 0)
 
     def __iter__(self):
         """\
@@ -123,12 +767,13 @@ class FuzzySet(IndexedSet):
 
     def __len__(self):
         """\
-        Override the length function.
+        Override the length function. Elements with zero membership are not
+        counted.
 
         @return: Size of this fuzzy set.
         @rtype: C{int}
         """
-        return len([element for element in self])
+        return self._count
 
     def __contains__(self, element):
         """\
@@ -139,21 +784,6 @@ class FuzzySet(IndexedSet):
         """
         return set.__contains__(self, element) and self.mu(element) > 0
 
-    def __getitem__(self, key):
-        """\
-        Return a set item indexed by key (including those with a membership
-        degree of zero).
-
-        @param key: The index of the item to get.
-        @type key: C{object}
-        @return: The matching item.
-        @rtype: C{object}
-        """
-        for item in IndexedSet.__iter__(self):
-            if item.index == key:
-                return item
-        raise KeyError(key)
-    
     def __str__(self):
         """\
         String representation of a fuzzy set.
@@ -162,17 +792,27 @@ class FuzzySet(IndexedSet):
         @rtype: C{str}
         """
         return ('%s([' % self.__class__.__name__) \
-            + ', '.join([str(element) for element in self]) + '])'
+            + ', '.join([str(element) for element in self._elements()]) + '])'
 
-    def keys(self):
+    def items(self):
         """\
-        Return a list of keys in the set (including those with a membership
-        degree of zero).
+        Return a live view of the (key, mu) pairs in the set (including those
+        with a membership degree of zero).
 
-        @return: List of keys in the set.
-        @rtype: C{list}
+        @return: View of the (key, mu) pairs in the set.
+        @rtype: L{FuzzySetItemsView}
+        """
+        return FuzzySetItemsView(self._keymap)
+
+    def values(self):
+        """\
+        Return a live view of the membership degrees in the set (including
+        those with a membership degree of zero).
+
+        @return: View of the membership degrees in the set.
+        @rtype: L{FuzzySetValuesView}
         """
-        return [element.index for element in IndexedSet.__iter__(self)]
+        return FuzzySetValuesView(self._keymap)
 
     def mu(self, key):
         """\
@@ -183,7 +823,7 @@ class FuzzySet(IndexedSet):
         @rtype: C{float}
         """
         try:
-            return self[key].mu
+            return self._keymap[key].mu
         except KeyError:
             return 0.0
 
@@ -195,7 +835,9 @@ class FuzzySet(IndexedSet):
 
         @rtype: C{set}
         """
-        return set([element.index for element in self])
+        if self._count == len(self._keymap):
+            return set(self._keymap)
+        return set([element.index for element in self._elements()])
 
     @property
     def kernel(self):
@@ -215,28 +857,53 @@ class FuzzySet(IndexedSet):
 
         @rtype: C{float}
         """
-        return max([element.mu for element in self])
+        heap = self._heap
+        if heap is None:
+            heap = self._heap = []
+            for mus in self._keymap.chunks('_mu'):
+                heap.extend([-mu for mu in mus if mu > 0])
+            heapify(heap)
+            self._stale = {}
+        stale = self._stale
+        while heap:
+            top = -heap[0]
+            pending = stale.get(top)
+            if not pending:
+                return top
+            heappop(heap)
+            if pending == 1:
+                del stale[top]
+            else:
+                stale[top] = pending - 1
+        raise ValueError('height of an empty fuzzy set')
 
     @property
     def cardinality(self):
         """\
         Scalar cardinality, the sum of membership degrees of all elements.
+        The sum is exactly rounded, so it does not depend on iteration order.
         
         @rtype: C{float}
         """
-        return sum([element.mu for element in self])
+        if self._sum is None:
+            self._sum = sum([sum(map(_fixed, mus)) \
+                             for mus in self._keymap.chunks('_mu')])
+        return self._sum / _FIXED_ONE
 
     # Binary fuzzy set operations
 
     def __or__(self, other):
         """\
-        Return the fuzzy union of two fuzzy sets as a new fuzzy set.
+        Return the fuzzy union of two fuzzy sets as a new fuzzy set, or the
+        lazy union with a fuzzy expression (see L{FuzzyExpression}).
 
         @param other: The other fuzzy set.
         @type other: L{FuzzySet}
         @return: The fuzzy union.
         @rtype: L{FuzzySet}
         """
+        if isinstance(other, FuzzyExpression):
+            return NotImplemented
         return self.efficient_union(other)
 
     def __ior__(self, other):
@@ -248,10 +915,63 @@ class FuzzySet(IndexedSet):
         @return: The fuzzy union (self).
         @rtype: L{FuzzySet}
         """
-        self = self.efficient_union(other)
+        self.union_update(other)
         return self
 
-    def union(self, other, norm=0):
+    def _assign(self, key, mu):
+        """\
+        Assign a new membership degree to the element indexed by key, without
+        validating it.
+
+        @param key: The index of the element.
+        @type key: C{object}
+        @param mu: The new membership degree.
+        @type mu: C{float}
+        """
+        element = self._private(key)
+        element._changing('_mu', mu)
+        element._mu = mu
+
+    def union_update(self, other, norm=0, **params):
+        """\
+        Update the fuzzy set in place with its fuzzy union with another fuzzy
+        set. Every t-conorm leaves a membership degree unchanged when the
+        other is zero, so only the elements of the other set are visited.
+
+        @param other: The other fuzzy set.
+        @type other: L{FuzzySet}
+        @param norm: The t-conorm to use (see L{union}).
+        @type norm: C{object}
+        """
+        tconorm = get_tconorm(norm)
+        self._binary_sanity_check(other)
+        self._merge(list(other._keymap), other._keymap.column('_mu'), tconorm,
+                    params)
+
+    def _merge(self, keys, mus, tconorm, params):
+        """\
+        Combine membership degrees for distinct keys into the fuzzy set in
+        place with a t-conorm, inserting the keys not already present.
+
+        @param keys: The distinct keys.
+        @type keys: C{list}
+        @param mus: The membership degrees, aligned with the keys.
+        @type mus: C{list}
+        @param tconorm: The t-conorm.
+        @type tconorm: L{Norm}
+        @param params: The parameters of the t-conorm.
+        @type params: C{dict}
+        """
+        old = self._keymap.column('_mu', keys)
+        new = tconorm.batch([0.0 if mu is None else mu for mu in old], mus,
+                            **params)
+        for key, before, mu in zip(keys, old, new):
+            if before is None:
+                self._insert(self._itemcls._trusted(key, mu))
+            elif mu != before:
+                self._assign(key, mu)
+
+    def union(self, other, norm=0, **params):
         """\
         Return the fuzzy union of two fuzzy sets as a new fuzzy set.
 
@@ -261,59 +981,82 @@ class FuzzySet(IndexedSet):
         2 - Bounded Sum
         3 - Drastic Union
 
+        Any t-conorm in L{TCONORMS} may also be given by name, with its
+        parameters as keyword arguments (e.g. C{norm='yager', w=2}).
+
         @param other: The other fuzzy set.
         @type other: L{FuzzySet}
-        @param norm: The t-conorm type to use.
-        @type norm: C{int}
+        @param norm: The t-conorm type or name to use.
+        @type norm: C{object}
         @return: The fuzzy union.
         @rtype: L{FuzzySet}
         """
-        if not norm in range(4):
-            raise ValueError('invalid t-conorm type')
+        tconorm = get_tconorm(norm)
         self._binary_sanity_check(other)
-        result = self.__class__()
-        bothkeys = set(self.keys()) | set(other.keys())
-        [lambda: result.update([FuzzyElement(key, max(self.mu(key), \
-            other.mu(key))) for key in bothkeys]),
-         lambda: result.update([FuzzyElement(key, self.mu(key) + other.mu(key) \
-            - self.mu(key) * other.mu(key)) for key in bothkeys]),
-         lambda: result.update([FuzzyElement(key, min(1.0, self.mu(key) + \
-            other.mu(key))) for key in bothkeys]),
-         lambda: result.update([FuzzyElement(key, (self.mu(key) == 0.0 and \
-            other.mu(key)) or (other.mu(key) == 0.0 and self.mu(key)) or \
-            1.0) for key in bothkeys])
-        ][norm]()
+        keys = list(self._keymap)
+        keys.extend([key for key in other._keymap if key not in self._keymap])
+        result = self._empty()
+        result._load_columns(keys, [tconorm.batch(
+            self._keymap.column('_mu', keys, 0.0),
+            other._keymap.column('_mu', keys, 0.0), **params)])
+        return result
+
+    @classmethod
+    def union_all(cls, sets, norm=0, **params):
+        """\
+        Return the fuzzy union of any number of fuzzy sets as a new fuzzy set,
+        computed in a single pass over the inputs by folding each of them
+        into one table of membership degrees (t-conorms being associative).
+        The result has the class, key pool and storage of the first set.
+
+        @param sets: The fuzzy sets.
+        @type sets: C{iterable}
+        @param norm: The t-conorm to use (see L{union}).
+        @type norm: C{object}
+        @return: The fuzzy union.
+        @rtype: L{FuzzySet}
+        """
+        tconorm = get_tconorm(norm)
+        result = None
+        degrees = {}
+        for fset in sets:
+            cls._binary_sanity_check(fset)
+            if result is None:
+                result = fset._empty()
+            keys = list(fset._keymap)
+            degrees.update(zip(keys, tconorm.batch(
+                [degrees.get(key, 0.0) for key in keys],
+                fset._keymap.column('_mu'), **params)))
+        if result is None:
+            return cls()
+        result._load_columns(list(degrees), [list(degrees.values())])
         return result
 
     def efficient_union(self, other):
         """\
-        Optimized version of the standard fuzzy union for large fuzzy sets.
+        Optimized version of the standard fuzzy union for large fuzzy sets,
+        computed over the aligned membership degree columns as by L{union}.
 
         @param other: The other fuzzy set.
         @type other: L{FuzzySet}
         @return: The fuzzy union.
         @rtype: L{FuzzySet}
         """
-        self._binary_sanity_check(other)
-        result = self.copy()
-        keys = result.keys()
-        for element in other:
-            if element.index in keys:
-                result[element.index].mu = max(result[element.index].mu,
-                                               element.mu)
-            else:
-                set.add(result, copy(element))
-        return result
+        return self.union(other, FuzzySet.NORM_STANDARD)
 
     def __and__(self, other):
         """\
-        Return the fuzzy intersection of two fuzzy sets as a new fuzzy set.
+        Return the fuzzy intersection of two fuzzy sets as a new fuzzy set,
+        or the lazy intersection with a fuzzy expression (see
+        L{FuzzyExpression}).
 
         @param other: The other fuzzy set.
         @type other: L{FuzzySet}
         @return: The fuzzy intersection.
         @rtype: L{FuzzySet}
         """
+        if isinstance(other, FuzzyExpression):
+            return NotImplemented
         return self.intersection(other)
 
     def __iand__(self, other):
@@ -325,10 +1068,39 @@ class FuzzySet(IndexedSet):
         @return: The fuzzy intersection (self).
         @rtype: L{FuzzySet}
         """
-        self = self.intersection(other)
+        self._binary_sanity_check(other)
+        self.intersection_update(other)
         return self
 
-    def intersection(self, other, norm=0):
+    def intersection_update(self, *others, **params):
+        """\
+        Update the fuzzy set in place with its fuzzy intersection with other
+        fuzzy sets. Every t-norm is zero where the other membership degree is
+        zero, so elements missing from another set are removed rather than
+        kept with zero membership, in time linear in the smaller set. Given a
+        crisp operand, the set is restricted to its keys as for
+        L{IndexedSet.intersection_update}.
+
+        The t-norm to use (see L{intersection}) is given by the C{norm}
+        keyword argument, with its parameters as further keyword arguments.
+
+        @param others: The other fuzzy sets.
+        @type others: L{FuzzySet}
+        """
+        tnorm = get_tnorm(params.pop('norm', 0))
+        for other in others:
+            IndexedSet.intersection_update(self, other)
+            if not isinstance(other, FuzzySet):
+                continue
+            keys = list(self._keymap)
+            old = self._keymap.column('_mu')
+            new = tnorm.batch(old, other._keymap.column('_mu', keys, 0.0),
+                              **params)
+            for key, before, mu in zip(keys, old, new):
+                if mu != before:
+                    self._assign(key, mu)
+
+    def intersection(self, other, norm=0, **params):
         """\
         Return the fuzzy intersection of two fuzzy sets as a new fuzzy set.
 
@@ -338,27 +1110,61 @@ class FuzzySet(IndexedSet):
         2 - Bounded Difference
         3 - Drastic Intersection
 
+        Any t-norm in L{TNORMS} may also be given by name, with its
+        parameters as keyword arguments (e.g. C{norm='hamacher', gamma=0.5}).
+
         @param other: The other fuzzy set.
         @type other: L{FuzzySet}
-        @param norm: The t-norm type to use.
-        @type norm: C{int}
+        @param norm: The t-norm type or name to use.
+        @type norm: C{object}
         @return: The fuzzy intersection.
         @rtype: L{FuzzySet}
         """
-        if not norm in range(4):
-            raise ValueError('invalid t-norm type')
+        tnorm = get_tnorm(norm)
         self._binary_sanity_check(other)
-        result = self.__class__()
-        [lambda: result.update([FuzzyElement(key, min(self.mu(key), \
-            other.mu(key))) for key in self.keys()]),
-         lambda: result.update([FuzzyElement(key, self.mu(key) * \
-            other.mu(key)) for key in self.keys()]),
-         lambda: result.update([FuzzyElement(key, max(0.0, self.mu(key) + \
-            other.mu(key) - 1.0)) for key in self.keys()]),
-         lambda: result.update([FuzzyElement(key, (self.mu(key) == 1.0 and \
-            other.mu(key)) or (other.mu(key) == 1.0 and self.mu(key)) or 0.0) \
-            for key in self.keys()])
-        ][norm]()
+        keys = list(self._keymap)
+        result = self._empty()
+        result._load_columns(keys, [tnorm.batch(
+            self._keymap.column('_mu'),
+            other._keymap.column('_mu', keys, 0.0), **params)])
+        return result
+
+    @classmethod
+    def intersection_all(cls, sets, norm=0, **params):
+        """\
+        Return the fuzzy intersection of any number of fuzzy sets as a new
+        fuzzy set. Starting from the smallest set, each other set is folded
+        in (t-norms being associative) and keys missing from it are dropped,
+        so the result holds only the keys present in every set. It has the
+        class, key pool and storage of the first set.
+
+        @param sets: The fuzzy sets.
+        @type sets: C{iterable}
+        @param norm: The t-norm to use (see L{intersection}).
+        @type norm: C{object}
+        @return: The fuzzy intersection.
+        @rtype: L{FuzzySet}
+        """
+        tnorm = get_tnorm(norm)
+        sets = list(sets)
+        if not sets:
+            raise ValueError('intersection of no fuzzy sets')
+        for fset in sets:
+            cls._binary_sanity_check(fset)
+        template = sets[0]
+        sets.sort(key=lambda fset: len(fset._keymap))
+        keys = list(sets[0]._keymap)
+        mus = sets[0]._keymap.column('_mu')
+        for fset in sets[1:]:
+            if not keys:
+                break
+            other = fset._keymap.column('_mu', keys)
+            present = [mu is not None for mu in other]
+            keys = list(compress(keys, present))
+            mus = tnorm.batch(list(compress(mus, present)),
+                              list(compress(other, present)), **params)
+        result = template._empty()
+        result._load_columns(keys, [mus])
         return result
 
     def __eq__(self, other):
@@ -370,13 +1176,16 @@ class FuzzySet(IndexedSet):
         @return: True if equal, false otherwise.
         @rtype: C{bool}
         """
+        if isinstance(other, ArrayMembership):
+            return NotImplemented
         self._binary_sanity_check(other)
         if len(self) != len(other):
             return False
         try:
-            for element in self:
-                if element == other[element.index]:
-                    if abs(element.mu - other[element.index].mu) > 1e-10:
+            for element in self._elements():
+                if element == other._keymap[element.index]:
+                    if abs(element.mu - other._keymap[element.index].mu) \
+                    > 1e-10:
                         return False
                 else:
                     return False
@@ -404,7 +1213,7 @@ class FuzzySet(IndexedSet):
         @return: True if null intersection.
         @rtype: C{bool}
         """
-        for element in self:
+        for element in self._elements():
             if element in other:
                 return False
         return True
@@ -422,8 +1231,8 @@ class FuzzySet(IndexedSet):
         if len(self) > len(other):
             return False
         try:
-            for element in self:
-                if element.mu > other[element.index].mu:
+            for element in self._elements():
+                if element.mu > other._keymap[element.index].mu:
                     return False
         except KeyError:
             return False
@@ -442,8 +1251,8 @@ class FuzzySet(IndexedSet):
         if len(self) < len(other):
             return False
         try:
-            for element in other:
-                if element.mu > self[element.index].mu:
+            for element in other._elements():
+                if element.mu > self._keymap[element.index].mu:
                     return False
         except KeyError:
             return False
@@ -506,21 +1315,38 @@ class FuzzySet(IndexedSet):
         """\
         Return the complement of this fuzzy set.
 
-        @param comp: The complement type (optional).
-        @type comp: C{int}
+        Complement Types:
+        0 - Standard Complement
+        1 - Yager Complement (parameter w)
+
+        Any complement in L{COMPLEMENTS} may also be given by name, with its
+        parameters as keyword arguments (e.g. C{comp='sugeno', lam=0.5}).
+
+        @param comp: The complement type or name (optional).
+        @type comp: C{object}
         @return: The complement of this fuzzy set.
         @rtype: L{FuzzySet}
         """
-        if not comp in range(2):
-            raise ValueError('invalid complement type')
-        result = self.__class__()
-        [lambda: result.update([FuzzyElement(key, 1 - self.mu(key)) \
-            for key in self.keys()]),
-         lambda: result.update([FuzzyElement(key, (1 - self.mu(key) \
-            ** kwargs['w']) ** (1.0 / kwargs['w'])) for key in self.keys()])
-        ][comp]()
+        complement = get_complement(comp)
+        result = self._empty()
+        result._load_columns(list(self._keymap), [complement.batch(
+            self._keymap.column('_mu'), **kwargs)])
         return result
 
+    def _chunks(self):
+        """\
+        Iterate over the keys and membership degrees of the fuzzy set in
+        aligned chunks, so that scans do not read the whole membership
+        column into memory at once.
+
+        @return: Iterator over (keys, mus) pairs of chunks; each iterator of
+            keys must be consumed before the next pair is taken.
+        @rtype: C{iterator}
+        """
+        keys = iter(self._keymap)
+        for mus in self._keymap.chunks('_mu'):
+            yield islice(keys, len(mus)), mus
+
     def alpha(self, alpha):
         """\
         Alpha cut function. Returns the crisp set of members whose membership
@@ -531,7 +1357,14 @@ class FuzzySet(IndexedSet):
         @return: The crisp set result of the alpha cut.
         @rtype: C{set}
         """
-        return set([element.index for element in self if element.mu >= alpha])
+        ranked = self._ranking()
+        if ranked is not None:
+            return set(ranked[1][bisect_left(ranked[0], alpha):])
+        result = set()
+        for keys, mus in self._chunks():
+            result.update(compress(keys, [mu >= alpha and mu > 0 \
+                                          for mu in mus]))
+        return result
 
     def salpha(self, alpha):
         """\
@@ -543,13 +1376,94 @@ class FuzzySet(IndexedSet):
         @return: The crisp set result of the strong alpha cut.
         @rtype: C{set}
         """
-        return set([element.index for element in self if element.mu > alpha])
+        ranked = self._ranking()
+        if ranked is not None:
+            return set(ranked[1][bisect_right(ranked[0], alpha):])
+        result = set()
+        for keys, mus in self._chunks():
+            result.update(compress(keys, [mu > alpha for mu in mus]))
+        return result
+
+    def mu_range(self, low, high):
+        """\
+        Return the crisp set of members whose membership degrees lie in the
+        closed interval [low, high]. Elements with zero membership are never
+        included.
+
+        @param low: The lower bound of the interval.
+        @type low: C{float}
+        @param high: The upper bound of the interval.
+        @type high: C{float}
+        @return: The crisp set of matching members.
+        @rtype: C{set}
+        """
+        ranked = self._ranking()
+        if ranked is not None:
+            return set(ranked[1][bisect_left(ranked[0], low):\
+                                 bisect_right(ranked[0], high)])
+        result = set()
+        for keys, mus in self._chunks():
+            result.update(compress(keys, [low <= mu <= high and mu > 0 \
+                                          for mu in mus]))
+        return result
+
+    def iter_level_sets(self, deltas=False):
+        """\
+        Iterate lazily over the alpha cuts of the fuzzy set at each distinct
+        non-zero membership degree (its level set), in ascending order of
+        alpha. The elements are sorted once, and the alpha cuts are views
+        sharing the sorted keys (see L{AlphaCutView}), so the full
+        decomposition takes O(n log n) time and O(n) space.
+
+        @param deltas: If true, yield for each level only the members whose
+            membership degree equals it, rather than the full alpha cut.
+        @type deltas: C{bool}
+        @return: Iterator over (alpha, set) pairs, the sets being frozensets
+            of deltas or alpha cut views.
+        @rtype: C{iterator}
+        """
+        ranked = self._ranking()
+        if ranked is None:
+            mus, keys = self._rank()
+        else:
+            mus, keys = ranked[0][:], ranked[1][:]
+        return self._level_sets(mus, keys, deltas)
+
+    @staticmethod
+    def _level_sets(mus, keys, deltas):
+        """\
+        Generate the level sets of sorted membership degrees and keys.
+        """
+        ranks = None if deltas else dict(zip(keys, range(len(keys))))
+        start = 0
+        while start < len(mus):
+            alpha = mus[start]
+            end = bisect_right(mus, alpha, start)
+            if deltas:
+                yield (alpha, frozenset(keys[start:end]))
+            else:
+                yield (alpha, AlphaCutView(keys, ranks, start))
+            start = end
+
+    def level_sets(self, deltas=False):
+        """\
+        Return the alpha cuts of the fuzzy set at each distinct non-zero
+        membership degree, in ascending order of alpha. See
+        L{iter_level_sets}.
+
+        @param deltas: If true, return for each level only the members whose
+            membership degree equals it, rather than the full alpha cut.
+        @type deltas: C{bool}
+        @return: List of (alpha, set) pairs.
+        @rtype: C{list}
+        """
+        return list(self.iter_level_sets(deltas))
 
     def prune(self):
         """\
         Prune the fuzzy set of all elements with zero membership.
         """
-        prune = [element.index for element in IndexedSet.__iter__(self) \
+        prune = [element.index for element in self._members() \
                  if element.mu == 0]
         for key in prune:
             self.remove(key)
@@ -557,12 +1471,15 @@ class FuzzySet(IndexedSet):
     def normalize(self):
         """\
         Normalize the fuzzy set by scaling all membership degrees by a factor
-        such that the height equals 1.
+        such that the height equals 1. The aggregates are recounted once
+        afterwards rather than updated per element. A fuzzy set with no
+        element of non-zero membership is left unchanged.
         """
-        if self.height > 0:
+        if self._count:
             scale = 1.0 / self.height
-            for element in self:
-                element.mu *= scale
+            for element in IndexedSet.__iter__(self):
+                element._mu = min(element._mu * scale, 1.0)
+            self._reloaded()
 
     @property
     def normal(self):
@@ -572,3 +1489,773 @@ class FuzzySet(IndexedSet):
         @rtype: C{bool}
         """
         return self.height == 1.0
+
+
+def _frozen_guard(name):
+    """\
+    Return a method of L{FrozenFuzzySet} which calls the L{FuzzySet} method
+    of the same name, or raises a TypeError once the set is frozen.
+
+    @param name: The method name.
+    @type name: C{str}
+    @rtype: C{function}
+    """
+    method = getattr(FuzzySet, name)
+
+    def guard(self, *args, **kwargs):
+        if self._frozen:
+            raise TypeError('frozen fuzzy set cannot be modified')
+        return method(self, *args, **kwargs)
+
+    guard.__name__ = method.__name__
+    guard.__doc__ = method.__doc__
+    return guard
+
+
+class FrozenFuzzySet(FuzzySet):
+    """\
+    Immutable, hashable discrete fuzzy set class. Members are kept in
+    L{ArrayStorage} by default. Methods modifying the set, and assignment to
+    the C{mu} of its elements, raise a TypeError; fuzzy set operations on
+    frozen fuzzy sets return frozen fuzzy sets.
+
+    The hash is a fingerprint of the elements with their membership degrees
+    rounded to six decimal places, well above the 1e-10 tolerance of
+    equality, so that it is consistent with equality except for degrees
+    within the tolerance of a rounding boundary. A second fingerprint over
+    the exact degrees is computed with it, once on first use. Equality
+    between frozen fuzzy sets is decided by the fingerprints alone if they
+    differ or both match, and compares the elements otherwise. In-place
+    operators rebind to a new frozen fuzzy set.
+    """
+    _frozen = False
+
+    def __init__(self, iterable=set(), pool=None, storage=ArrayStorage):
+        """\
+        Construct a frozen fuzzy set from an optional iterable.
+
+        @param iterable: The iterable to construct from (optional).
+        @type iterable: C{object}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        """
+        super(FrozenFuzzySet, self).__init__(iterable, pool=pool,
+                                             storage=storage)
+        self._frozen = True
+
+    add = _frozen_guard('add')
+    remove = _frozen_guard('remove')
+    discard = _frozen_guard('discard')
+    pop = _frozen_guard('pop')
+    clear = _frozen_guard('clear')
+    update = _frozen_guard('update')
+    __setitem__ = _frozen_guard('__setitem__')
+    union_update = _frozen_guard('union_update')
+    intersection_update = _frozen_guard('intersection_update')
+    difference_update = _frozen_guard('difference_update')
+    symmetric_difference_update = _frozen_guard('symmetric_difference_update')
+    prune = _frozen_guard('prune')
+    normalize = _frozen_guard('normalize')
+
+    def _reloaded(self):
+        """\
+        Recount the aggregates after a bulk load and reset the fingerprint.
+        """
+        super(FrozenFuzzySet, self)._reloaded()
+        self._fingerprint = None
+        self._digest = None
+
+    def _member_changed(self, item, name, old, new):
+        """\
+        Reject changes to the elements once the set is frozen.
+        """
+        if self._frozen:
+            raise TypeError('frozen fuzzy set cannot be modified')
+        super(FrozenFuzzySet, self)._member_changed(item, name, old, new)
+
+    def _derive(self, method, *args):
+        """\
+        Return a frozen copy of the set modified by a L{FuzzySet} method.
+
+        @param method: The method.
+        @type method: C{function}
+        @return: The modified copy.
+        @rtype: L{FrozenFuzzySet}
+        """
+        result = self.copy()
+        result._frozen = False
+        try:
+            method(result, *args)
+        finally:
+            result._frozen = True
+            result._fingerprint = None
+            result._digest = None
+        return result
+
+    def thaw(self):
+        """\
+        Return a mutable copy of the frozen fuzzy set.
+
+        @return: The copy.
+        @rtype: L{FuzzySet}
+        """
+        return FuzzySet.from_arrays(list(self._keymap),
+                                    self._keymap.column('_mu'),
+                                    pool=self._pool)
+
+    def efficient_union(self, other):
+        """\
+        Optimized version of the standard fuzzy union for large fuzzy sets.
+
+        @param other: The other fuzzy set.
+        @type other: L{FuzzySet}
+        @return: The fuzzy union.
+        @rtype: L{FrozenFuzzySet}
+        """
+        self._binary_sanity_check(other)
+        return self._derive(FuzzySet.union_update, other)
+
+    def difference(self, *args):
+        """\
+        Return the difference of the set with other iterables.
+        """
+        return self._derive(FuzzySet.difference_update, *args)
+
+    def symmetric_difference(self, *args):
+        """\
+        Return the symmetric difference of the set with other iterables.
+        """
+        return self._derive(FuzzySet.symmetric_difference_update, *args)
+
+    def __ior__(self, other):
+        """\
+        Fuzzy union, rebinding rather than modifying the frozen set.
+
+        @param other: The other fuzzy set.
+        @type other: L{FuzzySet}
+        @return: The fuzzy union.
+        @rtype: L{FrozenFuzzySet}
+        """
+        return self | other
+
+    def __iand__(self, other):
+        """\
+        Fuzzy intersection, rebinding rather than modifying the frozen set.
+
+        @param other: The other fuzzy set.
+        @type other: L{FuzzySet}
+        @return: The fuzzy intersection.
+        @rtype: L{FrozenFuzzySet}
+        """
+        return self & other
+
+    def __isub__(self, other):
+        """\
+        Difference, rebinding rather than modifying the frozen set.
+
+        @param other: The other iterable.
+        @type other: C{iterable}
+        @return: The difference.
+        @rtype: L{FrozenFuzzySet}
+        """
+        return self.difference(other)
+
+    def __ixor__(self, other):
+        """\
+        Symmetric difference, rebinding rather than modifying the frozen set.
+
+        @param other: The other iterable.
+        @type other: C{iterable}
+        @return: The symmetric difference.
+        @rtype: L{FrozenFuzzySet}
+        """
+        return self.symmetric_difference(other)
+
+    def _fingerprints(self):
+        """\
+        Compute the fingerprints of the frozen fuzzy set, over its elements
+        with their membership degrees rounded and exact.
+        """
+        items = list(zip(self._keymap, self._keymap.column('_mu')))
+        self._fingerprint = hash(frozenset([(key, round(mu, 6)) \
+                                            for key, mu in items]))
+        self._digest = hash(frozenset(items))
+
+    def __hash__(self):
+        """\
+        Return the fingerprint of the frozen fuzzy set.
+
+        @rtype: C{int}
+        """
+        if self._fingerprint is None:
+            self._fingerprints()
+        return self._fingerprint
+
+    def __eq__(self, other):
+        """\
+        Compare two fuzzy sets for equality, first by fingerprints if both
+        are frozen.
+
+        @param other: The other fuzzy set.
+        @type other: L{FuzzySet}
+        @return: True if equal, false otherwise.
+        @rtype: C{bool}
+        """
+        if isinstance(other, FrozenFuzzySet):
+            if hash(self) != hash(other):
+                return False
+            if self._digest == other._digest and len(self) == len(other):
+                return True
+        return super(FrozenFuzzySet, self).__eq__(other)
+
+
+class KeyLayout(object):
+    """\
+    Layout of an L{ArrayFuzzySet}, an immutable list of distinct keys with an
+    index of their positions. A layout maps keys to array positions and back
+    (as does a L{Universe}, the layout of a dense fuzzy set), and gives the
+    layout covering the keys of another operand of a binary operation.
+    """
+    def __init__(self, keys=()):
+        """\
+        Constructor.
+
+        @param keys: The distinct keys, in array order (optional).
+        @type keys: C{iterable}
+        """
+        self._keys = list(keys)
+        self._index = dict(zip(self._keys, range(len(self._keys))))
+        if len(self._index) != len(self._keys):
+            raise ValueError('keys must be unique')
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __getitem__(self, position):
+        return self._keys[position]
+
+    def __repr__(self):
+        """\
+        Return the canonical representation of the layout.
+
+        @rtype: C{str}
+        """
+        return '%s(%r)' % (self.__class__.__name__, self._keys)
+
+    def __eq__(self, other):
+        """\
+        Compare two layouts for equality of their keys in order.
+
+        @rtype: C{bool}
+        """
+        return self is other or (isinstance(other, KeyLayout) \
+                                 and self._keys == other._keys)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def index(self, key):
+        """\
+        Return the position of a key, raising a KeyError if it has none.
+
+        @param key: The key.
+        @type key: C{object}
+        @rtype: C{int}
+        """
+        return self._index[key]
+
+    def find(self, key):
+        """\
+        Return the position of a key, or -1 if it has none.
+
+        @param key: The key.
+        @type key: C{object}
+        @rtype: C{int}
+        """
+        return self._index.get(key, -1)
+
+    def covering(self, layout, mu):
+        """\
+        Return the layout of the keys of this layout followed by the keys of
+        another layout not in it.
+
+        @param layout: The other layout.
+        @type layout: C{object}
+        @param mu: The membership degrees over the other layout.
+        @type mu: C{numpy.ndarray}
+        @rtype: L{KeyLayout}
+        """
+        new = [key for key in layout if key not in self._index]
+        if not new:
+            return self
+        result = self.__class__.__new__(self.__class__)
+        result._keys = self._keys + new
+        result._index = self._index.copy()
+        result._index.update(zip(new, range(len(self._keys),
+                                            len(result._keys))))
+        return result
+
+
+def _scattered(source, mu, layout):
+    """\
+    Return membership degrees over one layout as an array over another, with
+    zero for keys missing from the source and dropping keys missing from the
+    target.
+
+    @param source: The layout of the membership degrees.
+    @type source: C{object}
+    @param mu: The membership degrees.
+    @type mu: C{numpy.ndarray}
+    @param layout: The target layout.
+    @type layout: C{object}
+    @rtype: C{numpy.ndarray}
+    """
+    if source is layout or source == layout:
+        return mu
+    positions = numpy.fromiter(map(layout.find, source), dtype=numpy.intp,
+                               count=len(source))
+    present = positions >= 0
+    result = numpy.zeros(len(layout))
+    result[positions[present]] = mu[present]
+    return result
+
+
+class ArrayMembership(object):
+    """\
+    Base class of the fuzzy sets whose membership degrees are stored in a
+    contiguous NumPy float64 array, C{_mu}, over a layout, C{_layout}, mapping
+    keys to array positions (see L{KeyLayout} and L{Universe}). It implements
+    the aggregates, cuts and vectorized operations; binary operations align
+    their operands through the layouts. Requires NumPy.
+    """
+    NORM_STANDARD = FuzzySet.NORM_STANDARD
+    NORM_ALGEBRAIC = FuzzySet.NORM_ALGEBRAIC
+    NORM_BOUNDED = FuzzySet.NORM_BOUNDED
+    NORM_DRASTIC = FuzzySet.NORM_DRASTIC
+
+    COMP_STANDARD = FuzzySet.COMP_STANDARD
+    COMP_YAGER = FuzzySet.COMP_YAGER
+
+    @classmethod
+    def _new(cls, layout, mu):
+        """\
+        Construct a fuzzy set from an already validated layout and array.
+
+        @param layout: The layout.
+        @type layout: C{object}
+        @param mu: The membership degree array.
+        @type mu: C{numpy.ndarray}
+        @rtype: L{ArrayMembership}
+        """
+        result = cls.__new__(cls)
+        result._layout = layout
+        result._mu = mu
+        return result
+
+    def copy(self):
+        """\
+        Return a copy of this fuzzy set.
+
+        @rtype: L{ArrayMembership}
+        """
+        return self._new(self._layout, self._mu.copy())
+
+    def __str__(self):
+        """\
+        String representation of the fuzzy set.
+
+        @return: String representation.
+        @rtype: C{str}
+        """
+        return ('%s([' % self.__class__.__name__) + ', '.join(['%s \\ %f' \
+            % (key, mu) for key, mu in self.items() if mu > 0]) + '])'
+
+    def __len__(self):
+        """\
+        Return the number of elements with non-zero membership.
+
+        @rtype: C{int}
+        """
+        return int(numpy.count_nonzero(self._mu))
+
+    def __contains__(self, key):
+        """\
+        Return whether an element has non-zero membership.
+
+        @rtype: C{bool}
+        """
+        return self.mu(key) > 0
+
+    def __iter__(self):
+        """\
+        Return an iterator over (unbound) fuzzy elements with non-zero
+        membership.
+
+        @rtype: C{iterator}
+        """
+        return (FuzzyElement._trusted(key, mu) for key, mu in self.items() \
+                if mu > 0)
+
+    def mu(self, key):
+        """\
+        Return the membership degree of the element specified by key. Returns
+        zero for any non-member element.
+
+        @return: The membership degree of the specified element.
+        @rtype: C{float}
+        """
+        try:
+            return float(self._mu[self._layout.index(key)])
+        except KeyError:
+            return 0.0
+
+    @property
+    def support(self):
+        """\
+        Support, the crisp set of all elements with non-zero membership.
+
+        @rtype: C{set}
+        """
+        return self.salpha(0.0)
+
+    @property
+    def kernel(self):
+        """\
+        Kernel, the crisp set of all elements with membership degree of exactly
+        1.
+
+        @rtype: C{set}
+        """
+        return self.alpha(1.0)
+
+    @property
+    def height(self):
+        """\
+        Height function. Returns the maximum membership degree, raising a
+        ValueError if no element has non-zero membership (as for
+        L{FuzzySet.height}).
+
+        @rtype: C{float}
+        """
+        height = float(self._mu.max()) if len(self._mu) else 0.0
+        if not height > 0:
+            raise ValueError('height of an empty fuzzy set')
+        return height
+
+    @property
+    def cardinality(self):
+        """\
+        Scalar cardinality, the sum of membership degrees of all elements.
+
+        @rtype: C{float}
+        """
+        return float(self._mu.sum())
+
+    def _cut(self, mask):
+        """\
+        Return the crisp set of keys selected by a boolean mask.
+
+        @param mask: The boolean mask over the array.
+        @type mask: C{numpy.ndarray}
+        @rtype: C{set}
+        """
+        layout = self._layout
+        return set([layout[i] for i in numpy.flatnonzero(mask).tolist()])
+
+    def alpha(self, alpha):
+        """\
+        Alpha cut function. Returns the crisp set of members whose membership
+        degrees meet or exceed the alpha value.
+
+        @param alpha: The alpha value for the cut in (0, 1].
+        @type alpha: C{float}
+        @return: The crisp set result of the alpha cut.
+        @rtype: C{set}
+        """
+        return self._cut((self._mu >= alpha) & (self._mu > 0))
+
+    def salpha(self, alpha):
+        """\
+        Strong alpha cut function. Returns the crisp set of members whose
+        membership degrees exceed the alpha value.
+
+        @param alpha: The alpha value for the cut in [0, 1].
+        @type alpha: C{float}
+        @return: The crisp set result of the strong alpha cut.
+        @rtype: C{set}
+        """
+        return self._cut(self._mu > alpha)
+
+    def normalize(self):
+        """\
+        Normalize the fuzzy set by scaling all membership degrees by a factor
+        such that the height equals 1. An empty fuzzy set is left unchanged.
+        """
+        if len(self):
+            numpy.minimum(self._mu * (1.0 / self.height), 1.0, out=self._mu)
+
+    @property
+    def normal(self):
+        """\
+        Returns whether the fuzzy set is normal (height = 1).
+
+        @rtype: C{bool}
+        """
+        return self.height == 1.0
+
+    # Binary fuzzy set operations
+
+    def _operand(self, other):
+        """\
+        Return the layout and membership degrees of the other argument to a
+        binary operation. Fuzzy sets with a layout of another kind are read
+        over a L{KeyLayout} of their items; any other type raises a
+        TypeError.
+
+        @param other: The other argument.
+        @type other: C{object}
+        @return: The layout and membership degree array.
+        @rtype: C{tuple}
+        """
+        if isinstance(other, ArrayMembership) \
+        and type(other._layout) is type(self._layout):
+            return other._layout, other._mu
+        if isinstance(other, (FuzzySet, ArrayMembership)):
+            keys, mus = [], []
+            for key, mu in other.items():
+                keys.append(key)
+                mus.append(mu)
+            return KeyLayout(keys), numpy.array(mus, dtype=numpy.float64)
+        raise TypeError('operation only permitted between fuzzy sets')
+
+    def _aligned(self, other):
+        """\
+        Align the membership degrees of this set and another operand over the
+        layout covering both.
+
+        @param other: The other operand.
+        @type other: C{object}
+        @return: The covering layout and both aligned arrays.
+        @rtype: C{tuple}
+        """
+        layout, mu = self._operand(other)
+        union = self._layout.covering(layout, mu)
+        a = self._mu
+        if union is not self._layout:
+            a = numpy.zeros(len(union))
+            a[:len(self._mu)] = self._mu
+        return union, a, _scattered(layout, mu, union)
+
+    def _restricted(self, other):
+        """\
+        Return the membership degrees of another operand over the layout of
+        this set.
+
+        @param other: The other operand.
+        @type other: C{object}
+        @rtype: C{numpy.ndarray}
+        """
+        layout, mu = self._operand(other)
+        return _scattered(layout, mu, self._layout)
+
+    def union(self, other, norm=0, **params):
+        """\
+        Return the fuzzy union of two fuzzy sets as a new fuzzy set.
+
+        t-Conorm Types:
+        0 - Standard Union
+        1 - Algebraic Sum
+        2 - Bounded Sum
+        3 - Drastic Union
+
+        Any t-conorm in L{TCONORMS} may also be given by name, with its
+        parameters as keyword arguments.
+
+        @param other: The other fuzzy set.
+        @type other: L{ArrayMembership}
+        @param norm: The t-conorm type or name to use.
+        @type norm: C{object}
+        @return: The fuzzy union.
+        @rtype: L{ArrayMembership}
+        """
+        tconorm = get_tconorm(norm)
+        layout, a, b = self._aligned(other)
+        return self._new(layout, tconorm.array(a, b, **params))
+
+    def intersection(self, other, norm=0, **params):
+        """\
+        Return the fuzzy intersection of two fuzzy sets as a new fuzzy set,
+        over the layout of this set.
+
+        t-Norm Types:
+        0 - Standard Intersection
+        1 - Algebraic Product
+        2 - Bounded Difference
+        3 - Drastic Intersection
+
+        Any t-norm in L{TNORMS} may also be given by name, with its
+        parameters as keyword arguments.
+
+        @param other: The other fuzzy set.
+        @type other: L{ArrayMembership}
+        @param norm: The t-norm type or name to use.
+        @type norm: C{object}
+        @return: The fuzzy intersection.
+        @rtype: L{ArrayMembership}
+        """
+        tnorm = get_tnorm(norm)
+        b = self._restricted(other)
+        return self._new(self._layout, tnorm.array(self._mu, b, **params))
+
+    __or__ = union
+    __and__ = intersection
+
+    def __eq__(self, other):
+        """\
+        Compare two fuzzy sets for equality. Fuzzy sets over different
+        universes, or with elements outside this set's universe, are unequal.
+
+        @param other: The other fuzzy set.
+        @type other: L{ArrayMembership}
+        @return: True if equal, false otherwise.
+        @rtype: C{bool}
+        """
+        try:
+            layout, a, b = self._aligned(other)
+        except ValueError:
+            return False
+        return bool(numpy.all(numpy.abs(a - b) <= 1e-10))
+
+    def __ne__(self, other):
+        """\
+        Compare two fuzzy sets for inequality.
+
+        @param other: The other fuzzy set.
+        @type other: L{ArrayMembership}
+        @return: True if not equal, false otherwise.
+        @rtype: C{bool}
+        """
+        return not self == other
+
+    __hash__ = None
+
+    def overlap(self, other):
+        """\
+        Return the degree of overlap of this fuzzy set on another fuzzy set.
+
+        @param other: The other fuzzy set.
+        @type other: L{ArrayMembership}
+        @return: The overlap in [0, 1] of this set on the other.
+        @rtype: C{float}
+        """
+        layout, mu = self._operand(other)
+        total = float(mu.sum())
+        if not total:
+            return 0.0
+        b = _scattered(layout, mu, self._layout)
+        return float(numpy.minimum(self._mu, b).sum()) / total
+
+    # Unary fuzzy set operations
+
+    def complement(self, comp=0, **kwargs):
+        """\
+        Return the complement of this fuzzy set.
+
+        @param comp: The complement type or name (optional, see
+            L{FuzzySet.complement}).
+        @type comp: C{object}
+        @return: The complement of this fuzzy set.
+        @rtype: L{ArrayMembership}
+        """
+        complement = get_complement(comp)
+        return self._new(self._layout, complement.array(self._mu, **kwargs))
+
+
+class ArrayFuzzySet(ArrayMembership):
+    """\
+    Array-backed discrete fuzzy set class. Membership degrees are stored in a
+    contiguous NumPy float64 array aligned to a list of keys (a
+    L{KeyLayout}), and set operations are computed as vectorized array
+    expressions. Requires NumPy.
+
+    Conversion to and from L{FuzzySet} is lossless, including elements with a
+    membership degree of zero.
+    """
+    def __init__(self, keys=(), mus=()):
+        """\
+        Construct an array-backed fuzzy set from parallel sequences of keys
+        and membership degrees.
+
+        @param keys: The keys of the elements (optional).
+        @type keys: C{iterable}
+        @param mus: The membership degrees of the elements (optional).
+        @type mus: C{iterable}
+        """
+        if numpy is None:
+            raise ImportError('ArrayFuzzySet requires NumPy')
+        self._layout = KeyLayout(keys)
+        self._mu = numpy.array(mus, dtype=numpy.float64).reshape(-1)
+        if len(self._mu) != len(self._layout):
+            raise ValueError('keys and mu values must have the same length')
+        if len(self._mu) and (self._mu.min() < 0 or self._mu.max() > 1):
+            raise ValueError('mu value must be in [0, 1]')
+
+    @classmethod
+    def from_fuzzy_set(cls, fset):
+        """\
+        Construct an array-backed fuzzy set from a fuzzy set.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet} or L{ArrayMembership}
+        @rtype: L{ArrayFuzzySet}
+        """
+        keys, mus = [], []
+        for key, mu in fset.items():
+            keys.append(key)
+            mus.append(mu)
+        return cls(keys, mus)
+
+    def to_fuzzy_set(self, storage=ObjectStorage):
+        """\
+        Convert this array-backed fuzzy set to a fuzzy set.
+
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
+        @rtype: L{FuzzySet}
+        """
+        return FuzzySet.from_arrays(list(self._layout), self._mu.tolist(),
+                                    storage=storage)
+
+    def __repr__(self):
+        """\
+        Return the canonical representation of an array-backed fuzzy set.
+
+        @return: Canonical representation.
+        @rtype: C{str}
+        """
+        return '%s(%r, %r)' % (self.__class__.__name__, list(self._layout),
+                               self._mu.tolist())
+
+    def keys(self):
+        """\
+        Return the list of keys (including those with a membership degree of
+        zero), in array order.
+
+        @rtype: C{list}
+        """
+        return list(self._layout)
+
+    def items(self):
+        """\
+        Return an iterator over (key, mu) pairs, in array order.
+
+        @rtype: C{iterator}
+        """
+        return zip(self._layout, self._mu.tolist())
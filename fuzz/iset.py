@@ -8,7 +8,15 @@ a dict.
 @license: LGPL-3
 """
 
+from array import array
 from copy import copy
+from itertools import islice
+from operator import attrgetter
+from weakref import ref
+try:
+    from collections.abc import ItemsView, KeysView, Mapping, ValuesView
+except ImportError:
+    from collections import ItemsView, KeysView, Mapping, ValuesView
 
 
 class IndexedMember(object):
@@ -17,7 +25,20 @@ class IndexedMember(object):
     properties but a special immutable property (called the index) which is
     used for hashing and equality, allowing it to be stored in a set or to be
     used as a dict key.
+
+    Members are slotted and cache the hash of their index, so subclasses
+    should declare C{__slots__} for any additional attributes. Attributes
+    listed in C{_columns} with an C{array} typecode are stored in typed arrays
+    by L{ArrayStorage}.
+
+    A member held by an indexed set refers back to it through C{_owner}, so
+    that subclasses can report changes to their attributes with
+    L{_changing}. Reporting a change also gives any other set sharing the
+    member a private copy of it first.
     """
+    __slots__ = ['_index', '_hash', '_owner']
+    _columns = ()
+
     def __init__(self, index):
         """\
         Constructor.
@@ -29,6 +50,69 @@ class IndexedMember(object):
         or not hasattr(type(index), '__eq__'):
             raise TypeError('index object must be immutable')
         self._index = index
+        self._hash = hash(index)
+        self._owner = None
+
+    @classmethod
+    def _trusted(cls, index):
+        """\
+        Construct a member without validating the index. Used by bulk loading.
+
+        @param index: The index object (immutable).
+        @type index: C{object}
+        @return: The new member.
+        @rtype: L{IndexedMember}
+        """
+        member = cls.__new__(cls)
+        member._index = index
+        member._hash = hash(index)
+        member._owner = None
+        return member
+
+    def __copy__(self):
+        """\
+        Return a shallow copy of this member.
+
+        @return: The copy.
+        @rtype: L{IndexedMember}
+        """
+        result = self.__class__.__new__(self.__class__)
+        result._index = self._index
+        result._hash = self._hash
+        result._owner = None
+        return result
+
+    def _changing(self, name, value):
+        """\
+        Notify the indexed set holding this member, if any, that an attribute
+        is about to be assigned a new value.
+
+        @param name: The attribute name.
+        @type name: C{str}
+        @param value: The new value.
+        @type value: C{object}
+        """
+        cell = self._owner
+        if not cell:
+            return
+        owner = cell[0] and cell[0]()
+        if cell[1] and (owner is None or owner._owned is not None \
+                        and self._index not in owner._owned):
+            _unshare(cell[1], [self])
+            if owner is not None:
+                owner._claimed(self._index)
+        if owner is not None:
+            owner._member_changed(self, name, getattr(self, name), value)
+
+    def __reduce__(self):
+        """\
+        Return pickling information. The cached hash is not pickled, since
+        hashes of some objects differ between interpreter processes.
+
+        @return: Callable and arguments to reconstruct the member.
+        @rtype: C{tuple}
+        """
+        return (self.__class__, (self._index,))
 
     @property
     def index(self):
@@ -64,7 +148,7 @@ class IndexedMember(object):
         @return: The index hash.
         @rtype: C{int}
         """
-        return hash(self.index)
+        return self._hash
 
     def __eq__(self, other):
         """\
@@ -86,24 +170,1051 @@ class IndexedMember(object):
         return not self == other
 
 
+class KeyPool(object):
+    """\
+    Key pool class. A key pool interns index objects, assigning each distinct
+    index a compact integer id. Indexed sets bound to the same pool share a
+    single canonical object for every index, so a large number of sets drawn
+    from a common vocabulary store each key only once, and keys of pool-mates
+    compare by identity.
+    """
+    def __init__(self, keys=()):
+        """\
+        Constructor.
+
+        @param keys: The keys to intern initially (optional).
+        @type keys: C{iterable}
+        """
+        self._ids = {}
+        self._keys = []
+        for key in keys:
+            self.intern(key)
+
+    def __len__(self):
+        """\
+        Return the number of keys in the pool.
+
+        @rtype: C{int}
+        """
+        return len(self._keys)
+
+    def __contains__(self, key):
+        """\
+        Return whether a key is in the pool.
+
+        @rtype: C{bool}
+        """
+        return key in self._ids
+
+    def __iter__(self):
+        """\
+        Return an iterator over the keys in the pool, in id order.
+
+        @rtype: C{iterator}
+        """
+        return iter(self._keys)
+
+    def __reduce__(self):
+        """\
+        Return pickling information.
+
+        @return: Callable and arguments to reconstruct the pool.
+        @rtype: C{tuple}
+        """
+        return (self.__class__, (self._keys,))
+
+    def intern(self, key):
+        """\
+        Return the canonical object for a key, adding it to the pool if it is
+        not yet present.
+
+        @param key: The key.
+        @type key: C{object}
+        @return: The canonical key object.
+        @rtype: C{object}
+        """
+        return self._keys[self.id(key)]
+
+    def id(self, key):
+        """\
+        Return the integer id of a key, adding it to the pool if it is not yet
+        present.
+
+        @param key: The key.
+        @type key: C{object}
+        @return: The id of the key.
+        @rtype: C{int}
+        """
+        try:
+            return self._ids[key]
+        except KeyError:
+            self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            return self._ids[key]
+
+    def key(self, id):
+        """\
+        Return the key with a given integer id.
+
+        @param id: The id of the key.
+        @type id: C{int}
+        @return: The canonical key object.
+        @rtype: C{object}
+        """
+        return self._keys[id]
+
+
+class ObjectStorage(dict):
+    """\
+    Object-per-member storage backend for indexed sets (the default). Maps
+    each index to its member object, and the builtin set table of the indexed
+    set holds the same member objects. Members may be shared between copies.
+    """
+    __slots__ = ['_itemcls', '_owner']
+    cow = True
+
+    def __init__(self, itemcls=IndexedMember):
+        """\
+        Constructor.
+
+        @param itemcls: The member class of the indexed set.
+        @type itemcls: C{type}
+        """
+        super(ObjectStorage, self).__init__()
+        self._itemcls = itemcls
+        self._owner = None
+
+    def fresh(self):
+        """\
+        Return a new empty storage for the same member class.
+
+        @rtype: L{ObjectStorage}
+        """
+        return self.__class__(self._itemcls)
+
+    def copy(self):
+        """\
+        Return a copy of this storage sharing the member objects.
+
+        @rtype: L{ObjectStorage}
+        """
+        result = self.fresh()
+        dict.update(result, self)
+        return result
+
+    @staticmethod
+    def entry(item):
+        """\
+        Return the object to hold in the builtin set table for an item.
+
+        @param item: The item.
+        @type item: L{IndexedMember}
+        @return: The item itself.
+        @rtype: L{IndexedMember}
+        """
+        return item
+
+    def entries(self):
+        """\
+        Return the objects to hold in the builtin set table.
+
+        @rtype: C{iterable}
+        """
+        return self.values()
+
+    def load(self, items):
+        """\
+        Insert items without copying them, making them refer to the owner of
+        this storage.
+
+        @param items: The items to insert.
+        @type items: C{iterable}
+        """
+        owner = self._owner
+        for item in items:
+            item._owner = owner
+            self[item._index] = item
+
+    def rebind(self, old):
+        """\
+        Take over the members handed out by the storage this one replaces.
+        Members are the stored objects themselves, so there is nothing to do.
+
+        @param old: The replaced storage.
+        @type old: L{ObjectStorage}
+        """
+        pass
+
+    def load_columns(self, keys, columns):
+        """\
+        Insert items constructed from a sequence of keys and one sequence of
+        values per column of the member class.
+
+        @param keys: The keys.
+        @type keys: C{iterable}
+        @param columns: The column values, in the order of C{_columns}.
+        @type columns: C{list}
+        """
+        self.load(map(self._itemcls._trusted, keys, *columns))
+
+    def column(self, name, keys=None, default=None):
+        """\
+        Return the values of a column attribute for a list of keys, in order.
+
+        @param name: The attribute name of the column.
+        @type name: C{str}
+        @param keys: The keys (optional, defaults to all keys in order).
+        @type keys: C{list}
+        @param default: The value for keys not present (optional).
+        @type default: C{object}
+        @return: The column values.
+        @rtype: C{list}
+        """
+        get = attrgetter(name)
+        if keys is None:
+            return list(map(get, self.values()))
+        return [default if item is None else get(item) \
+                for item in map(self.get, keys)]
+
+    def chunks(self, name, size=1 << 16):
+        """\
+        Iterate over the values of a column attribute in key order, as lists
+        of at most C{size} values.
+
+        @param name: The attribute name of the column.
+        @type name: C{str}
+        @param size: The maximum number of values per list (optional).
+        @type size: C{int}
+        @return: Iterator over lists of column values.
+        @rtype: C{iterator}
+        """
+        values = map(attrgetter(name), self.values())
+        return iter(lambda: list(islice(values, size)), [])
+
+
+def _column_property(name):
+    """\
+    Return a property reading and writing a column of an L{ArrayStorage} for
+    the member bound to it.
+
+    @param name: The attribute name of the column.
+    @type name: C{str}
+    @rtype: C{property}
+    """
+    def fget(self):
+        storage = self._storage
+        return storage._columns[name][storage._slots[self._index]]
+
+    def fset(self, value):
+        storage = self._storage
+        storage._columns[name][storage._slots[self._index]] = value
+
+    return property(fget, fset)
+
+
+def _bound_copy(self):
+    """\
+    Return an unbound copy of a member bound to an L{ArrayStorage}.
+
+    @rtype: L{IndexedMember}
+    """
+    return self._storage._detached(self._storage._slots[self._index])
+
+
+def _bound_owner(self):
+    """\
+    Return the owner reference of a member bound to an L{ArrayStorage}.
+
+    @rtype: C{list}
+    """
+    return self._storage._owner
+
+
+def _bound_reduce(self):
+    """\
+    Return pickling information for a member bound to an L{ArrayStorage}.
+
+    @rtype: C{tuple}
+    """
+    return _bound_copy(self).__reduce__()
+
+
+_bound_classes = {}
+
+
+def _bound_class(itemcls):
+    """\
+    Return the class of members bound to an L{ArrayStorage} for a member
+    class. Its column attributes read and write the storage arrays.
+
+    @param itemcls: The member class.
+    @type itemcls: C{type}
+    @rtype: C{type}
+    """
+    try:
+        return _bound_classes[itemcls]
+    except KeyError:
+        namespace = {'__slots__': ['_storage', '__weakref__'],
+                     '__copy__': _bound_copy,
+                     '__reduce__': _bound_reduce,
+                     '_owner': property(_bound_owner)}
+        for name, typecode in itemcls._columns:
+            namespace[name] = _column_property(name)
+        bound = type('Bound' + itemcls.__name__, (itemcls,), namespace)
+        _bound_classes[itemcls] = bound
+        return bound
+
+
+class ArrayStorage(object):
+    """\
+    Struct-of-arrays storage backend for indexed sets. Keeps a list of keys
+    and one typed C{array} per attribute named in the C{_columns} of the
+    member class, so no object is kept per member. Items handed out are
+    proxies bound to their key, and items put in are copied into the arrays.
+    The builtin set table of the indexed set holds the keys.
+
+    While a proxy is alive, the same proxy is handed out for its key. When
+    its key is removed, the proxy is detached into a storage of its own
+    holding the values it had, so it behaves like an independent member and
+    never refers to a member later added with the same key.
+    """
+    cow = False
+
+    def __init__(self, itemcls=IndexedMember):
+        """\
+        Constructor.
+
+        @param itemcls: The member class of the indexed set.
+        @type itemcls: C{type}
+        """
+        self._itemcls = itemcls
+        self._owner = None
+        self._bound = _bound_class(itemcls)
+        self._keys = []
+        self._slots = {}
+        self._columns = dict((name, array(typecode)) \
+                             for name, typecode in itemcls._columns)
+        self._handles = {}
+        self._limit = 64
+
+    def fresh(self):
+        """\
+        Return a new empty storage for the same member class.
+
+        @rtype: L{ArrayStorage}
+        """
+        return self.__class__(self._itemcls)
+
+    def copy(self):
+        """\
+        Return an independent copy of this storage.
+
+        @rtype: L{ArrayStorage}
+        """
+        result = self.fresh()
+        result._keys = self._keys[:]
+        result._slots = self._slots.copy()
+        result._columns = dict((name, column[:]) \
+                               for name, column in self._columns.items())
+        return result
+
+    @staticmethod
+    def entry(item):
+        """\
+        Return the object to hold in the builtin set table for an item.
+
+        @param item: The item.
+        @type item: L{IndexedMember}
+        @return: The index of the item.
+        @rtype: C{object}
+        """
+        return item.index
+
+    def entries(self):
+        """\
+        Return the objects to hold in the builtin set table.
+
+        @rtype: C{iterable}
+        """
+        return iter(self._keys)
+
+    def _bind(self, key):
+        """\
+        Return the member bound to the given (stored) key, reusing the live
+        proxy for it if there is one.
+
+        @param key: The stored key.
+        @type key: C{object}
+        @rtype: L{IndexedMember}
+        """
+        handle = self._handles.get(key)
+        member = None if handle is None else handle()
+        if member is None:
+            member = self._bound.__new__(self._bound)
+            member._index = key
+            member._hash = hash(key)
+            member._storage = self
+            self._handles[key] = ref(member)
+            if len(self._handles) > self._limit:
+                self._prune()
+        return member
+
+    def _prune(self):
+        """\
+        Drop the weak references to collected proxies, keeping the table of
+        live proxies at most about twice its live size.
+        """
+        self._handles = dict((key, handle) for key, handle \
+                             in self._handles.items() if handle() is not None)
+        self._limit = max(64, 2 * len(self._handles))
+
+    def _live(self, key):
+        """\
+        Remove and return the live proxy for a key, or C{None}.
+
+        @param key: The stored key.
+        @type key: C{object}
+        @rtype: L{IndexedMember}
+        """
+        handle = self._handles.pop(key, None)
+        return None if handle is None else handle()
+
+    def _detach(self, key, item):
+        """\
+        Detach the live proxy for a key being removed, if there is one, into
+        a storage of its own holding the values of the member.
+
+        @param key: The stored key.
+        @type key: C{object}
+        @param item: An unbound copy of the member.
+        @type item: L{IndexedMember}
+        """
+        member = self._live(key)
+        if member is not None:
+            holder = self.fresh()
+            holder[key] = item
+            member._storage = holder
+
+    def _detach_all(self):
+        """\
+        Detach all live proxies before the storage is cleared.
+        """
+        for key in list(self._handles):
+            self._detach(key, self._detached(self._slots[key]))
+        self._limit = 64
+
+    def rebind(self, old):
+        """\
+        Take over the live proxies of the storage this one replaces for the
+        keys it holds, and detach the others.
+
+        @param old: The replaced storage.
+        @type old: L{ArrayStorage}
+        """
+        for key in list(old._handles):
+            if key in self._slots:
+                member = old._live(key)
+                if member is not None:
+                    member._storage = self
+                    self._handles[key] = ref(member)
+            else:
+                old._detach(key, old._detached(old._slots[key]))
+
+    def _detached(self, slot):
+        """\
+        Return an unbound member holding the values stored in a slot.
+
+        @param slot: The slot position.
+        @type slot: C{int}
+        @rtype: L{IndexedMember}
+        """
+        return self._itemcls._trusted(self._keys[slot], \
+            *[self._columns[name][slot] \
+              for name, typecode in self._itemcls._columns])
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __getitem__(self, key):
+        return self._bind(self._keys[self._slots[key]])
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, item):
+        slot = self._slots.get(key)
+        if slot is None:
+            self._slots[item.index] = len(self._keys)
+            self._keys.append(item.index)
+            for name, column in self._columns.items():
+                column.append(getattr(item, name))
+        else:
+            for name, column in self._columns.items():
+                column[slot] = getattr(item, name)
+
+    def _delete(self, key):
+        """\
+        Remove a key, moving the last slot into its place.
+
+        @param key: The key.
+        @type key: C{object}
+        @return: An unbound copy of the removed member.
+        @rtype: L{IndexedMember}
+        """
+        slot = self._slots.pop(key)
+        item = self._detached(slot)
+        self._detach(key, item)
+        last = len(self._keys) - 1
+        if slot != last:
+            moved = self._keys[last]
+            self._keys[slot] = moved
+            self._slots[moved] = slot
+            for column in self._columns.values():
+                column[slot] = column[last]
+        self._keys.pop()
+        for column in self._columns.values():
+            column.pop()
+        return item
+
+    def pop(self, key, *default):
+        if key not in self._slots:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        return self._delete(key)
+
+    def popitem(self):
+        if not self._keys:
+            raise KeyError('popitem(): storage is empty')
+        key = self._keys[-1]
+        return key, self._delete(key)
+
+    def clear(self):
+        self._detach_all()
+        del self._keys[:]
+        self._slots.clear()
+        for column in self._columns.values():
+            del column[:]
+
+    def keys(self):
+        return KeysView(self)
+
+    def values(self):
+        return (self._bind(key) for key in self._keys)
+
+    def items(self):
+        return ((key, self._bind(key)) for key in self._keys)
+
+    def column(self, name, keys=None, default=None):
+        """\
+        Return the values of a column attribute for a list of keys, in order.
+
+        @param name: The attribute name of the column.
+        @type name: C{str}
+        @param keys: The keys (optional, defaults to all keys in order).
+        @type keys: C{list}
+        @param default: The value for keys not present (optional).
+        @type default: C{object}
+        @return: The column values.
+        @rtype: C{list}
+        """
+        column = self._columns[name]
+        if keys is None:
+            return column.tolist()
+        return [default if slot is None else column[slot] \
+                for slot in map(self._slots.get, keys)]
+
+    def chunks(self, name, size=1 << 16):
+        """\
+        Iterate over the values of a column attribute in key order, as lists
+        of at most C{size} values. Only one list is held at a time, so a
+        column that is a view of a buffer is never read into memory whole.
+
+        @param name: The attribute name of the column.
+        @type name: C{str}
+        @param size: The maximum number of values per list (optional).
+        @type size: C{int}
+        @return: Iterator over lists of column values.
+        @rtype: C{iterator}
+        """
+        column = self._columns[name]
+        for start in range(0, len(column), size):
+            yield column[start:start + size].tolist()
+
+    def load(self, items):
+        """\
+        Insert items, copying their column values into the arrays.
+
+        @param items: The items to insert.
+        @type items: C{iterable}
+        """
+        for item in items:
+            self[item.index] = item
+
+    def load_columns(self, keys, columns):
+        """\
+        Load an empty storage from a sequence of keys and one sequence of
+        values per column of the member class, without constructing members.
+
+        @param keys: The keys.
+        @type keys: C{iterable}
+        @param columns: The column values, in the order of C{_columns}.
+        @type columns: C{list}
+        """
+        keys = list(keys)
+        self._slots = dict(zip(keys, range(len(keys))))
+        if len(self._slots) < len(keys):
+            self._slots = {}
+            self.load(map(self._itemcls._trusted, keys, *columns))
+            return
+        self._keys = keys
+        for (name, typecode), values in zip(self._itemcls._columns, columns):
+            self._columns[name] = self._adopt(typecode, values)
+
+    @staticmethod
+    def _adopt(typecode, values):
+        """\
+        Return a column holding a sequence of values.
+
+        @param typecode: The array type code of the column.
+        @type typecode: C{str}
+        @param values: The values.
+        @type values: C{iterable}
+        @rtype: C{array}
+        """
+        return array(typecode, values)
+
+
+class MappedStorage(ArrayStorage):
+    """\
+    Struct-of-arrays storage backend whose columns may be typed views of a
+    buffer such as a memory-mapped file, adopted without copying when given
+    to L{load_columns} as C{memoryview} objects of the column type. Members
+    are read, and assigned in place, through the buffer; the columns are
+    copied into arrays the first time members are added or removed.
+    """
+    @staticmethod
+    def _adopt(typecode, values):
+        """\
+        Return a column holding a sequence of values, which is the sequence
+        itself if it is a C{memoryview} of the column type.
+
+        @param typecode: The array type code of the column.
+        @type typecode: C{str}
+        @param values: The values.
+        @type values: C{iterable}
+        @rtype: C{array} or C{memoryview}
+        """
+        if isinstance(values, memoryview) and values.format == typecode:
+            return values
+        return array(typecode, values)
+
+    @property
+    def mapped(self):
+        """\
+        Whether any column is still a view of a buffer.
+
+        @rtype: C{bool}
+        """
+        return any(isinstance(column, memoryview) \
+                   for column in self._columns.values())
+
+    def _materialize(self):
+        """\
+        Copy the columns that are views of a buffer into arrays.
+        """
+        for name, typecode in self._itemcls._columns:
+            column = self._columns[name]
+            if isinstance(column, memoryview):
+                self._columns[name] = array(typecode, column.tobytes())
+
+    def copy(self):
+        """\
+        Return an independent copy of this storage, whose columns are arrays.
+
+        @rtype: L{MappedStorage}
+        """
+        result = super(MappedStorage, self).copy()
+        result._materialize()
+        return result
+
+    def __setitem__(self, key, item):
+        if key not in self._slots:
+            self._materialize()
+        super(MappedStorage, self).__setitem__(key, item)
+
+    def _delete(self, key):
+        self._materialize()
+        return super(MappedStorage, self)._delete(key)
+
+    def clear(self):
+        self._detach_all()
+        for name, typecode in self._itemcls._columns:
+            self._columns[name] = array(typecode)
+        super(MappedStorage, self).clear()
+
+
+def _lookup(arg):
+    """\
+    Return a container supporting fast key containment tests for an operand
+    of the indexed set algebra, or C{None} if it has none.
+
+    @param arg: The operand.
+    @type arg: C{iterable}
+    @return: Container of the operand's keys.
+    @rtype: C{object}
+    """
+    if isinstance(arg, IndexedSet):
+        return arg._keymap
+    if isinstance(arg, (Mapping, KeysView, set, frozenset)):
+        return arg
+    return None
+
+
+def _unshare(sharers, items):
+    """\
+    Give each set in a list of sets sharing members a private copy of any of
+    the given members it still holds, and drop the collected sets from the
+    list.
+
+    @param sharers: Weak references to the sets sharing the members.
+    @type sharers: C{list}
+    @param items: The members.
+    @type items: C{list}
+    """
+    collected = False
+    for reference in sharers:
+        other = reference()
+        if other is None:
+            collected = True
+        elif other._cell[1] is not sharers:
+            get = other._keymap.get
+            for item in items:
+                if get(item._index) is item:
+                    other._privatize(item)
+    if collected:
+        sharers[:] = [reference for reference in sharers \
+                      if reference() is not None]
+
+
+def _aliases(iset, arg):
+    """\
+    Return whether an operand of the indexed set algebra is an indexed set
+    itself or a view backed by its key index.
+
+    @param iset: The indexed set.
+    @type iset: L{IndexedSet}
+    @param arg: The operand.
+    @type arg: C{iterable}
+    @rtype: C{bool}
+    """
+    if _lookup(arg) is iset._keymap:
+        return True
+    mapping = getattr(arg, '_mapping', None)
+    return mapping is iset or mapping is iset._keymap
+
+
+def _snapshot(arg):
+    """\
+    Return the (key, value) entries of an operand of the indexed set algebra,
+    materialized if the operand is a live view, which may be backed by the set
+    being updated.
+
+    @param arg: The operand.
+    @type arg: C{iterable}
+    @return: Iterable of (key, value) pairs.
+    @rtype: C{iterable}
+    """
+    if isinstance(arg, (KeysView, ItemsView, ValuesView)):
+        return list(_entries(arg))
+    return _entries(arg)
+
+
+def _entries(arg):
+    """\
+    Iterate over the (key, value) entries of an operand of the indexed set
+    algebra. Indexed sets yield their members as values, mappings and items
+    views yield their values, and other iterables yield members or plain keys
+    with a value of C{None}.
+
+    @param arg: The operand.
+    @type arg: C{iterable}
+    @return: Iterator over (key, value) pairs.
+    @rtype: C{iterator}
+    """
+    if isinstance(arg, IndexedSet):
+        return iter(arg._keymap.items())
+    if isinstance(arg, Mapping):
+        return iter(arg.items())
+    if isinstance(arg, ItemsView):
+        return iter(arg)
+    return ((item.index, item) if isinstance(item, IndexedMember) \
+            else (item, None) for item in arg)
+
+
+class IndexedSetItemsView(ItemsView):
+    """\
+    Live view of the (key, item) pairs of an indexed set.
+    """
+    def __contains__(self, item):
+        key, value = item
+        try:
+            return self._mapping._keymap[key] is value
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        for key in self._mapping._keymap:
+            yield (key, self._mapping._private(key))
+
+
+class IndexedSetValuesView(ValuesView):
+    """\
+    Live view of the items of an indexed set.
+    """
+    def __contains__(self, value):
+        return self._mapping._keymap.get(value) is value
+
+    def __iter__(self):
+        return iter(self._mapping)
+
+
 class IndexedSet(set):
     """\
     Indexed set class. This is a special type of set whose members are mutable
     objects with an immutable attribute. These overall-mutable members can then
     be accessed in dict style, using the index as key.
+
+    Members are kept by a storage backend, L{ObjectStorage} by default,
+    L{ArrayStorage} or L{MappedStorage}, which also serves as the key index.
+
+    With L{ObjectStorage}, copies share their member objects with the
+    original (copy-on-write). The C{_owned} attribute records which keys this
+    set may mutate in place (C{None} meaning all of them); any other member is
+    copied the first time it is handed out for possible mutation, unless this
+    set owns it, in which case the other sets holding it get the copies.
+
+    Members refer back to the set owning them through an owner reference,
+    C{_cell}, a list holding a weak reference to the set and a list of weak
+    references to the sets sharing its members, which outlives the set. The
+    C{_sources} attribute lists the sharer lists this set is in. Changing a
+    shared member through any reference, or removing it from its owner, first
+    gives the sets sharing it private copies, so no member handed out by one
+    set ever changes another. Subclasses keeping derived state up to date
+    override the hooks L{_added}, L{_removed}, L{_reloaded} and
+    L{_member_changed}.
     """
     _itemcls = IndexedMember
 
-    def __init__(self, iterable=set()):
+    def __init__(self, iterable=set(), pool=None, storage=ObjectStorage):
         """\
         Constructor.
 
         @param iterable: The iterable to intialize the set with.
         @type iterable: C{iterable}
+        @param pool: The key pool to intern indices in (optional).
+        @type pool: L{KeyPool}
+        @param storage: The storage backend class (optional).
+        @type storage: C{type}
         """
         super(IndexedSet, self).__init__()
-        for item in iterable:
-            self.add(item)
+        self._keymap = storage(self._itemcls)
+        self._owned = None
+        self._sources = None
+        self._pool = pool
+        self._cell = [ref(self), []]
+        self._keymap._owner = self._cell
+        self._reloaded()
+        self.update(iterable)
+
+    @property
+    def pool(self):
+        """\
+        The key pool this set interns its indices in, or C{None}.
+
+        @rtype: L{KeyPool}
+        """
+        return self._pool
+
+    @property
+    def storage(self):
+        """\
+        The storage backend class of this set.
+
+        @rtype: C{type}
+        """
+        return self._keymap.__class__
+
+    def _added(self, item):
+        """\
+        Hook called after an item has been added to the set.
+
+        @param item: The item added.
+        @type item: L{IndexedMember}
+        """
+        pass
+
+    def _removed(self, item):
+        """\
+        Hook called after an item has been removed from the set.
+
+        @param item: The item removed.
+        @type item: L{IndexedMember}
+        """
+        pass
+
+    def _reloaded(self):
+        """\
+        Hook called after the contents of the set have been replaced in bulk.
+        """
+        pass
+
+    def _member_changed(self, item, name, old, new):
+        """\
+        Hook called before an attribute of a member of the set is assigned.
+
+        @param item: The member.
+        @type item: L{IndexedMember}
+        @param name: The attribute name.
+        @type name: C{str}
+        @param old: The current value.
+        @type old: C{object}
+        @param new: The new value.
+        @type new: C{object}
+        """
+        pass
+
+    def _revoke(self):
+        """\
+        Detach all members handed out so far from this set, so that later
+        changes to them are no longer reported to it.
+        """
+        old = self._cell
+        self._cell = [ref(self), old[1]]
+        old[0] = old[1] = None
+        self._keymap._owner = self._cell
+
+    def _release(self, item):
+        """\
+        Detach an item removed from the set and report its removal. An item
+        owned by this set and still shared is first copied into the sets
+        sharing it, since references to it may outlive its removal.
+
+        @param item: The item removed.
+        @type item: L{IndexedMember}
+        """
+        if self._keymap.cow and item._owner is self._cell:
+            if self._owned is not None and item._index not in self._owned:
+                _unshare(self._cell[1], [item])
+            item._owner = None
+        self._removed(item)
+
+    def _disown(self, keys):
+        """\
+        Give the sets sharing members owned by this set private copies of
+        those indexed by the given keys, before they are removed in bulk.
+
+        @param keys: The indices of the members.
+        @type keys: C{iterable}
+        """
+        if self._owned is None or not self._cell[1]:
+            return
+        cell = self._cell
+        items = [self._keymap[key] for key in keys if key not in self._owned]
+        items = [item for item in items if item._owner is cell]
+        if items:
+            _unshare(cell[1], items)
+
+    def _claimed(self, key):
+        """\
+        Record that the member indexed by key is no longer shared.
+
+        @param key: The index of the member.
+        @type key: C{object}
+        """
+        self._owned.add(key)
+        if len(self._owned) == len(self._keymap):
+            self._owned = None
+            self._sources = None
+
+    def _privatize(self, item):
+        """\
+        Replace a member shared with other sets by a private copy.
+
+        @param item: The shared member.
+        @type item: L{IndexedMember}
+        @return: The private copy.
+        @rtype: L{IndexedMember}
+        """
+        private = copy(item)
+        private._owner = self._cell
+        self._keymap[item._index] = private
+        set.discard(self, item)
+        set.add(self, private)
+        if self._owned is not None:
+            self._claimed(item._index)
+        return private
+
+    def _register(self, other):
+        """\
+        Record that this set shares members of another set. They are owned by
+        the other set or by the sets it shares members of, so this set joins
+        the sharer lists of all of them.
+
+        @param other: The other indexed set.
+        @type other: L{IndexedSet}
+        """
+        sources = self._sources or []
+        for sharers in [other._cell[1]] + (other._sources or []):
+            if sharers is self._cell[1] \
+            or any(source is sharers for source in sources):
+                continue
+            sharers[:] = [reference for reference in sharers \
+                          if reference() is not None]
+            sharers.append(ref(self))
+            sources.append(sharers)
+        self._sources = sources
+
+    def _empty(self):
+        """\
+        Return a new empty set of the same class, bound to the same key pool
+        and using the same storage backend.
+
+        @return: The empty set.
+        @rtype: L{IndexedSet}
+        """
+        return self.__class__(pool=self._pool, storage=self._keymap.__class__)
+
+    def __iter__(self):
+        """\
+        Return an iterator over the items in the set.
+
+        @return: Iterator.
+        @rtype: C{iterator}
+        """
+        if self._owned is None:
+            return iter(self._keymap.values())
+        return (self._private(key) for key in self._keymap)
+
+    def __reduce__(self):
+        """\
+        Return pickling information. The key index is rebuilt by the
+        constructor rather than pickled alongside the members.
+
+        @return: Callable and arguments to reconstruct the set.
+        @rtype: C{tuple}
+        """
+        return (self.__class__, (list(self._keymap.values()), self._pool,
+                                 self._keymap.__class__))
 
     def __getitem__(self, key):
         """\
@@ -114,10 +1225,101 @@ class IndexedSet(set):
         @return: The matching item.
         @rtype: C{object}
         """
-        for item in self:
-            if item.index == key:
-                return item
-        raise KeyError(key)
+        return self._private(key)
+
+    def _private(self, key):
+        """\
+        Return the item indexed by key, first making sure that it is no longer
+        shared with another set: an item owned by this set is copied into the
+        sets sharing it, and any other item is replaced with a private copy.
+
+        @param key: The index of the item to get.
+        @type key: C{object}
+        @return: The matching item.
+        @rtype: C{object}
+        """
+        item = self._keymap[key]
+        if self._owned is not None and key not in self._owned:
+            if item._owner is self._cell:
+                _unshare(self._cell[1], [item])
+                self._claimed(key)
+            else:
+                item = self._privatize(item)
+        return item
+
+    def _elements(self):
+        """\
+        Return the items iteration yields, without un-sharing them. Callers
+        must not modify the items returned.
+
+        @return: Iterator over the items.
+        @rtype: C{iterator}
+        """
+        return iter(self._keymap.values())
+
+    def _members(self):
+        """\
+        Return the items in the set without un-sharing them. Callers must not
+        modify the items returned.
+
+        @return: View of the items in the set.
+        @rtype: C{dict_values}
+        """
+        return self._keymap.values()
+
+    def _load(self, items):
+        """\
+        Insert freshly constructed items into an empty set without copying
+        them. Later items replace earlier items with the same index.
+
+        @param items: The items to insert.
+        @type items: C{iterable}
+        """
+        if self._pool is not None:
+            items = list(items)
+            intern = self._pool.intern
+            for item in items:
+                item._index = intern(item._index)
+        self._keymap.load(items)
+        set.update(self, self._keymap.entries())
+        self._reloaded()
+
+    def _load_columns(self, keys, columns):
+        """\
+        Insert items given as a sequence of keys and one sequence of values
+        per column of the member class into an empty set, without validation.
+        Later items replace earlier items with the same index.
+
+        @param keys: The keys.
+        @type keys: C{iterable}
+        @param columns: The column values, in the order of C{_columns}.
+        @type columns: C{list}
+        """
+        if self._pool is not None:
+            keys = [self._pool.intern(key) for key in keys]
+        self._keymap.load_columns(keys, columns)
+        set.update(self, self._keymap.entries())
+        self._reloaded()
+
+    def _share(self, other):
+        """\
+        Share the members iteration over another indexed set yields which are
+        not already present in this one, without copying them. Both sets then
+        treat the members as shared.
+
+        @param other: The other indexed set.
+        @type other: L{IndexedSet}
+        """
+        other._owned = set()
+        if self._owned is None:
+            self._owned = set(self._keymap)
+        self._register(other)
+        for item in other._elements():
+            key = item._index
+            if key not in self._keymap:
+                set.add(self, item)
+                self._keymap[key] = item
+                self._added(item)
 
     def __setitem__(self, key, item):
         """\
@@ -132,39 +1334,165 @@ class IndexedSet(set):
         """
         if not item.index == key:
             raise ValueError('key does not match item index attribute')
-        if key in self:
-            self.remove(key)
-        set.add(self, item)
+        self.discard(key)
+        self._insert(item)
+
+    def _insert(self, item):
+        """\
+        Insert an item into the set and the key index without copying it. The
+        caller must ensure that no item with the same index is present.
+
+        @param item: The item to insert.
+        @type item: L{IndexedMember}
+        """
+        if self._pool is not None:
+            item._index = self._pool.intern(item._index)
+        if self._keymap.cow:
+            item._owner = self._cell
+        set.add(self, self._keymap.entry(item))
+        self._keymap[item.index] = item
+        if self._owned is not None:
+            self._owned.add(item.index)
+        self._added(item)
 
     def add(self, item, *args, **kwargs):
         """\
         Add an item to the set. Uses a copy since IndexedMembers have mutable
-        properties.
+        properties. Adding an item whose index is already present has no
+        effect.
 
         @param item: The item to add.
         @type item: L{IndexedMember}
         """
         if not isinstance(item, self._itemcls):
             item = self._itemcls(item, *args, **kwargs)
-        set.add(self, copy(item))
+        if item.index not in self._keymap:
+            self._insert(copy(item) if self._keymap.cow else item)
+
+    def remove(self, key):
+        """\
+        Remove the item indexed by key from the set, raising a KeyError if it
+        is not present.
+
+        @param key: The index of the item to remove.
+        @type key: C{object}
+        """
+        item = self._keymap.pop(key)
+        set.remove(self, key)
+        self._release(item)
+        if self._owned is not None:
+            self._owned.discard(key)
+
+    def discard(self, key):
+        """\
+        Remove the item indexed by key from the set if it is present.
+
+        @param key: The index of the item to remove.
+        @type key: C{object}
+        """
+        item = self._keymap.pop(key, None)
+        if item is not None:
+            set.remove(self, key)
+            self._release(item)
+            if self._owned is not None:
+                self._owned.discard(key)
+
+    def pop(self):
+        """\
+        Remove and return an arbitrary item from the set.
+
+        @return: The removed item.
+        @rtype: L{IndexedMember}
+        """
+        key, item = self._keymap.popitem()
+        set.remove(self, key)
+        foreign = item._owner is not self._cell
+        self._release(item)
+        if self._owned is not None:
+            if foreign and key not in self._owned:
+                item = copy(item)
+            self._owned.discard(key)
+        return item
+
+    def clear(self):
+        """\
+        Remove all items from the set.
+        """
+        self._disown(list(self._keymap))
+        set.clear(self)
+        self._keymap.clear()
+        self._owned = None
+        self._sources = None
+        self._revoke()
+        self._reloaded()
 
     def update(self, *args):
         """\
-        Update the set with the union of itself and other iterables.
+        Update the set with the union of itself and other iterables. Members
+        of other indexed sets are shared rather than copied.
         """
         for arg in args:
-            for item in arg:
-                self.add(item)
+            if isinstance(arg, IndexedSet) \
+            and issubclass(arg._itemcls, self._itemcls) \
+            and self._keymap.cow and arg._keymap.cow \
+            and (self._pool is None or arg._pool is self._pool):
+                self._share(arg)
+            else:
+                for item in arg:
+                    self.add(item)
+
+    def _add_entry(self, key, value):
+        """\
+        Add an item for a (key, value) entry of an operand of the set algebra.
+
+        @param key: The index of the item.
+        @type key: C{object}
+        @param value: The member, the attribute value to construct the member
+            with, or C{None} for a plain key.
+        @type value: C{object}
+        """
+        if value is None:
+            self.add(key)
+        elif isinstance(value, IndexedMember):
+            self.add(value)
+        else:
+            self.add(key, value)
 
     def intersection_update(self, *args):
         """\
         Update the set with the intersection of itself and other iterables.
+        Operands may be indexed sets, mappings, items views of (key, value)
+        pairs, or iterables of keys. Each operand is processed in time linear
+        in the smaller of it and this set.
         """
-        common = set()
-        common.update(args)
-        for item in self.keys():
-            if item not in common:
-                self.remove(item)
+        for arg in args:
+            other = _lookup(arg)
+            if other is None:
+                other = set(key for key, value in _entries(arg))
+            if len(other) < len(self._keymap):
+                items = [self._keymap.get(key) for key in other]
+                items = [item for item in items if item is not None]
+                if self._owned is not None:
+                    self._disown([key for key in self._keymap \
+                                  if key not in other])
+                foreign = [(item, item._owner) for item in items \
+                           if item._owner is not self._cell]
+                old = self._keymap
+                old._owner = None
+                self._keymap = old.fresh()
+                self._revoke()
+                self._keymap.load(items)
+                self._keymap.rebind(old)
+                for item, cell in foreign:
+                    item._owner = cell
+                set.clear(self)
+                set.update(self, self._keymap.entries())
+                if self._owned is not None:
+                    self._owned.intersection_update(self._keymap)
+                self._reloaded()
+            else:
+                for key in [key for key in self._keymap if key not in other]:
+                    self.remove(key)
 
     def difference(self, *args):
         """\
@@ -177,11 +1505,21 @@ class IndexedSet(set):
     def difference_update(self, *args):
         """\
         Update the set with the difference of itself and other iterables.
+        Operands are as for L{intersection_update}; each is processed in time
+        linear in the smaller of it and this set if it supports fast key
+        containment tests, and in its own size otherwise.
         """
-        common = set()
-        common.update(args)
-        for item in common:
-            self.discard(item)
+        for arg in args:
+            if _aliases(self, arg):
+                self.clear()
+                continue
+            other = _lookup(arg)
+            if other is not None and len(self._keymap) < len(other):
+                for key in [key for key in self._keymap if key in other]:
+                    self.remove(key)
+                continue
+            for key, value in _snapshot(arg):
+                self.discard(key)
 
     def symmetric_difference(self, *args):
         """\
@@ -193,31 +1531,125 @@ class IndexedSet(set):
 
     def symmetric_difference_update(self, *args):
         """\
-        Update the set with the symmetric difference of itself and other
-        iterables.
+        Update the set with the symmetric difference of itself and the union
+        of other iterables. Operands are as for L{intersection_update}; keys
+        missing from this set are added with the member or value given by the
+        operand.
         """
-        common = set()
-        common.update(args)
-        for item in common:
-            try:
-                self.remove(item)
-            except KeyError:
-                self.add(item)
+        if len(args) == 1 and _lookup(args[0]) is not None:
+            seen = None
+            if _aliases(self, args[0]):
+                self.clear()
+                return
+        else:
+            seen = set()
+        for arg in args:
+            for key, value in _snapshot(arg):
+                if seen is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                if key in self._keymap:
+                    self.remove(key)
+                else:
+                    self._add_entry(key, value)
+
+    def __ior__(self, other):
+        """\
+        In-place union, keeping the key index in sync.
+
+        @param other: The other iterable.
+        @type other: C{iterable}
+        @return: This set.
+        @rtype: L{IndexedSet}
+        """
+        self.update(other)
+        return self
+
+    def __iand__(self, other):
+        """\
+        In-place intersection, keeping the key index in sync.
+
+        @param other: The other iterable.
+        @type other: C{iterable}
+        @return: This set.
+        @rtype: L{IndexedSet}
+        """
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other):
+        """\
+        In-place difference, keeping the key index in sync.
+
+        @param other: The other iterable.
+        @type other: C{iterable}
+        @return: This set.
+        @rtype: L{IndexedSet}
+        """
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other):
+        """\
+        In-place symmetric difference, keeping the key index in sync.
+
+        @param other: The other iterable.
+        @type other: C{iterable}
+        @return: This set.
+        @rtype: L{IndexedSet}
+        """
+        self.symmetric_difference_update(other)
+        return self
 
     def copy(self):
         """\
-        Return a copy of the set with shallow copies of all members.
+        Return a copy of the set. With L{ObjectStorage}, the copy shares its
+        members with this set until either side hands one out for
+        modification, so only the references are copied; with L{ArrayStorage},
+        the arrays are copied.
+
+        @return: The copy.
+        @rtype: L{IndexedSet}
         """
-        return self.__class__(self)
+        result = self._empty()
+        set.update(result, self)
+        result._keymap = self._keymap.copy()
+        result._keymap._owner = result._cell
+        if self._keymap.cow:
+            result._owned = set()
+            self._owned = set()
+            result._register(self)
+        return result
 
     def keys(self):
         """\
-        Return a list of keys in the set.
+        Return a live view of the keys in the set. The view supports O(1)
+        containment tests and reflects later changes to the set; use
+        C{list(keys())} for a static list.
 
-        @return: List of keys in the set.
-        @rtype: C{list}
+        @return: View of the keys in the set.
+        @rtype: C{dict_keys}
+        """
+        return self._keymap.keys()
+
+    def items(self):
+        """\
+        Return a live view of the (key, item) pairs in the set.
+
+        @return: View of the (key, item) pairs in the set.
+        @rtype: L{IndexedSetItemsView}
+        """
+        return IndexedSetItemsView(self)
+
+    def values(self):
+        """\
+        Return a live view of the items in the set.
+
+        @return: View of the items in the set.
+        @rtype: L{IndexedSetValuesView}
         """
-        return [item.index for item in self]
+        return IndexedSetValuesView(self)
 
     def has_key(self, key):
         """\
@@ -228,4 +1660,4 @@ class IndexedSet(set):
         @return: True if a matching key exists, false otherwise.
         @rtype: C{bool}
         """
-        return key in self.keys()
+        return key in self._keymap
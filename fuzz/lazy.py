@@ -0,0 +1,339 @@
+"""\
+Lazy module. Contains the lazy fuzzy set expression class definition.
+
+@author: Aaron Mavrinac
+@organization: University of Windsor
+@contact: mavrin1@uwindsor.ca
+@license: LGPL-3
+"""
+
+from itertools import compress
+from math import fsum
+from operator import or_
+
+from .iset import IndexedSet
+from .norm import get_complement, get_tconorm, get_tnorm
+
+
+class FuzzyExpression(object):
+    """\
+    Lazy fuzzy set expression class. Operations on an expression build a
+    directed acyclic graph of operations over fuzzy sets (see
+    L{FuzzySet.lazy}) instead of computing intermediate fuzzy sets; the
+    complement and normalization of an expression are likewise views.
+
+    An expression is evaluated by L{evaluate}, L{alpha}, L{salpha},
+    L{cardinality} or iteration, over the union of the keys of its fuzzy
+    sets: each fuzzy set is read once into a column aligned to those keys,
+    and each operation computes one column from the columns of its operands
+    with the batch kernel of its norm, without building intermediate fuzzy
+    sets. Subexpressions shared within the graph are evaluated once, and
+    their columns released after their last use.
+    The result has the keys the equivalent eager operations would give.
+    Expressions are evaluated anew each time, so they reflect later changes
+    to their fuzzy sets.
+    """
+    def __init__(self, fset):
+        """\
+        Construct an expression consisting of a fuzzy set.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        """
+        if not isinstance(fset, IndexedSet) \
+        or ('_mu', 'd') not in fset._itemcls._columns:
+            raise TypeError('operation only permitted between fuzzy sets')
+        self._fset = fset
+        self._operation = None
+        self._operands = ()
+        self._norm = None
+        self._params = {}
+
+    @classmethod
+    def _node(cls, operation, operands, norm=None, params={}):
+        """\
+        Return an expression applying an operation to operand expressions.
+
+        @param operation: The operation name.
+        @type operation: C{str}
+        @param operands: The operand expressions.
+        @type operands: C{tuple}
+        @param norm: The norm of the operation, if any.
+        @type norm: L{Norm}
+        @param params: The parameters of the norm.
+        @type params: C{dict}
+        @rtype: L{FuzzyExpression}
+        """
+        node = cls.__new__(cls)
+        node._fset = None
+        node._operation = operation
+        node._operands = operands
+        node._norm = norm
+        node._params = params
+        return node
+
+    @classmethod
+    def _operand(cls, other):
+        """\
+        Return the other argument to a binary operation as an expression.
+
+        @param other: The other argument.
+        @type other: L{FuzzyExpression} or L{FuzzySet}
+        @rtype: L{FuzzyExpression}
+        """
+        if isinstance(other, FuzzyExpression):
+            return other
+        return cls(other)
+
+    def __repr__(self):
+        """\
+        Return the string representation of the expression.
+
+        @rtype: C{str}
+        """
+        if self._fset is not None:
+            return 'FuzzyExpression(<%s at %#x>)' \
+                % (self._fset.__class__.__name__, id(self._fset))
+        return '%s(%s)' % (self._operation,
+                           ', '.join([repr(operand) \
+                                      for operand in self._operands]))
+
+    # Operations
+
+    def union(self, other, norm=0, **params):
+        """\
+        Return the lazy fuzzy union with another expression or fuzzy set (see
+        L{FuzzySet.union}).
+
+        @param other: The other expression or fuzzy set.
+        @type other: L{FuzzyExpression} or L{FuzzySet}
+        @param norm: The t-conorm type or name to use (optional).
+        @type norm: C{object}
+        @rtype: L{FuzzyExpression}
+        """
+        return self._node('union', (self, self._operand(other)),
+                          get_tconorm(norm), params)
+
+    def intersection(self, other, norm=0, **params):
+        """\
+        Return the lazy fuzzy intersection with another expression or fuzzy
+        set (see L{FuzzySet.intersection}).
+
+        @param other: The other expression or fuzzy set.
+        @type other: L{FuzzyExpression} or L{FuzzySet}
+        @param norm: The t-norm type or name to use (optional).
+        @type norm: C{object}
+        @rtype: L{FuzzyExpression}
+        """
+        return self._node('intersection', (self, self._operand(other)),
+                          get_tnorm(norm), params)
+
+    def __or__(self, other):
+        try:
+            return self.union(other)
+        except TypeError:
+            return NotImplemented
+
+    def __ror__(self, other):
+        try:
+            return self._operand(other).union(self)
+        except TypeError:
+            return NotImplemented
+
+    def __and__(self, other):
+        try:
+            return self.intersection(other)
+        except TypeError:
+            return NotImplemented
+
+    def __rand__(self, other):
+        try:
+            return self._operand(other).intersection(self)
+        except TypeError:
+            return NotImplemented
+
+    def complement(self, comp=0, **params):
+        """\
+        Return a view of the complement of the expression (see
+        L{FuzzySet.complement}).
+
+        @param comp: The complement type or name (optional).
+        @type comp: C{object}
+        @rtype: L{FuzzyExpression}
+        """
+        return self._node('complement', (self,), get_complement(comp), params)
+
+    def normalize(self):
+        """\
+        Return a view of the expression normalized to a height of 1 (see
+        L{FuzzySet.normalize}).
+
+        @rtype: L{FuzzyExpression}
+        """
+        return self._node('normalize', (self,))
+
+    # Evaluation
+
+    def _graph(self):
+        """\
+        Return the distinct fuzzy sets of the expression, the distinct nodes
+        of the graph in topological order (operands first), and the number of
+        uses of each node. The graph is walked with an explicit stack, so
+        arbitrarily deep expressions may be evaluated.
+
+        @return: The fuzzy sets, nodes, and uses by node id.
+        @rtype: C{tuple}
+        """
+        sets = []
+        order = []
+        uses = {}
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            ident = node._ident()
+            uses[ident] = uses.get(ident, 0) + 1
+            if uses[ident] > 1:
+                continue
+            if node._fset is not None:
+                sets.append(node._fset)
+            stack.append((node, True))
+            stack.extend([(operand, False) \
+                          for operand in reversed(node._operands)])
+        return sets, order, uses
+
+    def _ident(self):
+        """\
+        Return the identity of the node for sharing: that of its fuzzy set
+        for a fuzzy set, so that the same set is read only once.
+
+        @rtype: C{int}
+        """
+        if self._fset is not None:
+            return id(self._fset)
+        return id(self)
+
+    def _columns(self):
+        """\
+        Evaluate the expression over the union of the keys of its fuzzy sets.
+
+        @return: The fuzzy sets, the keys, and the aligned presence flags and
+            membership degrees of the result.
+        @rtype: C{tuple}
+        """
+        sets, order, uses = self._graph()
+        keys = list(sets[0]._keymap)
+        if len(sets) > 1:
+            seen = set(keys)
+            for fset in sets[1:]:
+                new = [key for key in fset._keymap if key not in seen]
+                keys.extend(new)
+                seen.update(new)
+        memo = {}
+        for node in order:
+            operands = [memo[operand._ident()] for operand in node._operands]
+            memo[node._ident()] = node._compute(keys, operands)
+            for operand in node._operands:
+                ident = operand._ident()
+                uses[ident] -= 1
+                if not uses[ident]:
+                    del memo[ident]
+        return (sets, keys) + memo[self._ident()]
+
+    def _compute(self, keys, operands):
+        """\
+        Compute a node of the graph over a list of keys from the results of
+        its operands. Membership degrees of absent keys are zero.
+
+        @param keys: The keys.
+        @type keys: C{list}
+        @param operands: The presence flags and membership degrees of the
+            operands.
+        @type operands: C{list}
+        @return: The presence flags and membership degrees of the keys.
+        @rtype: C{tuple}
+        """
+        if self._fset is not None:
+            keymap = self._fset._keymap
+            if len(keymap) == len(keys):
+                return [True] * len(keys), keymap.column('_mu', keys, 0.0)
+            return ([key in keymap for key in keys],
+                    keymap.column('_mu', keys, 0.0))
+        present, mus = operands[0]
+        if self._operation == 'union':
+            other_present, other_mus = operands[1]
+            return (list(map(or_, present, other_present)),
+                    self._norm.batch(mus, other_mus, **self._params))
+        if self._operation == 'intersection':
+            return present, self._norm.batch(mus, operands[1][1],
+                                             **self._params)
+        if self._operation == 'complement':
+            return present, [mu if flag else 0.0 for flag, mu \
+                             in zip(present, self._norm.batch(
+                                 mus, **self._params))]
+        height = max(mus) if mus else 0.0
+        if height > 0:
+            scale = 1.0 / height
+            mus = [min(mu * scale, 1.0) for mu in mus]
+        return present, mus
+
+    def evaluate(self):
+        """\
+        Evaluate the expression to a new fuzzy set, of the class and storage
+        of one of its fuzzy sets.
+
+        @return: The result.
+        @rtype: L{FuzzySet}
+        """
+        sets, keys, present, mus = self._columns()
+        result = sets[0]._empty()
+        result._load_columns(list(compress(keys, present)),
+                             [list(compress(mus, present))])
+        return result
+
+    def alpha(self, alpha):
+        """\
+        Evaluate the alpha cut of the expression (see L{FuzzySet.alpha}).
+
+        @param alpha: The alpha value for the cut in (0, 1].
+        @type alpha: C{float}
+        @return: The crisp set result of the alpha cut.
+        @rtype: C{set}
+        """
+        sets, keys, present, mus = self._columns()
+        return set(compress(keys, [mu >= alpha and mu > 0 for mu in mus]))
+
+    def salpha(self, alpha):
+        """\
+        Evaluate the strong alpha cut of the expression (see
+        L{FuzzySet.salpha}).
+
+        @param alpha: The alpha value for the cut in [0, 1].
+        @type alpha: C{float}
+        @return: The crisp set result of the strong alpha cut.
+        @rtype: C{set}
+        """
+        sets, keys, present, mus = self._columns()
+        return set(compress(keys, [mu > alpha for mu in mus]))
+
+    @property
+    def cardinality(self):
+        """\
+        Evaluate the scalar cardinality of the expression.
+
+        @rtype: C{float}
+        """
+        sets, keys, present, mus = self._columns()
+        return fsum(mus)
+
+    def __iter__(self):
+        """\
+        Evaluate the expression and iterate over the elements of the result
+        with non-zero membership.
+
+        @return: Iterator.
+        @rtype: C{iterator}
+        """
+        return iter(self.evaluate())
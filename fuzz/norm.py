@@ -0,0 +1,462 @@
+"""\
+Norm module. Contains the registries of fuzzy set operators: t-norms (fuzzy
+intersections), t-conorms (fuzzy unions) and fuzzy complements.
+
+@author: Aaron Mavrinac
+@organization: University of Windsor
+@contact: mavrin1@uwindsor.ca
+@license: LGPL-3
+"""
+
+from math import log
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Norm(object):
+    """\
+    Fuzzy set operator class. A norm maps membership degrees (two for t-norms
+    and t-conorms, one for complements) and optional keyword parameters to a
+    membership degree.
+
+    Each norm has a scalar kernel, and optionally a batch kernel mapping
+    aligned lists of membership degrees to a list of results and an array
+    kernel doing the same for NumPy arrays. Missing batch and array kernels
+    are derived from the scalar and batch kernels respectively.
+    """
+    def __init__(self, name, scalar, batch=None, array=None, check=None):
+        """\
+        Constructor.
+
+        @param name: The registry name of the norm.
+        @type name: C{str}
+        @param scalar: The scalar kernel.
+        @type scalar: C{function}
+        @param batch: The batch kernel (optional).
+        @type batch: C{function}
+        @param array: The NumPy array kernel (optional).
+        @type array: C{function}
+        @param check: Function validating the parameters, raising ValueError
+            for invalid values (optional).
+        @type check: C{function}
+        """
+        self.name = name
+        self._scalar = scalar
+        self._batch = batch
+        self._array = array
+        self._check = check
+
+    def __repr__(self):
+        """\
+        Return the canonical string representation of the norm.
+
+        @rtype: C{str}
+        """
+        return 'Norm(%r)' % self.name
+
+    def __call__(self, *mus, **params):
+        """\
+        Apply the norm to membership degrees.
+
+        @return: The resulting membership degree.
+        @rtype: C{float}
+        """
+        if self._check:
+            self._check(**params)
+        return self._scalar(*mus, **params)
+
+    def batch(self, *columns, **params):
+        """\
+        Apply the norm to aligned lists of membership degrees.
+
+        @return: The list of resulting membership degrees.
+        @rtype: C{list}
+        """
+        if self._check:
+            self._check(**params)
+        return self._apply(columns, params)
+
+    def array(self, *arrays, **params):
+        """\
+        Apply the norm to aligned (or broadcastable) NumPy arrays of
+        membership degrees.
+
+        @return: The array of resulting membership degrees.
+        @rtype: C{numpy.ndarray}
+        """
+        if self._check:
+            self._check(**params)
+        if self._array is None:
+            arrays = numpy.broadcast_arrays(*arrays)
+            return numpy.array(self._apply([mus.ravel().tolist() \
+                                            for mus in arrays], params),
+                               dtype=numpy.float64).reshape(arrays[0].shape)
+        return self._array(*arrays, **params)
+
+    def _apply(self, columns, params):
+        """\
+        Apply the batch kernel, or the scalar kernel element by element.
+        """
+        if self._batch is None:
+            scalar = self._scalar
+            return [scalar(*mus, **params) for mus in zip(*columns)]
+        return self._batch(*columns, **params)
+
+
+TNORMS = {}
+TCONORMS = {}
+COMPLEMENTS = {}
+
+# Registry names of the norm type integers used by FuzzySet.
+TNORM_TYPES = ('standard', 'algebraic', 'bounded', 'drastic')
+TCONORM_TYPES = ('standard', 'algebraic', 'bounded', 'drastic')
+COMPLEMENT_TYPES = ('standard', 'yager')
+
+
+def register(registry, norm):
+    """\
+    Add a norm to a registry (L{TNORMS}, L{TCONORMS} or L{COMPLEMENTS}) under
+    its name, replacing any norm of the same name.
+
+    @param registry: The registry.
+    @type registry: C{dict}
+    @param norm: The norm.
+    @type norm: L{Norm}
+    @return: The norm.
+    @rtype: L{Norm}
+    """
+    registry[norm.name] = norm
+    return norm
+
+
+def _get(registry, types, norm, kind):
+    """\
+    Resolve a norm given as a L{Norm}, a registry name or a type integer.
+    """
+    if isinstance(norm, Norm):
+        return norm
+    if isinstance(norm, int):
+        norm = types[norm] if 0 <= norm < len(types) else None
+    try:
+        return registry[norm]
+    except (KeyError, TypeError):
+        raise ValueError('invalid %s type' % kind)
+
+
+def get_tnorm(norm):
+    """\
+    Return a t-norm given as a L{Norm}, a name in L{TNORMS} or a type integer.
+
+    @param norm: The t-norm.
+    @type norm: C{object}
+    @rtype: L{Norm}
+    """
+    return _get(TNORMS, TNORM_TYPES, norm, 't-norm')
+
+
+def get_tconorm(norm):
+    """\
+    Return a t-conorm given as a L{Norm}, a name in L{TCONORMS} or a type
+    integer.
+
+    @param norm: The t-conorm.
+    @type norm: C{object}
+    @rtype: L{Norm}
+    """
+    return _get(TCONORMS, TCONORM_TYPES, norm, 't-conorm')
+
+
+def get_complement(comp):
+    """\
+    Return a complement given as a L{Norm}, a name in L{COMPLEMENTS} or a type
+    integer.
+
+    @param comp: The complement.
+    @type comp: C{object}
+    @rtype: L{Norm}
+    """
+    return _get(COMPLEMENTS, COMPLEMENT_TYPES, comp, 'complement')
+
+
+def _param(params, name):
+    """\
+    Return a required parameter, raising a TypeError if it is missing.
+    """
+    try:
+        return params[name]
+    except KeyError:
+        raise TypeError('norm requires parameter %s' % name)
+
+
+def _positive(name):
+    """\
+    Return a parameter check requiring a positive parameter.
+    """
+    def check(**params):
+        if not _param(params, name) > 0:
+            raise ValueError('%s must be positive' % name)
+    return check
+
+
+def _nonnegative(name):
+    """\
+    Return a parameter check requiring a non-negative parameter.
+    """
+    def check(**params):
+        if not _param(params, name) >= 0:
+            raise ValueError('%s must be non-negative' % name)
+    return check
+
+
+# Standard (minimum and maximum)
+
+register(TNORMS, Norm('standard', min,
+    lambda a, b: list(map(min, a, b)),
+    lambda a, b: numpy.minimum(a, b)))
+register(TCONORMS, Norm('standard', max,
+    lambda a, b: list(map(max, a, b)),
+    lambda a, b: numpy.maximum(a, b)))
+
+# Algebraic (product and probabilistic sum)
+
+register(TNORMS, Norm('algebraic', lambda a, b: a * b,
+    lambda a, b: [x * y for x, y in zip(a, b)],
+    lambda a, b: a * b))
+register(TCONORMS, Norm('algebraic', lambda a, b: a + b - a * b,
+    lambda a, b: [x + y - x * y for x, y in zip(a, b)],
+    lambda a, b: a + b - a * b))
+
+# Bounded (Lukasiewicz)
+
+register(TNORMS, Norm('bounded', lambda a, b: max(0.0, a + b - 1.0),
+    lambda a, b: [max(0.0, x + y - 1.0) for x, y in zip(a, b)],
+    lambda a, b: numpy.maximum(0.0, a + b - 1.0)))
+register(TCONORMS, Norm('bounded', lambda a, b: min(1.0, a + b),
+    lambda a, b: [min(1.0, x + y) for x, y in zip(a, b)],
+    lambda a, b: numpy.minimum(1.0, a + b)))
+
+# Drastic
+
+
+def _drastic_tnorm(a, b):
+    return b if a == 1.0 else (a if b == 1.0 else 0.0)
+
+
+def _drastic_tconorm(a, b):
+    return b if a == 0.0 else (a if b == 0.0 else 1.0)
+
+
+register(TNORMS, Norm('drastic', _drastic_tnorm,
+    lambda a, b: list(map(_drastic_tnorm, a, b)),
+    lambda a, b: numpy.where(a == 1, b, numpy.where(b == 1, a, 0.0))))
+register(TCONORMS, Norm('drastic', _drastic_tconorm,
+    lambda a, b: list(map(_drastic_tconorm, a, b)),
+    lambda a, b: numpy.where(a == 0, b, numpy.where(b == 0, a, 1.0))))
+
+# Einstein
+
+
+def _einstein_tnorm(a, b):
+    return a * b / (2.0 - (a + b - a * b))
+
+
+def _einstein_tconorm(a, b):
+    return (a + b) / (1.0 + a * b)
+
+
+register(TNORMS, Norm('einstein', _einstein_tnorm,
+    lambda a, b: list(map(_einstein_tnorm, a, b)), _einstein_tnorm))
+register(TCONORMS, Norm('einstein', _einstein_tconorm,
+    lambda a, b: list(map(_einstein_tconorm, a, b)), _einstein_tconorm))
+
+# Hamacher (gamma >= 0; gamma = 1 is the algebraic norm, gamma = 2 Einstein)
+
+
+def _hamacher_tnorm(a, b, gamma):
+    if a == 0.0 and b == 0.0:
+        return 0.0
+    return a * b / (gamma + (1.0 - gamma) * (a + b - a * b))
+
+
+def _hamacher_tconorm(a, b, gamma):
+    if a == 1.0 and b == 1.0:
+        return 1.0
+    return (a + b + (gamma - 2.0) * a * b) / (1.0 + (gamma - 1.0) * a * b)
+
+
+def _hamacher_tnorm_batch(a, b, gamma):
+    k = 1.0 - gamma
+    return [x * y / (gamma + k * (x + y - x * y)) if x or y else 0.0 \
+            for x, y in zip(a, b)]
+
+
+def _hamacher_tconorm_batch(a, b, gamma):
+    k, m = gamma - 2.0, gamma - 1.0
+    return [1.0 if x == 1.0 and y == 1.0 \
+            else (x + y + k * x * y) / (1.0 + m * x * y) \
+            for x, y in zip(a, b)]
+
+
+def _hamacher_tnorm_array(a, b, gamma):
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mu = a * b / (gamma + (1.0 - gamma) * (a + b - a * b))
+    return numpy.where((a == 0) & (b == 0), 0.0, mu)
+
+
+def _hamacher_tconorm_array(a, b, gamma):
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mu = (a + b + (gamma - 2.0) * a * b) / (1.0 + (gamma - 1.0) * a * b)
+    return numpy.where((a == 1) & (b == 1), 1.0, mu)
+
+
+register(TNORMS, Norm('hamacher', _hamacher_tnorm, _hamacher_tnorm_batch,
+    _hamacher_tnorm_array, _nonnegative('gamma')))
+register(TCONORMS, Norm('hamacher', _hamacher_tconorm, _hamacher_tconorm_batch,
+    _hamacher_tconorm_array, _nonnegative('gamma')))
+
+# Yager (w > 0)
+
+
+def _yager_tnorm_batch(a, b, w):
+    k = 1.0 / w
+    return [max(0.0, 1.0 - ((1.0 - x) ** w + (1.0 - y) ** w) ** k) \
+            for x, y in zip(a, b)]
+
+
+def _yager_tconorm_batch(a, b, w):
+    k = 1.0 / w
+    return [min(1.0, (x ** w + y ** w) ** k) for x, y in zip(a, b)]
+
+
+register(TNORMS, Norm('yager',
+    lambda a, b, w: max(0.0, 1.0 - ((1.0 - a) ** w + (1.0 - b) ** w) \
+                                   ** (1.0 / w)),
+    _yager_tnorm_batch,
+    lambda a, b, w: numpy.maximum(0.0, 1.0 - ((1.0 - a) ** w \
+                                  + (1.0 - b) ** w) ** (1.0 / w)),
+    _positive('w')))
+register(TCONORMS, Norm('yager',
+    lambda a, b, w: min(1.0, (a ** w + b ** w) ** (1.0 / w)),
+    _yager_tconorm_batch,
+    lambda a, b, w: numpy.minimum(1.0, (a ** w + b ** w) ** (1.0 / w)),
+    _positive('w')))
+
+# Frank (s > 0; s = 1 is the algebraic norm)
+
+
+def _frank_tnorm(a, b, s):
+    if s == 1.0:
+        return a * b
+    return log(1.0 + (s ** a - 1.0) * (s ** b - 1.0) / (s - 1.0)) / log(s)
+
+
+def _frank_tconorm(a, b, s):
+    return 1.0 - _frank_tnorm(1.0 - a, 1.0 - b, s)
+
+
+def _frank_tnorm_batch(a, b, s):
+    if s == 1.0:
+        return [x * y for x, y in zip(a, b)]
+    k, m = s - 1.0, log(s)
+    return [log(1.0 + (s ** x - 1.0) * (s ** y - 1.0) / k) / m \
+            for x, y in zip(a, b)]
+
+
+def _frank_tconorm_batch(a, b, s):
+    return [1.0 - mu for mu in _frank_tnorm_batch([1.0 - x for x in a],
+                                                  [1.0 - y for y in b], s)]
+
+
+def _frank_tnorm_array(a, b, s):
+    if s == 1.0:
+        return a * b
+    return numpy.log(1.0 + (s ** a - 1.0) * (s ** b - 1.0) / (s - 1.0)) \
+        / log(s)
+
+
+def _frank_tconorm_array(a, b, s):
+    return 1.0 - _frank_tnorm_array(1.0 - a, 1.0 - b, s)
+
+
+register(TNORMS, Norm('frank', _frank_tnorm, _frank_tnorm_batch,
+    _frank_tnorm_array, _positive('s')))
+register(TCONORMS, Norm('frank', _frank_tconorm, _frank_tconorm_batch,
+    _frank_tconorm_array, _positive('s')))
+
+# Dombi (lam > 0)
+
+
+def _dombi_tnorm(a, b, lam):
+    if a == 0.0 or b == 0.0:
+        return 0.0
+    return 1.0 / (1.0 + (((1.0 - a) / a) ** lam + ((1.0 - b) / b) ** lam) \
+                  ** (1.0 / lam))
+
+
+def _dombi_tconorm(a, b, lam):
+    if a == 1.0 or b == 1.0:
+        return 1.0
+    if a == 0.0 and b == 0.0:
+        return 0.0
+    return 1.0 / (1.0 + ((a / (1.0 - a)) ** lam + (b / (1.0 - b)) ** lam) \
+                  ** (-1.0 / lam))
+
+
+def _dombi_tnorm_batch(a, b, lam):
+    k = 1.0 / lam
+    return [1.0 / (1.0 + (((1.0 - x) / x) ** lam + ((1.0 - y) / y) ** lam) \
+                   ** k) if x and y else 0.0 for x, y in zip(a, b)]
+
+
+def _dombi_tconorm_batch(a, b, lam):
+    k = -1.0 / lam
+    return [1.0 if x == 1.0 or y == 1.0 else (0.0 if not (x or y) \
+            else 1.0 / (1.0 + ((x / (1.0 - x)) ** lam \
+                               + (y / (1.0 - y)) ** lam) ** k)) \
+            for x, y in zip(a, b)]
+
+
+def _dombi_tnorm_array(a, b, lam):
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mu = 1.0 / (1.0 + (((1.0 - a) / a) ** lam \
+                           + ((1.0 - b) / b) ** lam) ** (1.0 / lam))
+    return numpy.where((a == 0) | (b == 0), 0.0, mu)
+
+
+def _dombi_tconorm_array(a, b, lam):
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mu = 1.0 / (1.0 + ((a / (1.0 - a)) ** lam \
+                           + (b / (1.0 - b)) ** lam) ** (-1.0 / lam))
+    return numpy.where((a == 1) | (b == 1), 1.0,
+                       numpy.where((a == 0) & (b == 0), 0.0, mu))
+
+
+register(TNORMS, Norm('dombi', _dombi_tnorm, _dombi_tnorm_batch,
+    _dombi_tnorm_array, _positive('lam')))
+register(TCONORMS, Norm('dombi', _dombi_tconorm, _dombi_tconorm_batch,
+    _dombi_tconorm_array, _positive('lam')))
+
+# Complements
+
+
+def _check_sugeno(**params):
+    if not _param(params, 'lam') > -1:
+        raise ValueError('lam must be greater than -1')
+
+
+register(COMPLEMENTS, Norm('standard', lambda a: 1.0 - a,
+    lambda a: [1.0 - x for x in a],
+    lambda a: 1.0 - a))
+register(COMPLEMENTS, Norm('yager',
+    lambda a, w: (1.0 - a ** w) ** (1.0 / w),
+    lambda a, w: [(1.0 - x ** w) ** (1.0 / w) for x in a],
+    lambda a, w: (1.0 - a ** w) ** (1.0 / w),
+    _positive('w')))
+register(COMPLEMENTS, Norm('sugeno',
+    lambda a, lam: (1.0 - a) / (1.0 + lam * a),
+    lambda a, lam: [(1.0 - x) / (1.0 + lam * x) for x in a],
+    lambda a, lam: (1.0 - a) / (1.0 + lam * a),
+    _check_sugeno))
@@ -0,0 +1,309 @@
+"""\
+Parallel module. Contains an executor running fuzzy set operations on very
+large fuzzy sets in shards across a pool of worker processes.
+
+@author: Aaron Mavrinac
+@organization: University of Windsor
+@contact: mavrin1@uwindsor.ca
+@license: LGPL-3
+"""
+
+from array import array
+from multiprocessing import cpu_count
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+
+from .fset import FuzzySet
+from .norm import COMPLEMENTS, TCONORMS, TNORMS, get_complement, \
+    get_tconorm, get_tnorm
+
+
+def _portable(norm, registry):
+    """\
+    Return a norm in a form that can be sent to a worker process: its name
+    if it is registered, since the kernels of the built-in norms cannot be
+    pickled, or the norm itself otherwise.
+
+    @param norm: The norm.
+    @type norm: L{Norm}
+    @param registry: The registry of the norm.
+    @type registry: C{dict}
+    @rtype: C{object}
+    """
+    if registry.get(norm.name) is norm:
+        return norm.name
+    return norm
+
+
+def _union_shard(keys, mus, other_keys, other_mus, norm, params):
+    """\
+    Compute the fuzzy union of one shard of two fuzzy sets.
+
+    @return: The keys and membership degrees of the shard of the union.
+    @rtype: C{tuple}
+    """
+    degrees = dict(zip(keys, mus))
+    other = dict(zip(other_keys, other_mus))
+    keys = keys + [key for key in other_keys if key not in degrees]
+    return keys, array('d', get_tconorm(norm).batch(
+        [degrees.get(key, 0.0) for key in keys],
+        [other.get(key, 0.0) for key in keys], **params))
+
+
+def _intersection_shard(keys, mus, other_keys, other_mus, norm, params):
+    """\
+    Compute the fuzzy intersection of one shard of two fuzzy sets.
+
+    @return: The keys and membership degrees of the shard of the
+        intersection.
+    @rtype: C{tuple}
+    """
+    other = dict(zip(other_keys, other_mus))
+    return keys, array('d', get_tnorm(norm).batch(
+        mus.tolist(), [other.get(key, 0.0) for key in keys], **params))
+
+
+def _complement_shard(keys, mus, norm, params):
+    """\
+    Compute the complement of one shard of a fuzzy set.
+
+    @return: The keys and membership degrees of the shard of the complement.
+    @rtype: C{tuple}
+    """
+    return keys, array('d', get_complement(norm).batch(mus.tolist(),
+                                                       **params))
+
+
+def _alpha_shard(keys, mus, alpha, strong):
+    """\
+    Compute the (strong) alpha cut of one shard of a fuzzy set.
+
+    @return: The keys of the shard of the alpha cut.
+    @rtype: C{list}
+    """
+    if strong:
+        return [key for key, mu in zip(keys, mus) if mu > alpha]
+    return [key for key, mu in zip(keys, mus) if mu >= alpha and mu > 0]
+
+
+class ShardedExecutor(object):
+    """\
+    Executor of fuzzy set operations in shards across a process pool. The
+    operands are partitioned by key hash, so that the elements with the same
+    key in both operands of a binary operation fall in the same shard, and
+    each shard is sent to a worker as a list of keys and an array of
+    membership degrees rather than as element objects. The shards of the
+    result are reassembled in bulk.
+
+    Registered norms are sent to the workers by name, so norms registered at
+    run time are only available to them with the C{fork} start method. The
+    pool is started on first use and shut down by L{shutdown} or on leaving
+    a C{with} block.
+    """
+    def __init__(self, workers=None, chunk=1 << 20):
+        """\
+        Constructor.
+
+        @param workers: The number of worker processes (optional, defaults
+            to the number of processors).
+        @type workers: C{int}
+        @param chunk: The maximum number of elements per shard (optional).
+        @type chunk: C{int}
+        """
+        if ProcessPoolExecutor is None:
+            raise ImportError('ShardedExecutor requires concurrent.futures')
+        if chunk < 1:
+            raise ValueError('chunk size must be positive')
+        self.workers = workers or cpu_count()
+        self.chunk = chunk
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def shutdown(self):
+        """\
+        Shut down the process pool, if it has been started.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _count(self, size):
+        """\
+        Return the number of shards for a number of elements: one if they
+        fit in a single shard, and otherwise at least one per worker.
+
+        @param size: The number of elements.
+        @type size: C{int}
+        @rtype: C{int}
+        """
+        if size <= self.chunk:
+            return 1
+        return max(self.workers, -(-size // self.chunk))
+
+    @staticmethod
+    def _partition(fset, count):
+        """\
+        Partition the elements of a fuzzy set by key hash, in a single pass
+        over its key and membership degree columns.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @param count: The number of shards.
+        @type count: C{int}
+        @return: The list of keys and array of membership degrees per shard.
+        @rtype: C{list}
+        """
+        if count == 1:
+            return [(list(fset._keymap),
+                     array('d', fset._keymap.column('_mu')))]
+        shards = [([], array('d')) for i in range(count)]
+        appends = [(keys.append, mus.append) for keys, mus in shards]
+        for keys, mus in fset._chunks():
+            for key, mu in zip(keys, mus):
+                append_key, append_mu = appends[hash(key) % count]
+                append_key(key)
+                append_mu(mu)
+        return shards
+
+    @staticmethod
+    def _chunks(fset, count):
+        """\
+        Partition the elements of a fuzzy set into contiguous shards.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @param count: The number of shards.
+        @type count: C{int}
+        @return: The list of keys and array of membership degrees per shard.
+        @rtype: C{list}
+        """
+        keys = list(fset._keymap)
+        mus = array('d', fset._keymap.column('_mu'))
+        size = -(-len(keys) // count) or 1
+        return [(keys[i:i + size], mus[i:i + size]) \
+                for i in range(0, max(len(keys), 1), size)]
+
+    def _run(self, function, shards, *args):
+        """\
+        Apply a shard function to each shard, in the pool unless there is a
+        single shard.
+
+        @return: The results per shard.
+        @rtype: C{list}
+        """
+        if len(shards) == 1:
+            return [function(*(shards[0] + args))]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        futures = [self._pool.submit(function, *(shard + args)) \
+                   for shard in shards]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _assemble(fset, results):
+        """\
+        Reassemble the shards of a fuzzy set operation result.
+
+        @param fset: A fuzzy set of the result class.
+        @type fset: L{FuzzySet}
+        @param results: The keys and membership degrees per shard.
+        @type results: C{list}
+        @return: The result.
+        @rtype: L{FuzzySet}
+        """
+        keys = []
+        mus = array('d')
+        for shard_keys, shard_mus in results:
+            keys.extend(shard_keys)
+            mus.extend(shard_mus)
+        result = fset._empty()
+        result._load_columns(keys, [mus])
+        return result
+
+    def _binary(self, function, a, b, norm, params):
+        """\
+        Apply a binary shard function to hash partitions of two fuzzy sets.
+        """
+        FuzzySet._binary_sanity_check(a)
+        FuzzySet._binary_sanity_check(b)
+        count = self._count(len(a._keymap) + len(b._keymap))
+        shards = [first + second for first, second \
+                  in zip(self._partition(a, count), self._partition(b, count))]
+        return self._assemble(a, self._run(function, shards, norm, params))
+
+    def union(self, a, b, norm=0, **params):
+        """\
+        Return the fuzzy union of two fuzzy sets (see L{FuzzySet.union}).
+
+        @param a: The first fuzzy set.
+        @type a: L{FuzzySet}
+        @param b: The second fuzzy set.
+        @type b: L{FuzzySet}
+        @param norm: The t-conorm type or name to use (optional).
+        @type norm: C{object}
+        @return: The fuzzy union.
+        @rtype: L{FuzzySet}
+        """
+        norm = _portable(get_tconorm(norm), TCONORMS)
+        return self._binary(_union_shard, a, b, norm, params)
+
+    def intersection(self, a, b, norm=0, **params):
+        """\
+        Return the fuzzy intersection of two fuzzy sets (see
+        L{FuzzySet.intersection}).
+
+        @param a: The first fuzzy set.
+        @type a: L{FuzzySet}
+        @param b: The second fuzzy set.
+        @type b: L{FuzzySet}
+        @param norm: The t-norm type or name to use (optional).
+        @type norm: C{object}
+        @return: The fuzzy intersection.
+        @rtype: L{FuzzySet}
+        """
+        norm = _portable(get_tnorm(norm), TNORMS)
+        return self._binary(_intersection_shard, a, b, norm, params)
+
+    def complement(self, fset, comp=0, **params):
+        """\
+        Return the complement of a fuzzy set (see L{FuzzySet.complement}).
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @param comp: The complement type or name to use (optional).
+        @type comp: C{object}
+        @return: The complement.
+        @rtype: L{FuzzySet}
+        """
+        comp = _portable(get_complement(comp), COMPLEMENTS)
+        shards = self._chunks(fset, self._count(len(fset._keymap)))
+        return self._assemble(fset, self._run(_complement_shard, shards,
+                                              comp, params))
+
+    def alpha(self, fset, alpha, strong=False):
+        """\
+        Return the (strong) alpha cut of a fuzzy set (see L{FuzzySet.alpha}
+        and L{FuzzySet.salpha}).
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @param alpha: The alpha value for the cut.
+        @type alpha: C{float}
+        @param strong: Whether to take the strong alpha cut (optional).
+        @type strong: C{bool}
+        @return: The crisp set result of the alpha cut.
+        @rtype: C{set}
+        """
+        shards = self._chunks(fset, self._count(len(fset._keymap)))
+        result = set()
+        for keys in self._run(_alpha_shard, shards, alpha, strong):
+            result.update(keys)
+        return result
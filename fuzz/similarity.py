@@ -0,0 +1,421 @@
+"""\
+Similarity module. Contains fuzzy set similarity measures and a weighted
+MinHash index for finding similar fuzzy sets in large collections.
+
+@author: Aaron Mavrinac
+@organization: University of Windsor
+@contact: mavrin1@uwindsor.ca
+@license: LGPL-3
+"""
+
+from collections import OrderedDict
+from heapq import nlargest
+from math import floor, fsum, log
+from random import Random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _degrees(fset):
+    """\
+    Return a dict of the non-zero membership degrees of a fuzzy set.
+    """
+    return dict((key, mu) for key, mu in fset.items() if mu > 0)
+
+
+def jaccard(a, b):
+    """\
+    Return the fuzzy Jaccard similarity of two fuzzy sets, the sum of the
+    minimum over the sum of the maximum membership degrees of each element.
+    Two empty sets have a similarity of 1.
+
+    @param a: The first fuzzy set.
+    @type a: L{FuzzySet}
+    @param b: The second fuzzy set.
+    @type b: L{FuzzySet}
+    @return: The similarity in [0, 1].
+    @rtype: C{float}
+    """
+    a, b = _degrees(a), _degrees(b)
+    keys = set(a)
+    keys.update(b)
+    lower = [a.get(key, 0.0) for key in keys]
+    upper = [b.get(key, 0.0) for key in keys]
+    union = fsum(map(max, lower, upper))
+    if not union:
+        return 1.0
+    return fsum(map(min, lower, upper)) / union
+
+
+class MinHashIndex(object):
+    """\
+    Weighted MinHash index of fuzzy sets. Each fuzzy set is summarized by a
+    signature of C{bands * rows} samples drawn by improved consistent
+    weighted sampling, such that two sets agree on each sample with
+    probability equal to their fuzzy Jaccard similarity (see L{jaccard}).
+    Signatures are split into bands hashed into buckets (locality-sensitive
+    hashing), so a query only examines the sets sharing a bucket with it.
+
+    The per-key random draws are derived from the seed and the C{repr} of
+    the key, so signatures of the same seed are comparable across processes
+    for keys with a stable representation. The draws of the most recently
+    used keys are cached, up to a fixed number of keys, and recomputed after
+    eviction. Signatures are computed with NumPy if it is available.
+    """
+    def __init__(self, bands=16, rows=4, seed=0, cache=4096):
+        """\
+        Constructor.
+
+        @param bands: The number of LSH bands.
+        @type bands: C{int}
+        @param rows: The number of samples per band.
+        @type rows: C{int}
+        @param seed: The random seed for the samples.
+        @type seed: C{int}
+        @param cache: The maximum number of keys whose random draws are
+            cached (optional).
+        @type cache: C{int}
+        """
+        if bands < 1 or rows < 1:
+            raise ValueError('bands and rows must be positive')
+        if cache < 0:
+            raise ValueError('cache size must be non-negative')
+        self.bands = bands
+        self.rows = rows
+        self.seed = seed
+        self.cache = cache
+        self._draws = OrderedDict()
+        self._signatures = {}
+        self._buckets = [{} for band in range(bands)]
+
+    def __len__(self):
+        """\
+        Return the number of fuzzy sets in the index.
+
+        @rtype: C{int}
+        """
+        return len(self._signatures)
+
+    def __contains__(self, id):
+        """\
+        Return whether a fuzzy set is indexed under an id.
+
+        @rtype: C{bool}
+        """
+        return id in self._signatures
+
+    def _draw(self, key):
+        """\
+        Return the random draws for a key: for each sample, the rate of its
+        Gamma(2, 1) grid, the logarithm of its Gamma(2, 1) scale and its
+        uniform offset.
+
+        @param key: The key.
+        @type key: C{object}
+        @rtype: C{tuple}
+        """
+        cached = self._draws
+        draws = cached.pop(key, None)
+        if draws is None:
+            rng = Random('%d:%r' % (self.seed, key))
+            size = self.bands * self.rows
+            draws = ([rng.gammavariate(2.0, 1.0) for i in range(size)],
+                     [log(rng.gammavariate(2.0, 1.0)) for i in range(size)],
+                     [rng.random() for i in range(size)])
+            if self.cache and len(cached) >= self.cache:
+                cached.popitem(last=False)
+        if self.cache:
+            cached[key] = draws
+        return draws
+
+    def signature(self, fset):
+        """\
+        Return the weighted MinHash signature of a fuzzy set, a tuple of
+        (key, level) samples.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @return: The signature.
+        @rtype: C{tuple}
+        """
+        size = self.bands * self.rows
+        degrees = _degrees(fset)
+        if not degrees:
+            return ((None, 0),) * size
+        keys = list(degrees)
+        draws = [self._draw(key) for key in keys]
+        if numpy is not None:
+            r = numpy.array([draw[0] for draw in draws])
+            lnc = numpy.array([draw[1] for draw in draws])
+            beta = numpy.array([draw[2] for draw in draws])
+            lnmu = numpy.log(numpy.array([degrees[key] for key in keys]))
+            t = numpy.floor(lnmu[:, None] / r + beta)
+            best = numpy.argmin(lnc - r * (t - beta + 1.0), axis=0)
+            levels = t[best, numpy.arange(size)].astype(int).tolist()
+            return tuple(zip([keys[i] for i in best.tolist()], levels))
+        lnmus = [log(degrees[key]) for key in keys]
+        samples = []
+        for i in range(size):
+            best = None
+            for key, lnmu, (r, lnc, beta) in zip(keys, lnmus, draws):
+                t = floor(lnmu / r[i] + beta[i])
+                lna = lnc[i] - r[i] * (t - beta[i] + 1.0)
+                if best is None or lna < best[0]:
+                    best = (lna, key, int(t))
+            samples.append(best[1:])
+        return tuple(samples)
+
+    def _bands(self, signature):
+        """\
+        Return the bucket hash of each band of a signature.
+        """
+        rows = self.rows
+        return [hash(signature[band * rows:(band + 1) * rows]) \
+                for band in range(self.bands)]
+
+    def insert(self, id, fset):
+        """\
+        Add a fuzzy set to the index under an id, replacing any set already
+        indexed under it.
+
+        @param id: The id of the fuzzy set.
+        @type id: C{object}
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        """
+        if id in self._signatures:
+            self.remove(id)
+        signature = self.signature(fset)
+        self._signatures[id] = signature
+        for buckets, bucket in zip(self._buckets, self._bands(signature)):
+            buckets.setdefault(bucket, set()).add(id)
+
+    def remove(self, id):
+        """\
+        Remove the fuzzy set indexed under an id, raising a KeyError if there
+        is none.
+
+        @param id: The id of the fuzzy set.
+        @type id: C{object}
+        """
+        signature = self._signatures.pop(id)
+        for buckets, bucket in zip(self._buckets, self._bands(signature)):
+            ids = buckets[bucket]
+            ids.discard(id)
+            if not ids:
+                del buckets[bucket]
+
+    def candidates(self, fset):
+        """\
+        Return the ids of the indexed fuzzy sets sharing at least one bucket
+        with a fuzzy set.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @return: The candidate ids.
+        @rtype: C{set}
+        """
+        return self._candidates(self.signature(fset))
+
+    def _candidates(self, signature):
+        """\
+        Return the ids sharing at least one bucket with a signature.
+        """
+        result = set()
+        for buckets, bucket in zip(self._buckets, self._bands(signature)):
+            result.update(buckets.get(bucket, ()))
+        return result
+
+    def similarity(self, id, fset):
+        """\
+        Return the estimated fuzzy Jaccard similarity of an indexed fuzzy set
+        and another fuzzy set, the fraction of their signatures that agree.
+
+        @param id: The id of the indexed fuzzy set.
+        @type id: C{object}
+        @param fset: The other fuzzy set.
+        @type fset: L{FuzzySet}
+        @rtype: C{float}
+        """
+        return self._agreement(self._signatures[id], self.signature(fset))
+
+    @staticmethod
+    def _agreement(a, b):
+        """\
+        Return the fraction of samples on which two signatures agree.
+        """
+        return sum([x == y for x, y in zip(a, b)]) / float(len(a))
+
+    def query(self, fset, k=10):
+        """\
+        Return the k candidates most similar to a fuzzy set, by estimated
+        fuzzy Jaccard similarity. Only the sets sharing a bucket with the
+        query are examined.
+
+        @param fset: The fuzzy set.
+        @type fset: L{FuzzySet}
+        @param k: The maximum number of results.
+        @type k: C{int}
+        @return: List of (id, similarity) pairs, most similar first.
+        @rtype: C{list}
+        """
+        signature = self.signature(fset)
+        scored = [(self._agreement(self._signatures[id], signature), i, id) \
+                  for i, id in enumerate(self._candidates(signature))]
+        return [(id, score) for score, i, id in nlargest(k, scored)]
+
+
+class PairwiseSimilarity(object):
+    """\
+    Pairwise similarity of a collection of fuzzy sets. The non-zero membership
+    degrees of the sets are kept in compressed rows over a common key space,
+    and the sums of pairwise minimum membership degrees, from which the
+    overlap, fuzzy Jaccard and subsethood matrices all follow, are computed in
+    blocks. Each block densifies only its own rows and key columns, so memory
+    beyond the input and the N x N results is bounded by the block size.
+    Requires NumPy.
+    """
+    def __init__(self, sets, block=1 << 22):
+        """\
+        Constructor.
+
+        @param sets: The fuzzy sets.
+        @type sets: C{iterable}
+        @param block: The maximum number of elements of temporary arrays.
+        @type block: C{int}
+        """
+        if numpy is None:
+            raise ImportError('PairwiseSimilarity requires NumPy')
+        columns = {}
+        bounds = [0]
+        indices = []
+        data = []
+        for fset in sets:
+            degrees = _degrees(fset)
+            indices.extend(columns.setdefault(key, len(columns)) \
+                           for key in degrees)
+            data.extend(degrees.values())
+            bounds.append(len(data))
+        self.keys = [None] * len(columns)
+        for key, column in columns.items():
+            self.keys[column] = key
+        bounds = numpy.array(bounds, dtype=numpy.intp)
+        self._bounds = bounds
+        self._rows = numpy.repeat(numpy.arange(len(bounds) - 1),
+                                  numpy.diff(bounds))
+        self._columns = numpy.array(indices, dtype=numpy.intp)
+        self._data = numpy.array(data, dtype=numpy.float64)
+        self.cardinality = numpy.bincount(self._rows, weights=self._data,
+                                          minlength=len(bounds) - 1)
+        self.block = block
+        self._minimum = None
+
+    def __len__(self):
+        """\
+        Return the number of fuzzy sets.
+
+        @rtype: C{int}
+        """
+        return len(self._bounds) - 1
+
+    def _chunked(self, chunk):
+        """\
+        Return the chunk size and the non-zero membership degrees sorted by
+        key column chunk, then by set, with the sort key of each.
+        """
+        order = self._columns // chunk * len(self) + self._rows
+        sort = numpy.argsort(order, kind='stable')
+        return chunk, order[sort], self._rows[sort], self._columns[sort], \
+            self._data[sort]
+
+    def _dense(self, chunked, first, last, low, high):
+        """\
+        Return the dense membership matrix of a range of sets over a chunk of
+        key columns, from the sorted membership degrees.
+        """
+        chunk, order, rows, columns, data = chunked
+        base = low // chunk * len(self)
+        start, stop = numpy.searchsorted(order, [base + first, base + last])
+        result = numpy.zeros((last - first, high - low))
+        result[rows[start:stop] - first, columns[start:stop] - low] = \
+            data[start:stop]
+        return result
+
+    def intersections(self):
+        """\
+        Return the matrix of the cardinalities of the (standard) fuzzy
+        intersections of each pair of sets.
+
+        @return: Symmetric N x N matrix.
+        @rtype: C{numpy.ndarray}
+        """
+        if self._minimum is None:
+            n, k = len(self), len(self.keys)
+            chunk = max(1, min(k, int(self.block ** 0.5)))
+            size = max(1, int((self.block // chunk) ** 0.5))
+            chunked = self._chunked(chunk)
+            result = numpy.zeros((n, n))
+            for i in range(0, n, size):
+                last = min(n, i + size)
+                for c in range(0, k, chunk):
+                    high = min(k, c + chunk)
+                    left = self._dense(chunked, i, last, c, high)
+                    for j in range(i, n, size):
+                        right = left if j == i else \
+                            self._dense(chunked, j, min(n, j + size), c, high)
+                        result[i:last, j:j + size] += numpy.minimum(
+                            left[:, None, :], right[None, :, :]).sum(axis=2)
+                for j in range(i + size, n, size):
+                    result[j:j + size, i:last] = result[i:last, j:j + size].T
+            self._minimum = result
+        return self._minimum
+
+    def overlap(self):
+        """\
+        Return the overlap matrix, whose entry (i, j) is the degree of overlap
+        of set i on set j as given by L{FuzzySet.overlap}.
+
+        @return: N x N matrix.
+        @rtype: C{numpy.ndarray}
+        """
+        return self._ratio(self.intersections(), self.cardinality[None, :],
+                           0.0)
+
+    def subsethood(self):
+        """\
+        Return the subsethood matrix, whose entry (i, j) is the degree to
+        which set i is a subset of set j, the cardinality of their
+        intersection over that of set i (1 if set i is empty).
+
+        @return: N x N matrix.
+        @rtype: C{numpy.ndarray}
+        """
+        return self._ratio(self.intersections(), self.cardinality[:, None],
+                           1.0)
+
+    def jaccard(self):
+        """\
+        Return the fuzzy Jaccard similarity matrix (see L{jaccard}).
+
+        @return: Symmetric N x N matrix.
+        @rtype: C{numpy.ndarray}
+        """
+        minimum = self.intersections()
+        maximum = self.cardinality[:, None] + self.cardinality[None, :] \
+            - minimum
+        return self._ratio(minimum, maximum, 1.0)
+
+    @staticmethod
+    def _ratio(numerator, denominator, default):
+        """\
+        Divide elementwise, giving a default value where the denominator is
+        zero.
+        """
+        denominator = numpy.broadcast_to(denominator, numerator.shape)
+        result = numpy.full(numerator.shape, default)
+        numpy.divide(numerator, denominator, out=result,
+                     where=denominator > 0)
+        return result
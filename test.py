@@ -11,17 +11,27 @@ breaking things in another.
 @license: GPL-3
 """
 
+import copy
+import os
+import pickle
+import tempfile
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import fuzz
 print('FuzzPy imported from "%s"' % fuzz.__path__[0])
 
 
 class TestFuzzySet(unittest.TestCase):
+    storage = fuzz.ObjectStorage
 
     def setUp(self):
-        self.A = fuzz.FuzzySet()
-        self.B = fuzz.FuzzySet()
+        self.A = fuzz.FuzzySet(storage=self.storage)
+        self.B = fuzz.FuzzySet(storage=self.storage)
         self.A.add('a', 1.0)
         self.A.add('b', 0.5)
         self.A.add('c', 0.8)
@@ -30,6 +40,15 @@ class TestFuzzySet(unittest.TestCase):
         self.B.add('d', 0.6)
         self.B.add('e', 0.0)
 
+    def test_bulk_constructors(self):
+        self.assertEqual(fuzz.FuzzySet.from_items(self.A.items()), self.A)
+        self.assertEqual(fuzz.FuzzySet.from_dict(dict(self.B.items())), self.B)
+        C = fuzz.FuzzySet.from_arrays(['a', 'b', 'a'], [0.2, 0.4, 0.6])
+        self.assertEqual(C.mu('a'), 0.6)
+        self.assertEqual(len(C), 2)
+        self.assertRaises(ValueError, fuzz.FuzzySet.from_arrays, ['a'], [1.5])
+        self.assertRaises(ValueError, fuzz.FuzzySet.from_arrays, ['a'], [])
+
     def test_fuzzy_element(self):
         self.assertRaises(ValueError, fuzz.FuzzyElement, 'a', mu=2)
         self.assertRaises(ValueError, fuzz.FuzzyElement, 'b', mu=-1)
@@ -40,6 +59,13 @@ class TestFuzzySet(unittest.TestCase):
         except TypeError:
             pass
 
+    def test_fuzzy_element_slots(self):
+        element = fuzz.FuzzyElement('a', 0.5)
+        self.assertFalse(hasattr(element, '__dict__'))
+        self.assertEqual(hash(element), hash('a'))
+        self.assertEqual(copy.copy(element).mu, 0.5)
+        self.assertEqual(pickle.loads(pickle.dumps(element)).mu, 0.5)
+
     def test_add_update_remove(self):
         self.A.add('a', 1)
         self.assertEqual(len(self.A), 3)
@@ -57,6 +83,37 @@ class TestFuzzySet(unittest.TestCase):
         C['a'].mu = 0.0
         self.assertTrue(self.A.mu('a') > 0.5)
 
+    def test_copy_on_write(self):
+        C = self.A.copy()
+        self.assertTrue(C._keymap['b'] is self.A._keymap['b'])
+        self.A['b'].mu = 0.1
+        self.assertEqual(C.mu('b'), 0.5)
+        for element in C:
+            element.mu = 0.0
+        self.assertEqual(self.A.mu('a'), 1.0)
+        self.assertEqual(self.A.mu('b'), 0.1)
+        element = self.A['c']
+        C = self.A.copy()
+        self.assertTrue(self.A['c'] is element)
+        self.A.remove('c')
+        element.mu = 0.0
+        self.assertEqual(C.mu('c'), 0.8)
+
+    def test_shared_handles(self):
+        element = self.A['b']
+        C = self.A.copy()
+        D = C.copy()
+        element.mu = 0.0
+        self.assertEqual(self.A.mu('b'), 0.0)
+        self.assertEqual(C.mu('b'), 0.5)
+        self.assertEqual(D.mu('b'), 0.5)
+        element = self.B['d']
+        C = fuzz.FuzzySet([fuzz.FuzzyElement('x', 0.3)], storage=self.storage)
+        C.update(self.B)
+        self.assertEqual(sorted(C.keys()), ['b', 'c', 'd', 'x'])
+        element.mu = 0.1
+        self.assertEqual(C.mu('d'), 0.6)
+
     def test_pop(self):
         A = [fuzz.FuzzyElement('a', 1.0),
              fuzz.FuzzyElement('c', 0.8),
@@ -73,6 +130,29 @@ class TestFuzzySet(unittest.TestCase):
         self.assertTrue(self.A.isdisjoint(C))
         self.assertTrue(self.B.isdisjoint(C))
 
+    def test_key_index(self):
+        self.A['b'] = fuzz.FuzzyElement('b', 0.3)
+        self.assertEqual(self.A['b'].mu, 0.3)
+        self.A.discard('c')
+        self.assertRaises(KeyError, self.A.__getitem__, 'c')
+        self.assertFalse(self.A.has_key('c'))
+        element = self.A.pop()
+        self.assertFalse(self.A.has_key(element.index))
+        self.A.clear()
+        self.assertEqual(list(self.A.keys()), [])
+
+    def test_views(self):
+        keys = self.B.keys()
+        items = self.B.items()
+        self.assertTrue('e' in keys)
+        self.assertTrue(('b', 0.8) in items)
+        self.assertFalse(('b', 0.5) in items)
+        self.B.add('f', 0.4)
+        self.assertTrue('f' in keys)
+        self.assertTrue(0.4 in self.B.values())
+        self.assertEqual(dict(items)['f'], 0.4)
+        self.assertEqual(len(list(keys)), 5)
+
     def test_getitem(self):
         self.assertEqual(self.A['b'].mu, 0.5)
         self.assertEqual(self.B['e'].mu, 0.0)
@@ -91,6 +171,48 @@ class TestFuzzySet(unittest.TestCase):
         self.assertEqual(len(self.A.kernel), 1)
         self.assertEqual(len(self.B.support), 3)
 
+    def test_aggregates(self):
+        self.assertEqual(self.B.height, 0.8)
+        self.assertAlmostEqual(self.B.cardinality, 1.6)
+        self.B['b'].mu = 0.1
+        self.B['e'].mu = 0.9
+        self.assertEqual(len(self.B), 4)
+        self.assertEqual(self.B.height, 0.9)
+        self.assertAlmostEqual(self.B.cardinality, 1.8)
+        self.assertEqual(self.B.support, set(['b', 'c', 'd', 'e']))
+        element = self.B.pop()
+        element.mu = 0.0
+        self.assertEqual(len(self.B), 3)
+        self.B.discard('e')
+        self.assertEqual(self.B.height, max(self.B.values()))
+        C = self.B.copy()
+        C['d'].mu = 1.0
+        self.assertEqual(C.height, 1.0)
+        self.assertEqual(self.B.height, max(self.B.values()))
+        self.B.clear()
+        self.assertEqual(len(self.B), 0)
+        self.assertEqual(self.B.cardinality, 0.0)
+        self.assertRaises(ValueError, getattr, self.B, 'height')
+
+    def test_shared_aggregates(self):
+        element = self.A['b']
+        C = self.A.copy()
+        D = fuzz.FuzzySet(storage=self.storage)
+        D.update(self.A)
+        self.assertEqual(D.height, 1.0)
+        element.mu = 0.0
+        for fset in (C, D):
+            self.assertEqual(len(fset), 3)
+            self.assertAlmostEqual(fset.cardinality, 2.3)
+            self.assertEqual(fset.support, set(['a', 'b', 'c']))
+        self.assertEqual(len(self.A), 2)
+        self.assertAlmostEqual(self.A.cardinality, 1.8)
+        element = self.A['a']
+        element.mu = 0.4
+        self.assertEqual(self.A.height, 0.8)
+        self.assertEqual(C.height, 1.0)
+        self.assertEqual(D.height, 1.0)
+
     def test_prune(self):
         self.assertEqual(len(self.B.keys()), 4)
         self.B.prune()
@@ -109,6 +231,13 @@ class TestFuzzySet(unittest.TestCase):
         D.add('c', 0.84)
         D.add('d', 0.6)
         self.assertEqual(self.A.union(self.B, fuzz.FuzzySet.NORM_ALGEBRAIC), D)
+        E = self.A.union(self.B, fuzz.FuzzySet.NORM_DRASTIC)
+        self.assertEqual(E.mu('b'), 1.0)
+        self.assertEqual(E.mu('d'), 0.6)
+        self.assertEqual(E.mu('e'), 0.0)
+        F = self.A.union(self.B, fuzz.FuzzySet.NORM_BOUNDED)
+        self.assertEqual(F.mu('a'), 1.0)
+        self.assertAlmostEqual(F.mu('c'), 1.0)
 
     def test_intersection(self):
         C = fuzz.FuzzySet()
@@ -120,6 +249,69 @@ class TestFuzzySet(unittest.TestCase):
         D.add('c', 0.16)
         self.assertEqual(self.A.intersection(self.B, \
                          fuzz.FuzzySet.NORM_ALGEBRAIC), D)
+        E = self.A.intersection(self.B, fuzz.FuzzySet.NORM_DRASTIC)
+        self.assertEqual(E.mu('b'), 0.0)
+        self.assertTrue(E.has_key('a'))
+        F = self.A.intersection(self.B, fuzz.FuzzySet.NORM_BOUNDED)
+        self.assertAlmostEqual(F.mu('b'), 0.3)
+
+    def test_in_place(self):
+        for norm in range(4):
+            C = self.A.copy()
+            C.union_update(self.B, norm)
+            self.assertEqual(C, self.A.union(self.B, norm))
+            C = self.A.copy()
+            C.intersection_update(self.B, norm=norm)
+            self.assertEqual(C, self.A.intersection(self.B, norm))
+            self.assertFalse(C.has_key('a'))
+        C = self.A.copy()
+        D = C
+        C |= self.B
+        self.assertTrue(C is D)
+        self.assertEqual(self.A.mu('b'), 0.5)
+        self.assertEqual(C.mu('b'), 0.8)
+        self.assertEqual(C.height, 1.0)
+        C &= self.B
+        self.assertTrue(C is D)
+        self.assertEqual(set(C.keys()), set(['b', 'c', 'd', 'e']))
+        self.assertAlmostEqual(C.cardinality, 1.6)
+        C.intersection_update(set(['b', 'x']))
+        self.assertEqual(list(C.keys()), ['b'])
+        C = self.A.copy()
+        C.intersection_update(self.B, set(['b', 'x']))
+        self.assertEqual(list(C.keys()), ['b'])
+        self.assertEqual(C.mu('b'), 0.5)
+        C = self.A.copy()
+        C.intersection_update(self.B, self.B,
+                              norm=fuzz.FuzzySet.NORM_ALGEBRAIC)
+        self.assertAlmostEqual(C.mu('b'), 0.32)
+        self.assertAlmostEqual(C.mu('c'), 0.032)
+
+    def test_n_ary(self):
+        C = fuzz.FuzzySet(storage=self.storage)
+        C.add('a', 0.3)
+        C.add('c', 0.6)
+        C.add('f', 0.9)
+        for norm in range(4):
+            self.assertEqual(
+                fuzz.FuzzySet.union_all([self.A, self.B, C], norm),
+                self.A.union(self.B, norm).union(C, norm))
+            self.assertEqual(
+                fuzz.FuzzySet.intersection_all([self.A, self.B, C], norm),
+                self.A.intersection(self.B, norm).intersection(C, norm))
+        self.assertEqual(fuzz.FuzzySet.union_all(iter([self.B])), self.B)
+        self.assertEqual(len(fuzz.FuzzySet.union_all([])), 0)
+        self.assertEqual(list(fuzz.FuzzySet.intersection_all(
+            [self.A, self.B, C]).keys()), ['c'])
+        self.assertRaises(ValueError, fuzz.FuzzySet.intersection_all, [])
+        D = fuzz.FuzzySet.from_items([('c', 0.5)], storage=fuzz.ArrayStorage)
+        for E, mu in ((fuzz.FuzzySet.intersection_all([self.A, D]), 0.5),
+                      (fuzz.FuzzySet.intersection_all([self.A, C, D]), 0.5),
+                      (fuzz.FuzzySet.intersection_all([D, self.B]), 0.2)):
+            self.assertEqual(E.mu('c'), mu)
+        self.assertTrue(type(E._keymap) is fuzz.ArrayStorage)
+        E = fuzz.FuzzySet.intersection_all([self.A, D])
+        self.assertTrue(type(E._keymap) is type(self.A._keymap))
 
     def test_normalize(self):
         self.B.normalize()
@@ -137,6 +329,198 @@ class TestFuzzySet(unittest.TestCase):
         self.assertEqual(self.A.salpha(0.5), D)
         self.assertTrue('e' not in self.B.alpha(0.0))
 
+    def test_mu_index(self):
+        self.assertEqual(self.B.mu_range(0.2, 0.6), set(['c', 'd']))
+        self.B.index_mu()
+        self.assertEqual(self.B.alpha(0.6), set(['b', 'd']))
+        self.assertEqual(self.B.salpha(0.6), set(['b']))
+        self.assertEqual(self.B.mu_range(0.0, 0.6), set(['c', 'd']))
+        self.B['e'].mu = 0.7
+        self.B['b'].mu = 0.3
+        self.B.add('f', 1.0)
+        self.B.remove('c')
+        self.assertEqual(self.B.alpha(0.6), set(['d', 'e', 'f']))
+        self.assertEqual(self.B.mu_range(0.3, 0.6), set(['b', 'd']))
+        self.assertEqual(self.B.kernel, set(['f']))
+        C = self.B.copy()
+        C['f'].mu = 0.5
+        self.assertEqual(C.kernel, set())
+        self.assertEqual(self.B.kernel, set(['f']))
+        self.B.index_mu(False)
+        self.assertEqual(self.B.alpha(0.6), set(['d', 'e', 'f']))
+
+    def test_level_sets(self):
+        self.B.add('f', 0.6)
+        levels = self.B.level_sets()
+        self.assertEqual([alpha for alpha, cut in levels], [0.2, 0.6, 0.8])
+        for alpha, cut in levels:
+            self.assertEqual(cut, self.B.alpha(alpha))
+            self.assertEqual(hash(cut), hash(frozenset(cut)))
+            self.assertEqual(len(cut), len(self.B.alpha(alpha)))
+        cut = levels[1][1]
+        self.assertTrue('d' in cut and 'c' not in cut and 'z' not in cut)
+        self.assertEqual(cut & set(['c', 'b', 'z']), frozenset(['b']))
+        self.assertTrue(levels[2][1] < cut)
+        self.assertEqual(self.B.level_sets(deltas=True)[1],
+                         (0.6, frozenset(['d', 'f'])))
+        self.B.index_mu()
+        iterator = self.B.iter_level_sets()
+        self.B.remove('b')
+        self.assertEqual(list(iterator), levels)
+        self.assertEqual(fuzz.FuzzySet().level_sets(), [])
+
+    def test_streaming_constructors(self):
+        records = [('a', 0.5), ('b', 0.2), ('a', 0.4), ('c', 0.05), ('b', 0.6)]
+        C = fuzz.FuzzySet.from_records(iter(records), chunk=2,
+                                       storage=self.storage)
+        self.assertEqual(C, fuzz.FuzzySet.from_dict({'a': 0.5, 'b': 0.6,
+                                                     'c': 0.05}))
+        C = fuzz.FuzzySet.from_records(records, norm='bounded', chunk=2,
+                                       epsilon=0.1, normalize=True)
+        self.assertEqual(set(C.keys()), set(['a', 'b']))
+        self.assertAlmostEqual(C.mu('b'), 0.8 / 0.9)
+        self.assertEqual(C.mu('a'), 1.0)
+        self.assertRaises(ValueError, fuzz.FuzzySet.from_records, [('a', 2)])
+        C = fuzz.FuzzySet.from_records([], normalize=True)
+        self.assertEqual(len(C), 0)
+        C = fuzz.FuzzySet.from_records([('a', 0.05)], epsilon=0.1,
+                                       normalize=True, storage=self.storage)
+        self.assertEqual(len(C._keymap), 0)
+        C = fuzz.FuzzySet.from_dict({'a': 0.0})
+        C.normalize()
+        self.assertEqual(C.mu('a'), 0.0)
+        C = fuzz.FuzzySet.from_csv(['name,mu\n', 'b,0.3\n', 'a,0.2\n',
+                                    'b,0.7\n'], key='name', header=True)
+        self.assertEqual(C, fuzz.FuzzySet.from_dict({'a': 0.2, 'b': 0.7}))
+        C = fuzz.FuzzySet.from_jsonl(['{"key": "a", "mu": 0.2}\n', '\n',
+                                      '[[1, 2], 0.4]\n'])
+        self.assertEqual(C, fuzz.FuzzySet.from_dict({'a': 0.2, (1, 2): 0.4}))
+
+    def test_lazy(self):
+        C = fuzz.FuzzySet.from_dict({'a': 0.3, 'd': 0.9, 'f': 0.5})
+        expression = (self.A.lazy() | self.B) & C.lazy().complement()
+        self.assertEqual(expression.evaluate(),
+                         (self.A | self.B) & C.complement())
+        self.assertEqual(expression.evaluate().storage, self.storage)
+        D = self.A.union(self.B, 'algebraic')
+        shared = self.A.lazy().union(self.B, 'algebraic')
+        expression = (shared & C) | shared.complement().normalize()
+        E = D.complement()
+        E.normalize()
+        self.assertEqual(expression.evaluate(), (D & C) | E)
+        self.assertEqual(expression.alpha(0.5), ((D & C) | E).alpha(0.5))
+        self.assertEqual(expression.salpha(0.0), ((D & C) | E).support)
+        self.assertAlmostEqual(expression.cardinality,
+                               ((D & C) | E).cardinality)
+        self.assertEqual(set(element.index for element in expression),
+                         ((D & C) | E).support)
+        self.B.add('f', 0.4)
+        self.assertEqual(self.B.lazy().evaluate(), self.B)
+        self.assertRaises(TypeError, self.A.lazy().union, set())
+        expression = self.A | (self.B.lazy() & C)
+        self.assertTrue(isinstance(expression, fuzz.FuzzyExpression))
+        self.assertEqual(expression.evaluate(), self.A | (self.B & C))
+        expression = self.B & (self.A.lazy() | C)
+        self.assertEqual(expression.evaluate(), self.B & (self.A | C))
+        self.assertRaises(TypeError, lambda: self.A.lazy() | set())
+        self.assertRaises(TypeError, lambda: set() & self.A.lazy())
+
+    def test_lazy_deep(self):
+        expression = self.B.lazy()
+        expected = self.B.copy()
+        for i in range(2000):
+            expression = (expression | self.A).complement()
+            expected = (expected | self.A).complement()
+        self.assertEqual(expression.evaluate(), expected)
+
+    def test_frozen(self):
+        C = fuzz.FrozenFuzzySet(self.B, storage=self.storage)
+        D = fuzz.FrozenFuzzySet.from_dict({'b': 0.8 + 1e-12, 'c': 0.2,
+                                           'd': 0.6})
+        self.assertEqual(C, self.B)
+        self.assertEqual(C, D)
+        self.assertEqual(hash(C), hash(D))
+        self.assertEqual(len(set([C, D])), 1)
+        self.assertNotEqual(C, fuzz.FrozenFuzzySet(self.A))
+        self.assertRaises(TypeError, C.add, 'f', 0.5)
+        self.assertRaises(TypeError, C.remove, 'b')
+        self.assertRaises(TypeError, C.union_update, self.A)
+        self.assertRaises(TypeError, C.normalize)
+        self.assertRaises(TypeError, setattr, C['b'], 'mu', 0.1)
+        self.assertEqual(C.mu('b'), 0.8)
+        E = C
+        E |= self.A
+        self.assertEqual(E, self.A | self.B)
+        self.assertTrue(isinstance(E, fuzz.FrozenFuzzySet))
+        self.assertEqual(C, self.B)
+        E = C
+        E &= self.A
+        self.assertEqual(E, self.A & self.B)
+        self.assertTrue(isinstance(E, fuzz.FrozenFuzzySet))
+        E = C
+        E -= set(['b'])
+        self.assertEqual(set(E.keys()), set(['c', 'd']))
+        self.assertTrue(isinstance(E, fuzz.FrozenFuzzySet))
+        E = C
+        E ^= fuzz.FuzzySet.from_dict({'b': 0.8, 'f': 0.5})
+        self.assertEqual(set(E.keys()), set(['c', 'd', 'f']))
+        self.assertTrue(isinstance(E, fuzz.FrozenFuzzySet))
+        self.assertEqual(C, self.B)
+        self.assertTrue(isinstance(C.complement(), fuzz.FrozenFuzzySet))
+        G = fuzz.FrozenFuzzySet.from_dict({'a': 0.2})
+        H = fuzz.FrozenFuzzySet.from_dict({'a': 0.9})
+        self.assertNotEqual(hash(G), hash(H))
+        self.assertNotEqual(G, H)
+        self.assertEqual(G, fuzz.FrozenFuzzySet.from_dict({'a': 0.2}))
+        self.assertRaises(TypeError, C.copy().discard, 'b')
+        F = C.thaw()
+        F.add('f', 0.5)
+        self.assertFalse(isinstance(F, fuzz.FrozenFuzzySet))
+        self.assertEqual(pickle.loads(pickle.dumps(C)), C)
+
+    def test_save_open(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.B.save(path)
+            C = fuzz.FuzzySet.open(path, mmap=False)
+            self.assertEqual(C, self.B)
+            self.assertEqual(C.storage, fuzz.ObjectStorage)
+            D = fuzz.FuzzySet.open(path)
+            self.assertEqual(D, self.B)
+            self.assertEqual(D.storage, fuzz.MappedStorage)
+            self.assertEqual(D.mu('d'), 0.6)
+            self.assertEqual(D.alpha(0.5), set(['b', 'd']))
+            self.assertEqual(len(D), 3)
+            D['d'].mu = 0.1
+            self.assertEqual(D.cardinality, 1.1)
+            self.assertEqual(fuzz.FuzzySet.open(path).mu('d'), 0.6)
+            D.add('f', 0.4)
+            D.remove('b')
+            self.assertEqual(D.support, set(['c', 'd', 'f']))
+            self.assertFalse(D._keymap.mapped)
+            del C, D
+            E = fuzz.FuzzySet.from_items([(('x', 1), 0.5), (2, 0.25),
+                                          (None, 1.0)])
+            E.save(path)
+            self.assertEqual(fuzz.FuzzySet.open(path), E)
+            E.add(frozenset(['y']), 0.5)
+            self.assertRaises(TypeError, E.save, path)
+            self.B.save(path)
+            with open(path, 'rb') as stream:
+                data = stream.read()
+            for end in (len(data) - 1, 40):
+                with open(path, 'wb') as stream:
+                    stream.write(data[:end])
+                for mmap in (True, False):
+                    self.assertRaises(ValueError, fuzz.FuzzySet.open, path,
+                                      mmap=mmap)
+            with open(path, 'wb') as stream:
+                stream.write(b'fuzzy')
+            self.assertRaises(ValueError, fuzz.FuzzySet.open, path)
+        finally:
+            os.remove(path)
+
     def test_complement(self):
         D = fuzz.FuzzySet()
         D.add('b', 0.2)
@@ -146,6 +530,448 @@ class TestFuzzySet(unittest.TestCase):
         self.assertEqual(self.B.complement(), D)
 
 
+class TestFuzzySetArrayStorage(TestFuzzySet):
+    storage = fuzz.ArrayStorage
+
+    def test_copy_on_write(self):
+        C = self.A.copy()
+        self.A['b'].mu = 0.1
+        self.assertEqual(C.mu('b'), 0.5)
+        self.assertEqual(self.A.storage, fuzz.ArrayStorage)
+        self.assertEqual(C.storage, fuzz.ArrayStorage)
+
+    def test_array_storage(self):
+        self.assertEqual(set(self.A), set(['a', 'b', 'c']))
+        element = self.A['c']
+        element.mu = 0.3
+        self.assertEqual(self.A.mu('c'), 0.3)
+        self.A.remove('a')
+        self.assertEqual(element.mu, 0.3)
+        self.assertEqual(copy.copy(element).__class__, fuzz.FuzzyElement)
+        self.assertTrue(self.A['c'] is element)
+        self.A.remove('c')
+        self.assertEqual(element.mu, 0.3)
+        self.A.add('c', 0.9)
+        element.mu = 0.1
+        self.assertEqual(self.A.mu('c'), 0.9)
+        element = self.A['b']
+        self.A.intersection_update(['b'])
+        element.mu = 0.2
+        self.assertEqual(self.A.mu('b'), 0.2)
+        self.A.clear()
+        self.assertEqual(element.mu, 0.2)
+        self.assertEqual(pickle.loads(pickle.dumps(self.A)), self.A)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestArrayFuzzySet(unittest.TestCase):
+
+    def setUp(self):
+        self.A = fuzz.ArrayFuzzySet(['a', 'b', 'c'], [1.0, 0.5, 0.8])
+        self.B = fuzz.ArrayFuzzySet(['b', 'c', 'd', 'e'], [0.8, 0.2, 0.6, 0.0])
+
+    def test_conversion(self):
+        F = self.B.to_fuzzy_set()
+        self.assertEqual(F.mu('d'), 0.6)
+        self.assertTrue(F.has_key('e'))
+        self.assertEqual(fuzz.ArrayFuzzySet.from_fuzzy_set(F), self.B)
+        self.assertRaises(ValueError, fuzz.ArrayFuzzySet, ['a'], [2.0])
+
+    def test_union(self):
+        for norm in range(4):
+            C = self.A.union(self.B, norm).to_fuzzy_set()
+            D = self.A.to_fuzzy_set().union(self.B.to_fuzzy_set(), norm)
+            self.assertEqual(C, D)
+
+    def test_intersection(self):
+        for norm in range(4):
+            C = self.A.intersection(self.B, norm).to_fuzzy_set()
+            D = self.A.to_fuzzy_set().intersection(self.B.to_fuzzy_set(), norm)
+            self.assertEqual(C, D)
+
+    def test_unary(self):
+        self.assertEqual(self.A.alpha(0.7), set(['a', 'c']))
+        self.assertEqual(self.A.salpha(0.5), set(['a', 'c']))
+        self.assertEqual(self.B.support, set(['b', 'c', 'd']))
+        self.assertEqual(self.B.complement().mu('e'), 1.0)
+        self.assertAlmostEqual(self.A.overlap(self.B), 0.7 / 1.6)
+        self.B.normalize()
+        self.assertTrue(self.B.normal)
+        self.assertEqual(self.B.mu('d'), 0.75)
+
+    def test_named_norms(self):
+        F, G = self.A.to_fuzzy_set(), self.B.to_fuzzy_set()
+        for name in ('hamacher', 'frank'):
+            params = {'hamacher': {'gamma': 0.5}, 'frank': {'s': 2.0}}[name]
+            self.assertEqual(
+                self.A.union(self.B, name, **params).to_fuzzy_set(),
+                F.union(G, name, **params))
+            self.assertEqual(
+                self.A.intersection(self.B, name, **params).to_fuzzy_set(),
+                F.intersection(G, name, **params))
+        self.assertEqual(self.A.complement('sugeno', lam=1.0).to_fuzzy_set(),
+                         F.complement('sugeno', lam=1.0))
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestDenseFuzzySet(unittest.TestCase):
+
+    def setUp(self):
+        self.U = fuzz.Universe(['a', 'b', 'c', 'd', 'e'])
+        self.A = fuzz.DenseFuzzySet(self.U, [1.0, 0.5, 0.8, 0.0, 0.0])
+        self.B = fuzz.DenseFuzzySet.from_items(
+            [('b', 0.8), ('c', 0.2), ('d', 0.6)], self.U)
+
+    def test_universe(self):
+        R = fuzz.Universe.range(3, 8)
+        self.assertEqual(len(R), 5)
+        self.assertEqual(R.index(5), 2)
+        self.assertTrue(7 in R)
+        self.assertFalse(8 in R or 'a' in R)
+        self.assertEqual(R, fuzz.Universe(range(3, 8)))
+        self.assertNotEqual(R, fuzz.Universe.range(5))
+        self.assertRaises(ValueError, fuzz.Universe, ['a', 'a'])
+        D = fuzz.DenseFuzzySet(fuzz.Universe.range(5), [0, 0, 0.5, 0, 1])
+        self.assertEqual(D.mu(numpy.int64(2)), 0.5)
+        self.assertEqual(D.universe.index(numpy.int32(4)), 4)
+
+    def test_conversion(self):
+        F = self.B.to_fuzzy_set()
+        self.assertEqual(F.mu('d'), 0.6)
+        self.assertFalse(F.has_key('e'))
+        self.assertEqual(fuzz.DenseFuzzySet.from_fuzzy_set(F, self.U),
+                         self.B)
+        self.assertEqual(self.A.mu('b'), 0.5)
+        self.assertEqual(self.A.mu('z'), 0.0)
+        self.assertEqual(len(self.A), 3)
+        self.assertRaises(ValueError, fuzz.DenseFuzzySet, self.U, [2.0] * 5)
+        self.assertRaises(ValueError, fuzz.DenseFuzzySet, self.U, [0.5])
+        self.assertRaises(ValueError, fuzz.DenseFuzzySet.from_items,
+                          [('z', 0.5)], self.U)
+
+    def test_binary(self):
+        F, G = self.A.to_fuzzy_set(), self.B.to_fuzzy_set()
+        for norm in range(4):
+            self.assertEqual(self.A.union(self.B, norm).to_fuzzy_set(),
+                             F.union(G, norm))
+            self.assertEqual(self.A.intersection(self.B, norm),
+                             F.intersection(G, norm))
+        self.assertEqual(self.A | G, F | G)
+        self.assertAlmostEqual(self.A.overlap(self.B), 0.7 / 1.6)
+        other = fuzz.DenseFuzzySet(fuzz.Universe.range(5))
+        self.assertRaises(ValueError, self.A.union, other)
+        H = fuzz.ArrayFuzzySet.from_fuzzy_set(G)
+        self.assertEqual(self.A & H, F & G)
+        self.assertEqual((H | self.A).to_fuzzy_set(), G | F)
+        self.assertAlmostEqual(self.A.overlap(H), self.A.overlap(self.B))
+        self.assertRaises(ValueError, self.A.union,
+                          fuzz.FuzzySet.from_dict({'z': 0.5}))
+        self.assertEqual(self.A | fuzz.FuzzySet.from_dict({'z': 0.0}),
+                         self.A)
+        self.assertRaises(TypeError, self.A.union, set('ab'))
+
+    def test_equality(self):
+        C = fuzz.DenseFuzzySet(fuzz.Universe.range(3), [0.5, 0.0, 1.0])
+        D = fuzz.DenseFuzzySet(fuzz.Universe.range(4), [0.5, 0.0, 1.0, 0.0])
+        self.assertFalse(C == D)
+        self.assertTrue(C != D)
+        F = fuzz.FuzzySet.from_dict({0: 0.5, 2: 1.0, 7: 0.3})
+        self.assertFalse(C == F)
+        self.assertTrue(C != F)
+        self.assertFalse(F == C)
+        self.assertTrue(F != C)
+        self.assertFalse(C in [D, F])
+        self.assertTrue(C in [D, F, C.copy()])
+        self.assertRaises(TypeError, C.__eq__, set([0, 2]))
+
+    def test_unary(self):
+        self.assertEqual(self.A.alpha(0.7), set(['a', 'c']))
+        self.assertEqual(self.A.salpha(0.5), set(['a', 'c']))
+        self.assertEqual(self.B.support, set(['b', 'c', 'd']))
+        self.assertEqual(self.A.kernel, set(['a']))
+        self.assertEqual(self.B.complement().mu('e'), 1.0)
+        self.B.normalize()
+        self.assertTrue(self.B.normal)
+        self.assertEqual(self.B.mu('d'), 0.75)
+        E = fuzz.DenseFuzzySet(self.U)
+        self.assertRaises(ValueError, getattr, E, 'height')
+        self.assertRaises(ValueError, getattr,
+                          fuzz.ArrayFuzzySet.from_fuzzy_set(E), 'height')
+        E.normalize()
+        self.assertEqual(E.cardinality, 0.0)
+
+
+class TestNorm(unittest.TestCase):
+
+    def setUp(self):
+        self.A = fuzz.FuzzySet.from_items([('a', 1.0), ('b', 0.5), ('c', 0.8)])
+        self.B = fuzz.FuzzySet.from_items([('b', 0.8), ('c', 0.2), ('d', 0.6)])
+
+    def test_registry(self):
+        self.assertTrue(fuzz.get_tnorm(fuzz.FuzzySet.NORM_ALGEBRAIC) \
+                        is fuzz.TNORMS['algebraic'])
+        self.assertTrue(fuzz.get_tconorm('yager') is fuzz.TCONORMS['yager'])
+        self.assertRaises(ValueError, fuzz.get_tnorm, 4)
+        self.assertRaises(ValueError, fuzz.get_tnorm, -1)
+        self.assertRaises(ValueError, fuzz.get_complement, 'nonexistent')
+        self.assertRaises(ValueError, fuzz.TNORMS['yager'], 0.5, 0.5, w=0)
+        self.assertRaises(TypeError, fuzz.TNORMS['yager'], 0.5, 0.5)
+        self.assertEqual(fuzz.TNORMS['einstein'].batch([0.5, 1.0], [0.5, 0.3]),
+                         [0.2, 0.3])
+
+    def test_parametric(self):
+        self.assertEqual(self.A.union(self.B, 'hamacher', gamma=1.0),
+                         self.A.union(self.B, fuzz.FuzzySet.NORM_ALGEBRAIC))
+        self.assertEqual(self.A.intersection(self.B, 'frank', s=1.0),
+                         self.A.intersection(self.B, 1))
+        self.assertEqual(self.A.union(self.B, 'yager', w=1.0),
+                         self.A.union(self.B, fuzz.FuzzySet.NORM_BOUNDED))
+        C = self.A.union(self.B, 'dombi', lam=2.0)
+        self.assertEqual(C.mu('a'), 1.0)
+        self.assertEqual(C.mu('d'), 0.6)
+        self.assertEqual(self.A.complement('sugeno', lam=0.0),
+                         self.A.complement())
+        self.assertEqual(self.A.complement(fuzz.FuzzySet.COMP_YAGER, w=1.0),
+                         self.A.complement())
+
+    def test_kernels(self):
+        a = [0.0, 0.0, 1.0, 1.0, 0.3, 0.5, 0.9]
+        b = [0.0, 1.0, 0.0, 1.0, 0.7, 0.5, 0.2]
+        for name, params in [('hamacher', {'gamma': 0.0}),
+                             ('hamacher', {'gamma': 3.0}),
+                             ('yager', {'w': 2.0}), ('frank', {'s': 1.0}),
+                             ('frank', {'s': 4.0}), ('dombi', {'lam': 2.0})]:
+            for norm in (fuzz.TNORMS[name], fuzz.TCONORMS[name]):
+                expected = [norm(x, y, **params) for x, y in zip(a, b)]
+                for mu, x in zip(norm.batch(a, b, **params), expected):
+                    self.assertAlmostEqual(mu, x)
+                if numpy is None:
+                    continue
+                result = norm.array(numpy.array(a), numpy.array(b), **params)
+                for mu, x in zip(result.tolist(), expected):
+                    self.assertAlmostEqual(mu, x)
+
+    def test_register(self):
+        norm = fuzz.register(fuzz.TCONORMS, fuzz.Norm('maximum', max))
+        try:
+            self.assertEqual(self.A.union(self.B, 'maximum'), self.A | self.B)
+            C = self.A.copy()
+            C.union_update(self.B, norm)
+            self.assertEqual(C, self.A | self.B)
+        finally:
+            del fuzz.TCONORMS['maximum']
+
+
+class TestFuzzyRelation(unittest.TestCase):
+
+    def setUp(self):
+        self.R = fuzz.FuzzyRelation(fuzz.FuzzySet.from_items(
+            [(('a', 1), 0.7), (('a', 2), 0.4), (('b', 2), 1.0),
+             (('c', 3), 0.0)]))
+        self.S = fuzz.FuzzyRelation(fuzz.FuzzySet.from_items(
+            [((1, 'x'), 0.5), ((2, 'x'), 0.9), ((2, 'y'), 0.3)]))
+
+    def test_relation(self):
+        self.assertEqual(self.R.domain, ['a', 'b', 'c'])
+        self.assertEqual(self.R.codomain, [1, 2, 3])
+        self.assertEqual(len(self.R), 3)
+        self.assertEqual(self.R.mu('a', 2), 0.4)
+        self.assertEqual(self.R.mu('c', 3), 0.0)
+        self.assertEqual(self.R.inverse().mu(2, 'b'), 1.0)
+        self.assertEqual(self.R.projection(),
+                         fuzz.FuzzySet.from_dict({'a': 0.7, 'b': 1.0}))
+        self.assertEqual(self.R.projection(1),
+                         fuzz.FuzzySet.from_dict({1: 0.7, 2: 1.0}))
+        E = fuzz.FuzzyRelation.cylindrical_extension(
+            self.R.projection(), ['u', 'v'])
+        self.assertEqual(E.mu('a', 'v'), 0.7)
+        self.assertEqual(len(E), 4)
+        self.assertEqual(E.projection(), self.R.projection())
+        self.assertRaises(TypeError, self.R.compose, fuzz.FuzzySet())
+
+    def test_compose(self):
+        C = self.R.compose(self.S)
+        self.assertEqual(C.to_fuzzy_set(), fuzz.FuzzySet.from_items(
+            [(('a', 'x'), 0.5), (('a', 'y'), 0.3), (('b', 'x'), 0.9),
+             (('b', 'y'), 0.3)]))
+        C = self.R.compose(self.S, fuzz.FuzzySet.NORM_ALGEBRAIC)
+        self.assertAlmostEqual(C.mu('a', 'x'), 0.36)
+        self.assertAlmostEqual(C.mu('b', 'y'), 0.3)
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_dense(self):
+        R = self.R.to_dense()
+        self.assertTrue(R.dense)
+        self.assertEqual(R, self.R)
+        self.assertEqual(R.to_sparse(), self.R)
+        self.assertEqual(R.inverse(), self.R.inverse())
+        self.assertEqual(R.projection(1), self.R.projection(1))
+        for norm in (0, 1, 'einstein'):
+            C = R.compose(self.S.to_dense(), norm, block=2)
+            self.assertTrue(C.dense)
+            self.assertEqual(C, self.R.compose(self.S, norm))
+        self.assertEqual(R.compose(self.S), self.R.compose(self.S))
+        M = fuzz.FuzzyRelation.from_matrix([[0.2, 0.0], [1.0, 0.5]],
+                                           ['a', 'b'], [1, 2])
+        self.assertEqual(M.mu('b', 2), 0.5)
+        self.assertEqual(len(M), 3)
+        self.assertRaises(ValueError, fuzz.FuzzyRelation.from_matrix,
+                          [[2.0]], ['a'], [1])
+
+
+class TestSimilarity(unittest.TestCase):
+
+    def setUp(self):
+        self.A = fuzz.FuzzySet.from_items([('a', 1.0), ('b', 0.5), ('c', 0.8)])
+        self.B = fuzz.FuzzySet.from_items([('b', 0.8), ('c', 0.2), ('d', 0.6),
+                                           ('e', 0.0)])
+
+    def test_jaccard(self):
+        self.assertAlmostEqual(fuzz.jaccard(self.A, self.B), 0.7 / 3.2)
+        self.assertEqual(fuzz.jaccard(self.A, self.A.copy()), 1.0)
+        self.assertEqual(fuzz.jaccard(fuzz.FuzzySet(), fuzz.FuzzySet()), 1.0)
+
+    def test_minhash_index(self):
+        index = fuzz.MinHashIndex(bands=32, rows=2, seed=1)
+        self.assertEqual(index.signature(self.A), index.signature(self.A))
+        self.assertEqual(len(index.signature(self.A)), 64)
+        index.insert('A', self.A)
+        index.insert('B', self.B)
+        self.assertEqual(len(index), 2)
+        C = self.A.copy()
+        C['b'].mu = 0.6
+        self.assertEqual(index.query(C, k=1)[0][0], 'A')
+        self.assertTrue(abs(index.similarity('A', C) \
+                            - fuzz.jaccard(self.A, C)) < 0.25)
+        self.assertEqual(index.similarity('A', self.A), 1.0)
+        index.remove('A')
+        self.assertFalse('A' in index)
+        self.assertFalse('A' in index.candidates(C))
+        self.assertRaises(KeyError, index.remove, 'A')
+        small = fuzz.MinHashIndex(bands=32, rows=2, seed=1, cache=2)
+        self.assertEqual(small.signature(self.A), index.signature(self.A))
+        self.assertEqual(small.signature(self.B), index.signature(self.B))
+        self.assertEqual(len(small._draws), 2)
+        self.assertEqual(fuzz.MinHashIndex(bands=32, rows=2, seed=1,
+                                           cache=0).signature(self.A),
+                         index.signature(self.A))
+        self.assertRaises(ValueError, fuzz.MinHashIndex, cache=-1)
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_pairwise(self):
+        sets = [self.A, self.B, fuzz.FuzzySet(), self.A | self.B]
+        pairwise = fuzz.PairwiseSimilarity(sets, block=8)
+        self.assertEqual(len(pairwise), 4)
+        self.assertEqual(set(pairwise.keys), set('abcd'))
+        overlap = pairwise.overlap()
+        jaccard = pairwise.jaccard()
+        subsethood = pairwise.subsethood()
+        for i, a in enumerate(sets):
+            for j, b in enumerate(sets):
+                self.assertAlmostEqual(overlap[i, j], a.overlap(b))
+                self.assertAlmostEqual(jaccard[i, j], fuzz.jaccard(a, b))
+                self.assertAlmostEqual(subsethood[i, j], b.overlap(a) \
+                                       if a.cardinality else 1.0)
+        self.assertTrue(numpy.allclose(
+            fuzz.PairwiseSimilarity(sets).intersections(),
+            pairwise.intersections()))
+
+
+class TestShardedExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.A = fuzz.FuzzySet.from_items([('a', 1.0), ('b', 0.5), ('c', 0.8),
+                                           ('f', 0.3)])
+        self.B = fuzz.FuzzySet.from_items([('b', 0.8), ('c', 0.2), ('d', 0.6),
+                                           ('e', 0.0)])
+
+    def test_operations(self):
+        for chunk in (2, 100):
+            with fuzz.ShardedExecutor(workers=2, chunk=chunk) as executor:
+                self.assertEqual(executor.union(self.A, self.B),
+                                 self.A | self.B)
+                self.assertEqual(executor.union(self.A, self.B, 'yager', w=2),
+                                 self.A.union(self.B, 'yager', w=2))
+                self.assertEqual(executor.intersection(self.A, self.B, 1),
+                                 self.A.intersection(self.B, 1))
+                self.assertEqual(executor.complement(self.B, 'yager', w=2),
+                                 self.B.complement('yager', w=2))
+                self.assertEqual(executor.alpha(self.A, 0.5),
+                                 self.A.alpha(0.5))
+                self.assertEqual(executor.alpha(self.B, 0.0, strong=True),
+                                 self.B.support)
+        executor = fuzz.ShardedExecutor(workers=1)
+        self.assertRaises(TypeError, executor.union, set('ab'), self.B)
+        self.assertRaises(TypeError, executor.intersection, self.A, set('ab'))
+        self.assertRaises(ValueError, fuzz.ShardedExecutor, chunk=0)
+
+
+class TestIndexedSet(unittest.TestCase):
+
+    def setUp(self):
+        self.A = fuzz.IndexedSet(['a', 'b', 'c', 'd'])
+        self.B = fuzz.FuzzySet()
+        self.B.add('b', 0.8)
+        self.B.add('e', 0.6)
+
+    def test_key_pool(self):
+        pool = fuzz.KeyPool()
+        key = ''.join(['k', 'ey'])
+        C = fuzz.FuzzySet.from_items([('key', 0.5)], pool=pool)
+        D = fuzz.FuzzySet(pool=pool)
+        D.add(key, 0.7)
+        self.assertTrue(D['key'].index is C['key'].index)
+        self.assertEqual(pool.key(pool.id('key')), 'key')
+        self.assertEqual(len(pool), 1)
+        self.assertTrue((C | D).pool is pool)
+        self.assertTrue(pickle.loads(pickle.dumps(D)).pool is not None)
+
+    def test_intersection_update(self):
+        self.A.intersection_update(set(['a', 'b', 'x']))
+        self.assertEqual(set(self.A.keys()), set(['a', 'b']))
+        self.A.intersection_update(self.B)
+        self.assertEqual(set(self.A.keys()), set(['b']))
+        self.assertTrue(self.A['b'] is self.A._keymap['b'])
+        self.assertTrue(set.__contains__(self.A, 'b'))
+
+    def test_difference_update(self):
+        self.A.difference_update(['a'], {'b': 0.5}, self.B.items())
+        self.assertEqual(set(self.A.keys()), set(['c', 'd']))
+        self.A.difference_update(set('bcxyz'))
+        self.assertEqual(set(self.A.keys()), set(['d']))
+        self.assertEqual(set(self.A), set(['d']))
+        self.A -= self.A
+        self.assertEqual(len(self.A), 0)
+
+    def test_difference_update_own_view(self):
+        C = self.A.copy()
+        self.A.difference_update(self.A.keys())
+        self.assertEqual(len(self.A), 0)
+        C.difference_update(C.items())
+        self.assertEqual(len(C), 0)
+        self.assertEqual(len(set(C)), 0)
+
+    def test_symmetric_difference_update(self):
+        C = fuzz.FuzzySet.from_items([('a', 0.3), ('b', 0.4)])
+        C.symmetric_difference_update(self.B.items())
+        self.assertEqual(C.mu('a'), 0.3)
+        self.assertEqual(C.mu('e'), 0.6)
+        self.assertFalse(C.has_key('b'))
+        self.A.symmetric_difference_update(['a', 'a', 'x'])
+        self.assertEqual(set(self.A.keys()), set(['b', 'c', 'd', 'x']))
+        self.assertEqual(len(set(self.A)), 4)
+
+    def test_symmetric_difference_update_own_view(self):
+        C = self.A.copy()
+        self.A.symmetric_difference_update(self.A.keys())
+        self.assertEqual(len(self.A), 0)
+        C.symmetric_difference_update(C.items(), ['x'])
+        self.assertEqual(set(C.keys()), set(['x']))
+        D = fuzz.IndexedSet(['a', 'b'])
+        D.symmetric_difference_update(D.values())
+        self.assertEqual(len(D), 0)
+
+
 class TestFuzzyNumber(unittest.TestCase):
 
     def setUp(self):